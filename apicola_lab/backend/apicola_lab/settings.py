@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from importlib.util import find_spec
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # Búsqueda por trigramas (pg_trgm) de especies
     "modelos",
     # REST Framework
     "rest_framework",
@@ -46,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "modelos.metricas.MetricasMiddleware",  # Latencia y consultas SQL por vista
+    "modelos.compresion.CompresionMiddleware",  # gzip/brotli de respuestas grandes
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware
@@ -94,6 +98,36 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'estadisticas' guarda resultados versionados (ver modelos/cache.py): en memoria local
+# con desalojo LRU por defecto, o Redis compartido entre workers si se define REDIS_URL.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'estadisticas': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'estadisticas',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_ESTADISTICAS_MAX_ENTRIES', '2048')),
+        },
+    },
+}
+
+if REDIS_URL:
+    CACHES['estadisticas'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'TIMEOUT': None,
+        'KEY_PREFIX': 'apicola_lab',
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,6 +171,10 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
+# Archivos subidos que esperan un trabajo en segundo plano (CSV de importación).
+# Los procesos de `manage.py procesar_trabajos` tienen que ver el mismo directorio
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -146,8 +184,35 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny', # Solo para desarrollo acordate de cambiar a IsAuthenticated.
     ),
+    # Paginación por cursor (keyset) ordenada por id
+    'DEFAULT_PAGINATION_CLASS': 'modelos.pagination.CursorPaginacion',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '100')),
+    # JSON con orjson; MessagePack sólo si el paquete está instalado
+    'DEFAULT_RENDERER_CLASSES': [
+        'modelos.renderers.OrjsonRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ] + (['modelos.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
 }
 
+# Las respuestas de este tamaño o más se comprimen con brotli o gzip (ver modelos/compresion.py)
+COMPRESION_UMBRAL_BYTES = int(os.getenv('COMPRESION_UMBRAL_BYTES', '1024'))
+
+# Requests con más consultas SQL que este presupuesto se registran como advertencia
+# y se cuentan en /metrics (apicola_requests_over_query_budget_total)
+METRICAS_PRESUPUESTO_CONSULTAS = int(os.getenv('METRICAS_PRESUPUESTO_CONSULTAS', '50'))
+
+# /metrics sólo se sirve a estas redes (separadas por comas, admite CIDR) o con
+# Authorization: Bearer METRICAS_TOKEN; al resto se le responde 403
+METRICAS_IPS_PERMITIDAS = os.getenv('METRICAS_IPS_PERMITIDAS', '127.0.0.1,::1').split(',')
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN', '')
+
+# Procesos por worker para generar reportes PDF y tiempo máximo de espera en segundos
+REPORTES_PROCESOS = int(os.getenv('REPORTES_PROCESOS', '2'))
+REPORTES_TIMEOUT = int(os.getenv('REPORTES_TIMEOUT', '120'))
+
+# Minutos que dura la reserva de tambores para armar un pool (ver ReservaTamboresService)
+RESERVA_TAMBORES_MINUTOS = int(os.getenv('RESERVA_TAMBORES_MINUTOS', '30'))
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # Solo para desarrollo
 CORS_ALLOWED_ORIGINS = [
@@ -26,7 +26,7 @@ from drf_spectacular.views import (
     SpectacularRedocView,
     SpectacularSwaggerView,
 )
-from modelos.views import health_check
+from modelos.views import health_check, metrics
 
 
 urlpatterns = [
@@ -34,6 +34,9 @@ urlpatterns = [
     
     # Health check para AWS ALB
     path('health/', health_check, name='health_check'),
+
+    # Métricas en formato Prometheus
+    path('metrics', metrics, name='metrics'),
     
     # JWT Authentication
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class ModelosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'modelos'
-    verbose_name = 'Modelos' 
\ No newline at end of file
+    verbose_name = 'Modelos'
+
+    def ready(self):
+        # Registrar las señales que mantienen las tablas resumen
+        from . import signals  # noqa: F401
@@ -0,0 +1,148 @@
+"""
+Búsqueda aproximada de especies por nombre científico, común o familia
+
+Especie.nombre_busqueda guarda los tres nombres normalizados (minúsculas, sin
+acentos ni signos); el término buscado se normaliza igual, así la búsqueda no
+distingue acentos en ninguna base.
+
+En PostgreSQL la consulta usa el índice GIN de pg_trgm sobre nombre_busqueda
+(migración 0010): LIKE para las coincidencias exactas y el operador %> de
+word_similarity para las aproximadas. En otras bases (SQLite en desarrollo y
+pruebas) se busca en un índice de trigramas en memoria armado sobre la
+instantánea del catálogo (ver modelos/catalogo.py).
+
+En los dos casos el orden es: primero las especies con alguna palabra que empieza
+con el término, después por similitud y por último por nombre científico.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.db import connection
+
+# Umbral de similitud por palabra, el mismo que pg_trgm.word_similarity_threshold
+UMBRAL_SIMILITUD = 0.6
+
+LARGO_MINIMO = 2
+LIMITE_POR_DEFECTO = 20
+LIMITE_MAXIMO = 100
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def normalizar(*textos):
+    """Une los textos en minúsculas, sin acentos y con las palabras separadas por un espacio"""
+    unido = ' '.join(texto for texto in textos if texto)
+    sin_acentos = ''.join(
+        caracter for caracter in unicodedata.normalize('NFKD', unido.lower())
+        if not unicodedata.combining(caracter)
+    )
+    return _NO_ALFANUMERICO.sub(' ', sin_acentos).strip()
+
+
+def trigramas(texto, prefijo=False):
+    """
+    Trigramas de cada palabra con el mismo relleno que pg_trgm (dos espacios antes, uno después)
+
+    Con prefijo=True se omite el trigrama final de cada palabra: el término
+    puede ser el comienzo de una palabra más larga.
+    """
+    resultado = set()
+    for palabra in texto.split():
+        rellena = f'  {palabra} '
+        fin = len(rellena) - 2 - (1 if prefijo else 0)
+        resultado.update(rellena[i:i + 3] for i in range(fin))
+    return resultado
+
+
+class IndiceTrigramas:
+    """Índice invertido trigrama -> ids de especie sobre una instantánea del catálogo"""
+
+    def __init__(self, especies):
+        self.textos = {}
+        self.indice = defaultdict(set)
+        for especie_id, especie in especies.items():
+            texto = normalizar(especie['nombre_cientifico'], especie['nombre_comun'], especie['familia'])
+            self.textos[especie_id] = texto
+            for trigrama in trigramas(texto):
+                self.indice[trigrama].add(especie_id)
+
+    def buscar(self, termino, limite):
+        """
+        Returns:
+            list: Pares (especie_id, similitud) ordenados por relevancia
+        """
+        buscados = trigramas(termino, prefijo=True)
+        if not buscados:
+            return []
+        comunes = defaultdict(int)
+        for trigrama in buscados:
+            for especie_id in self.indice.get(trigrama, ()):
+                comunes[especie_id] += 1
+
+        resultados = []
+        for especie_id, cantidad in comunes.items():
+            texto = self.textos[especie_id]
+            similitud = 1.0 if termino in texto else cantidad / len(buscados)
+            if similitud >= UMBRAL_SIMILITUD:
+                resultados.append((_empieza_palabra(texto, termino), similitud, especie_id))
+        resultados.sort(key=lambda fila: (-fila[0], -fila[1], self.textos[fila[2]]))
+        return [(especie_id, round(similitud, 4)) for _, similitud, especie_id in resultados[:limite]]
+
+
+def _empieza_palabra(texto, termino):
+    return texto.startswith(termino) or f' {termino}' in texto
+
+
+def _buscar_postgresql(termino, limite):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+    from django.db.models import Case, IntegerField, Q, Value, When
+
+    from .models.Especie_model import Especie
+
+    filas = Especie.objects.filter(
+        Q(nombre_busqueda__contains=termino) | Q(nombre_busqueda__trigram_word_similar=termino)
+    ).annotate(
+        prefijo=Case(
+            When(Q(nombre_busqueda__startswith=termino) | Q(nombre_busqueda__contains=f' {termino}'), then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField()
+        ),
+        similitud=TrigramWordSimilarity(termino, 'nombre_busqueda')
+    ).order_by('-prefijo', '-similitud', 'nombre_busqueda').values_list('id', 'similitud')[:limite]
+    return [(especie_id, round(similitud, 4)) for especie_id, similitud in filas]
+
+
+def buscar_especies(texto, limite=LIMITE_POR_DEFECTO):
+    """
+    Busca especies por nombre científico, común o familia
+
+    Args:
+        texto (str): Término tal como lo escribió el analista
+        limite (int): Máximo de resultados
+
+    Returns:
+        list: Datos de cada especie (como EspecieSerializer) más su 'similitud'
+
+    Raises:
+        ValueError: Si el término normalizado es demasiado corto
+    """
+    from .catalogo import catalogo
+
+    termino = normalizar(texto or '')
+    if len(termino) < LARGO_MINIMO:
+        raise ValueError(f"El término de búsqueda debe tener al menos {LARGO_MINIMO} letras o números")
+
+    instantanea = catalogo.obtener()
+    if connection.vendor == 'postgresql':
+        encontrados = _buscar_postgresql(termino, limite)
+    else:
+        if getattr(instantanea, 'indice_busqueda', None) is None:
+            instantanea.indice_busqueda = IndiceTrigramas(instantanea.especies)
+        encontrados = instantanea.indice_busqueda.buscar(termino, limite)
+
+    return [
+        {**instantanea.especies[especie_id], 'similitud': similitud}
+        for especie_id, similitud in encontrados
+        if especie_id in instantanea.especies
+    ]
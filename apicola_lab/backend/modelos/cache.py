@@ -0,0 +1,63 @@
+"""
+Caché de resultados versionada
+
+Los resultados se guardan en un alias de CACHES (local en memoria con desalojo LRU
+por defecto, Redis si se configura REDIS_URL) bajo una clave que incluye las
+versiones de los datos de los que dependen. Cuando una escritura incrementa una
+versión (ver modelos/versiones.py) las entradas viejas dejan de consultarse y el
+backend las desaloja por antigüedad. Quien calcula un resultado lee las versiones
+antes que los datos: el incremento llega después de la escritura, no en su misma
+transacción, y en ese orden una entrada nunca queda con datos más viejos que su clave.
+"""
+import threading
+
+from django.core.cache import caches
+
+
+class CacheVersionada:
+    """Envoltorio de un alias de caché con claves versionadas y contadores de aciertos"""
+
+    def __init__(self, alias, prefijo):
+        self.alias = alias
+        self.prefijo = prefijo
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def clave(self, identificador, versiones):
+        sufijo = '.'.join(f'{version}' for _, version in sorted(versiones.items()))
+        return f'{self.prefijo}:{identificador}:{sufijo}'
+
+    def get(self, identificador, versiones):
+        valor = self.backend.get(self.clave(identificador, versiones))
+        with self._lock:
+            if valor is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+        return valor
+
+    def set(self, identificador, versiones, valor):
+        self.backend.set(self.clave(identificador, versiones), valor)
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / total, 4) if total else None
+        }
+
+
+# Caché de PoolStatsService.get_pool_stats
+estadisticas_pool = CacheVersionada('estadisticas', 'pool_stats')
+
+# PDFs de modelos/reportes.py, con las mismas versiones que las estadísticas del pool
+reportes_pdf = CacheVersionada('estadisticas', 'reporte_pdf')
+
+# Mosaicos del mapa de composición polínica (ver modelos/mapas.py)
+mosaicos_mapa = CacheVersionada('estadisticas', 'mapa_mosaico')
@@ -0,0 +1,86 @@
+"""
+Catálogo de especies en memoria del proceso
+
+La tabla especies es chica y casi no cambia, pero se lee en cada sesión de conteo,
+en las estadísticas de cada pool y en cada análisis palinológico con la especie
+anidada. CatalogoEspecies guarda una instantánea inmutable de la tabla (ya
+serializada y con el JSON del listado armado) etiquetada con la versión compartida
+'especies' (ver modelos/versiones.py): cualquier escritura sobre Especie incrementa
+esa versión y el próximo pedido de cada worker reconstruye su instantánea.
+
+Comprobar la vigencia cuesta una consulta a version_datos; quien ya leyó la versión
+(por ejemplo la caché de PoolStatsService) puede pasarla y evitarla.
+"""
+import hashlib
+import threading
+
+from . import versiones
+from .models.Especie_model import Especie
+from .renderers import a_json
+
+
+class Instantanea:
+    """
+    Copia de la tabla especies en una versión dada
+
+    Attributes:
+        especies (dict): id -> datos de EspecieSerializer (no modificar)
+        json (bytes): Listado completo ordenado por id, listo para responder
+        etag (str): ETag del listado
+    """
+
+    def __init__(self, version, fecha, datos):
+        self.version = version
+        self.fecha = fecha
+        self.especies = {especie['id']: especie for especie in datos}
+        self.json = a_json(datos)
+        self.etag = '"especies-%s-%s"' % (version, hashlib.sha1(self.json).hexdigest()[:16])
+
+    def nombre(self, especie_id):
+        especie = self.especies.get(especie_id)
+        return especie['nombre_cientifico'] if especie else None
+
+
+class CatalogoEspecies:
+    """Instantánea vigente del catálogo, reconstruida cuando cambia la versión 'especies'"""
+
+    def __init__(self):
+        self._actual = None
+        self._lock = threading.Lock()
+        self.reconstrucciones = 0
+
+    def obtener(self, version=None):
+        """
+        Devuelve la instantánea de la versión vigente
+
+        Args:
+            version (int): Versión de 'especies' ya leída por el llamador (opcional)
+        """
+        fecha = None
+        if version is None:
+            version, fecha = versiones.obtener_con_fecha(versiones.ESPECIES)[versiones.ESPECIES]
+        actual = self._actual
+        if actual is not None and actual.version == version:
+            return actual
+        with self._lock:
+            if self._actual is None or self._actual.version != version:
+                self._actual = self._construir(version, fecha)
+                self.reconstrucciones += 1
+            return self._actual
+
+    def _construir(self, version, fecha):
+        # Los datos se leen después que la versión: nunca son más viejos que su etiqueta
+        from .mixins import _lector_plano
+        from .serializers import EspecieSerializer
+        columnas, lectores = _lector_plano(EspecieSerializer(), Especie)
+        datos = []
+        for fila in Especie.objects.order_by('id').values(*columnas):
+            especie = {}
+            for nombre, columna, convertir, _ in lectores:
+                valor = fila[columna]
+                especie[nombre] = valor if valor is None or convertir is None else convertir(valor)
+            datos.append(especie)
+        return Instantanea(version, fecha, datos)
+
+
+catalogo = CatalogoEspecies()
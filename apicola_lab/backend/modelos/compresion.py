@@ -0,0 +1,95 @@
+"""
+Compresión de respuestas con brotli o gzip
+
+CompresionMiddleware comprime las respuestas de más de COMPRESION_UMBRAL_BYTES si el
+cliente lo acepta: brotli cuando el paquete está instalado y el cliente envía 'br',
+si no gzip. Las respuestas en streaming (exportaciones CSV) se comprimen por partes.
+No se tocan los formatos que ya vienen comprimidos (PDF, ZIP, imágenes).
+
+gzip agrega el relleno aleatorio de GZipMiddleware de Django (mitigación de BREACH).
+"""
+import re
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+ACEPTA_BR = re.compile(r'\bbr\b')
+ACEPTA_GZIP = re.compile(r'\bgzip\b')
+
+YA_COMPRIMIDOS = ('application/pdf', 'application/zip', 'image/')
+
+# Calidad de brotli: 4-5 comprime parecido a gzip -6 y bastante más rápido que el máximo (11)
+CALIDAD_BROTLI = 5
+
+
+def _brotli_por_partes(partes):
+    compresor = brotli.Compressor(quality=CALIDAD_BROTLI)
+    for parte in partes:
+        comprimido = compresor.process(parte)
+        if comprimido:
+            yield comprimido
+    yield compresor.finish()
+
+
+def elegir_codificacion(accept_encoding):
+    """'br', 'gzip' o None según lo que acepta el cliente y lo que está instalado"""
+    if brotli is not None and ACEPTA_BR.search(accept_encoding):
+        return 'br'
+    if ACEPTA_GZIP.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+class CompresionMiddleware:
+    """Comprime las respuestas grandes con brotli o gzip"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.umbral = getattr(settings, 'COMPRESION_UMBRAL_BYTES', 1024)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        tipo = response.get('Content-Type', '')
+        if response.has_header('Content-Encoding') or tipo.startswith(YA_COMPRIMIDOS):
+            return response
+        if not response.streaming and len(response.content) < self.umbral:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codificacion = elegir_codificacion(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacion is None:
+            return response
+
+        if response.streaming:
+            partes = response.streaming_content
+            if codificacion == 'br':
+                response.streaming_content = _brotli_por_partes(partes)
+            else:
+                response.streaming_content = compress_sequence(
+                    partes, max_random_bytes=GZipMiddleware.max_random_bytes
+                )
+            del response.headers['Content-Length']
+        else:
+            if codificacion == 'br':
+                comprimido = brotli.compress(response.content, quality=CALIDAD_BROTLI)
+            else:
+                comprimido = compress_string(response.content, max_random_bytes=GZipMiddleware.max_random_bytes)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response.headers['Content-Length'] = str(len(comprimido))
+
+        # El cuerpo ya no es idéntico byte a byte: el ETag pasa a ser débil
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codificacion
+        return response
@@ -0,0 +1,97 @@
+"""
+GET condicional (ETag / Last-Modified) a partir de los contadores de versión
+
+El ETag de una respuesta se deriva de la URL pedida, del Accept y de las versiones
+de las tablas de las que depende (ver modelos/versiones.py); Last-Modified es la
+última vez que cambió alguna de esas versiones. Las dos cosas salen de una sola
+consulta a version_datos, así un pedido sin cambios se responde 304 sin ejecutar
+la consulta principal ni los serializers.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from . import versiones
+
+
+def tablas_de_consulta(modelo, rutas):
+    """
+    Modelos que intervienen en una consulta con select/prefetch_related
+
+    Incluye las tablas intermedias de las relaciones muchos a muchos.
+
+    Args:
+        modelo (Model): Modelo del queryset
+        rutas (iterable): Rutas de relaciones ('apiarios__apicultor', ...)
+    """
+    modelos = {modelo}
+    for ruta in rutas:
+        actual = modelo
+        for parte in ruta.split('__'):
+            campo = actual._meta.get_field(parte)
+            through = getattr(campo, 'through', None) or getattr(campo.remote_field, 'through', None)
+            if through is not None:
+                modelos.add(through)
+            actual = campo.related_model
+            modelos.add(actual)
+    return modelos
+
+
+class Validador:
+    """ETag y Last-Modified de una respuesta"""
+
+    def __init__(self, request, claves, *extra):
+        actuales = versiones.obtener_con_fecha(*claves)
+        partes = [request.get_full_path(), request.META.get('HTTP_ACCEPT', '')]
+        partes += [f'{clave}={version}' for clave, (version, _) in sorted(actuales.items())]
+        partes += [str(valor) for valor in extra]
+        self.etag = '"%s"' % hashlib.sha1('|'.join(partes).encode()).hexdigest()[:32]
+        fechas = [fecha for _, fecha in actuales.values() if fecha is not None]
+        self.ultima_modificacion = max(fechas).timestamp() if fechas else None
+
+    @classmethod
+    def fijo(cls, etag, ultima_modificacion=None):
+        """Validador de un contenido precalculado que ya trae su ETag (ver modelos/catalogo.py)"""
+        validador = cls.__new__(cls)
+        validador.etag = etag
+        validador.ultima_modificacion = ultima_modificacion
+        return validador
+
+    def no_modificado(self, request):
+        """HttpResponseNotModified (con los validadores) si el cliente ya tiene esta versión, o None"""
+        response = get_conditional_response(
+            request, etag=self.etag, last_modified=self.ultima_modificacion and int(self.ultima_modificacion)
+        )
+        if response is not None and response.status_code == 304:
+            self._validadores(response)
+        return response
+
+    def marcar(self, response):
+        """Agrega los validadores a una respuesta 200 y pide al navegador revalidar siempre"""
+        if response.status_code == 200:
+            self._validadores(response)
+        return response
+
+    def _validadores(self, response):
+        response['ETag'] = self.etag
+        if self.ultima_modificacion is not None:
+            response['Last-Modified'] = http_date(self.ultima_modificacion)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Accept'])
+
+
+def responder(request, claves, generar, *extra):
+    """
+    Responde 304 si el cliente tiene la versión vigente; si no, genera la respuesta y la marca
+
+    Args:
+        claves (iterable): Claves de versión de las que depende la respuesta
+        generar (callable): Arma la respuesta completa (sólo se llama si hace falta)
+        *extra: Otros valores que cambian la respuesta sin pasar por una versión
+    """
+    validador = Validador(request, claves, *extra)
+    no_modificado = validador.no_modificado(request)
+    if no_modificado is not None:
+        return no_modificado
+    return validador.marcar(generar())
@@ -0,0 +1,112 @@
+"""
+Cambios que se acumulan durante una transacción y se aplican una vez al confirmarla
+
+Las señales (resúmenes, series, mapa) y los contadores de versión juntan sus
+cambios en lotes; una sola transaction.on_commit aplica los lotes en el orden de
+ORDEN: primero los datos precalculados y al final las versiones, así ninguna
+caché se invalida antes de que los datos que muestra estén al día. Fuera de una
+transacción cada cambio se aplica en el momento.
+
+Los lotes son por nivel de la transacción: lo que se acumula dentro de un
+savepoint (un atomic anidado) va en un lote propio, que Django descarta junto
+con su on_commit si el savepoint se revierte.
+
+Si el proceso se corta entre la confirmación y la aplicación de un lote, las
+tablas precalculadas se recuperan con `manage.py reconstruir_resumenes`.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+# Nombres de lote, en el orden en que se aplican al confirmar
+ORDEN = ('resumenes', 'versiones')
+
+
+
+class _EnCurso(threading.local):
+    """Pila de los lotes que se están aplicando en cada hilo"""
+
+    def __init__(self):
+        self.lotes = []
+
+
+_en_curso = _EnCurso()
+
+
+def _nivel():
+    """
+    Identifica el nivel de transacción en curso, o None fuera de una transacción
+
+    Es el id del savepoint más interno, o 'transaccion' en el atomic externo. No
+    cuentan los atomic que abre TestCase alrededor de cada test.
+    """
+    propios = [indice for indice, bloque in enumerate(connection.atomic_blocks) if not bloque._from_testcase]
+    for indice in reversed(propios):
+        if indice == 0:
+            return 'transaccion'
+        # Un atomic sin savepoint (como el de Model.delete) comparte la suerte del nivel que lo contiene
+        if connection.savepoint_ids[indice - 1] is not None:
+            return connection.savepoint_ids[indice - 1]
+    return None
+
+
+def _lotes(nivel):
+    """Lotes del nivel: nombre -> (lote, aplicar); registra su on_commit la primera vez"""
+    for _, funcion, *_ in connection.run_on_commit:
+        if getattr(funcion, 'nivel', None) == nivel:
+            return funcion.lotes
+    lotes = {}
+
+    def aplicar():
+        _aplicar_lotes(lotes)
+    aplicar.nivel = nivel
+    aplicar.lotes = lotes
+    transaction.on_commit(aplicar)
+    return lotes
+
+
+def _aplicar_lotes(lotes):
+    """
+    Aplica los lotes en el orden de ORDEN
+
+    Lo que se acumula mientras tanto (las versiones que incrementan las series y
+    el mapa dentro de su propio atomic) se agrega a estos mismos lotes y se aplica
+    a continuación, en lugar de esperar a otra confirmación.
+    """
+    _en_curso.lotes.append(lotes)
+    try:
+        for nombre in ORDEN:
+            if nombre in lotes:
+                lote, aplicar_lote = lotes[nombre]
+                aplicar_lote(lote)
+    finally:
+        _en_curso.lotes.pop()
+
+
+@contextmanager
+def acumular(nombre, crear, aplicar):
+    """
+    Da el lote `nombre` del nivel de transacción en curso para agregarle cambios
+
+    Dentro de una transacción el lote se crea la primera vez y se aplica con
+    aplicar(lote) al confirmar; si se revierte, se descarta. Fuera de una
+    transacción se aplica al salir del bloque.
+
+    Args:
+        nombre (str): Uno de ORDEN
+        crear (callable): Crea un lote vacío
+        aplicar (callable): Recibe el lote y lo aplica
+    """
+    if _en_curso.lotes:
+        lotes = _en_curso.lotes[-1]
+    elif _nivel() is None:
+        lotes = {nombre: (crear(), aplicar)}
+        yield lotes[nombre][0]
+        _aplicar_lotes(lotes)
+        return
+    else:
+        lotes = _lotes(_nivel())
+    if nombre not in lotes:
+        lotes[nombre] = (crear(), aplicar)
+    yield lotes[nombre][0]
@@ -0,0 +1,238 @@
+"""
+Exportación completa de análisis en CSV o NDJSON
+
+Las filas se leen con QuerySet.values().iterator(chunk_size=...), que en PostgreSQL
+usa un cursor del lado del servidor, y se escriben a la respuesta de a un bloque
+por vez: la memoria del worker no depende de la cantidad de filas exportadas.
+Las relaciones múltiples (tambores de un pool, apiarios de un tambor) se resuelven
+con una consulta por bloque y se exportan como listas separadas por "; ".
+"""
+import csv
+import io
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models.TamborApiario_model import TamborApiario
+from .models.ContienePool_model import ContienePool
+from .models.AnalisisPalinologico_model import AnalisisPalinologico
+from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+TAMANO_BLOQUE = 2000
+
+SEPARADOR_LISTAS = '; '
+
+# Columna exportada -> campo de .values()
+COLUMNAS_PALINOLOGICO = {
+    'id': 'id',
+    'pool_id': 'pool_id',
+    'pool_num_registro': 'pool__num_registro',
+    'pool_fecha_analisis': 'pool__fecha_analisis',
+    'analista_username': 'pool__analista__username',
+    'especie_id': 'especie_id',
+    'especie_nombre_cientifico': 'especie__nombre_cientifico',
+    'especie_nombre_comun': 'especie__nombre_comun',
+    'especie_familia': 'especie__familia',
+    'cantidad_granos': 'cantidad_granos',
+    'porcentaje': 'porcentaje',
+    'marca_especial': 'marca_especial',
+}
+
+COLUMNAS_FISICOQUIMICO = {
+    'id': 'id',
+    'num_registro': 'num_registro',
+    'fecha_extraccion': 'fecha_extraccion',
+    'fecha_analisis': 'fecha_analisis',
+    'analista_username': 'analista__username',
+    'tambor_id': 'tambor_id',
+    'tambor_num_registro': 'tambor__num_registro',
+    'tambor_fecha_de_extraccion': 'tambor__fecha_de_extraccion',
+    'color': 'color',
+    'humedad': 'humedad',
+    'observaciones': 'observaciones',
+}
+
+
+def parse_formato(params):
+    """
+    Lee ?formato= (csv por defecto)
+
+    Raises:
+        ValueError: Si el formato no está soportado
+    """
+    formato = (params.get('formato') or 'csv').lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato}. Opciones: {', '.join(FORMATOS)}")
+    return formato
+
+
+def parse_especie(params):
+    """
+    Lee ?especie= como lista de ids separados por coma
+
+    Raises:
+        ValueError: Si algún identificador es inválido
+    """
+    valor = params.get('especie')
+    if not valor:
+        return None
+    ids = [parte.strip() for parte in valor.split(',') if parte.strip()]
+    if not all(parte.isdigit() for parte in ids):
+        raise ValueError(f"Identificador inválido en 'especie': {valor}")
+    return [int(parte) for parte in ids]
+
+
+def _tambores_por_pool(pool_ids):
+    tambores = defaultdict(list)
+    for pool_id, num_registro in ContienePool.objects.filter(
+        pool_id__in=pool_ids
+    ).order_by('pool_id', 'tambor__num_registro').values_list('pool_id', 'tambor__num_registro'):
+        tambores[pool_id].append(num_registro)
+    return tambores
+
+
+def _apiarios_por_tambor(tambor_ids):
+    apiarios = defaultdict(list)
+    for tambor_id, nombre in TamborApiario.objects.filter(
+        tambor_id__in=tambor_ids
+    ).order_by('tambor_id', 'apiario__nombre_apiario').values_list('tambor_id', 'apiario__nombre_apiario'):
+        apiarios[tambor_id].append(nombre)
+    return apiarios
+
+
+def _apiarios_por_pool(pool_ids):
+    apiarios = defaultdict(list)
+    for pool_id, nombre in ContienePool.objects.filter(
+        pool_id__in=pool_ids,
+        tambor__apiarios__isnull=False
+    ).order_by('pool_id', 'tambor__apiarios__nombre_apiario').values_list(
+        'pool_id', 'tambor__apiarios__nombre_apiario'
+    ).distinct():
+        apiarios[pool_id].append(nombre)
+    return apiarios
+
+
+def _completar_palinologicos(filas):
+    pool_ids = {fila['pool_id'] for fila in filas}
+    tambores = _tambores_por_pool(pool_ids)
+    apiarios = _apiarios_por_pool(pool_ids)
+    for fila in filas:
+        fila['tambores'] = SEPARADOR_LISTAS.join(tambores.get(fila['pool_id'], []))
+        fila['apiarios'] = SEPARADOR_LISTAS.join(apiarios.get(fila['pool_id'], []))
+
+
+def _completar_fisicoquimicos(filas):
+    apiarios = _apiarios_por_tambor({fila['tambor_id'] for fila in filas})
+    for fila in filas:
+        fila['apiarios'] = SEPARADOR_LISTAS.join(apiarios.get(fila['tambor_id'], []))
+
+
+def consulta_palinologicos(filtros, especies=None):
+    """
+    Análisis palinológicos a exportar
+
+    Args:
+        filtros (dict): Filtros de EstadisticasGlobalesService.parse_filtros, aplicados al pool
+        especies (list): Ids de especie, opcional
+    """
+    from .services import EstadisticasGlobalesService
+
+    analisis = AnalisisPalinologico.objects.all()
+    if filtros:
+        analisis = analisis.filter(
+            pool__in=EstadisticasGlobalesService.filtrar_pools(filtros).values('id')
+        )
+    if especies:
+        analisis = analisis.filter(especie_id__in=especies)
+    return analisis.order_by('pool_id', 'id')
+
+
+def consulta_fisicoquimicos(filtros):
+    """
+    Análisis físico-químicos a exportar
+
+    Args:
+        filtros (dict): Filtros de EstadisticasGlobalesService.parse_filtros; las fechas
+            se aplican a la fecha de análisis
+    """
+    analisis = AnalisisFisicoQuimico.objects.all()
+    if 'fecha_desde' in filtros:
+        analisis = analisis.filter(fecha_analisis__gte=filtros['fecha_desde'])
+    if 'fecha_hasta' in filtros:
+        analisis = analisis.filter(fecha_analisis__lte=filtros['fecha_hasta'])
+    if 'analista' in filtros:
+        analisis = analisis.filter(analista_id=filtros['analista'])
+    if 'apiario' in filtros:
+        analisis = analisis.filter(
+            tambor_id__in=TamborApiario.objects.filter(apiario_id=filtros['apiario']).values('tambor_id')
+        )
+    return analisis.order_by('id')
+
+
+def _bloques(queryset, columnas, completar, tamano_bloque):
+    """Itera la consulta en bloques de filas ya renombradas y completadas"""
+    campos = list(columnas.values())
+    bloque = []
+    for fila in queryset.values(*campos).iterator(chunk_size=tamano_bloque):
+        bloque.append({columna: fila[campo] for columna, campo in columnas.items()})
+        if len(bloque) >= tamano_bloque:
+            completar(bloque)
+            yield bloque
+            bloque = []
+    if bloque:
+        completar(bloque)
+        yield bloque
+
+
+def _csv(bloques, encabezado):
+    salida = io.StringIO()
+    escritor = csv.DictWriter(salida, fieldnames=encabezado, lineterminator='\n')
+    escritor.writeheader()
+    yield salida.getvalue()
+    for bloque in bloques:
+        salida.seek(0)
+        salida.truncate()
+        escritor.writerows(bloque)
+        yield salida.getvalue()
+
+
+def _ndjson(bloques):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for bloque in bloques:
+        yield ''.join(encoder.encode(fila) + '\n' for fila in bloque)
+
+
+def _respuesta(nombre, formato, queryset, columnas, extra, completar, tamano_bloque):
+    bloques = _bloques(queryset, columnas, completar, tamano_bloque)
+    if formato == 'csv':
+        contenido = _csv(bloques, list(columnas) + extra)
+    else:
+        contenido = _ndjson(bloques)
+
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    fecha = timezone.localdate().strftime('%Y%m%d')
+    response['Content-Disposition'] = f'attachment; filename="{nombre}_{fecha}.{formato}"'
+    return response
+
+
+def exportar_palinologicos(formato, filtros, especies=None, tamano_bloque=TAMANO_BLOQUE):
+    """StreamingHttpResponse con los análisis palinológicos, sus pools, especies, tambores y apiarios"""
+    return _respuesta(
+        'analisis_palinologicos', formato, consulta_palinologicos(filtros, especies),
+        COLUMNAS_PALINOLOGICO, ['tambores', 'apiarios'], _completar_palinologicos, tamano_bloque
+    )
+
+
+def exportar_fisicoquimicos(formato, filtros, tamano_bloque=TAMANO_BLOQUE):
+    """StreamingHttpResponse con los análisis físico-químicos, sus tambores y apiarios"""
+    return _respuesta(
+        'analisis_fisicoquimicos', formato, consulta_fisicoquimicos(filtros),
+        COLUMNAS_FISICOQUIMICO, ['apiarios'], _completar_fisicoquimicos, tamano_bloque
+    )
@@ -0,0 +1,266 @@
+"""
+Consultas geográficas sobre las coordenadas de los apiarios sin PostGIS
+
+Apiario.geohash guarda el geohash de sus coordenadas (vacío si no tiene) con un
+índice B-tree; en PostgreSQL Django crea además el índice varchar_pattern_ops que
+usa LIKE 'prefijo%'. Una consulta por área se traduce en unos pocos prefijos de
+geohash que cubren el rectángulo (filtro grueso por índice) más la comparación
+exacta de latitud y longitud. Las consultas por radio y de los más cercanos
+filtran por el rectángulo que contiene al círculo y calculan la distancia exacta
+(haversine) de los candidatos, vectorizada con numpy cuando está instalado.
+
+Las áreas que cruzan el antimeridiano (oeste > este) se parten en dos.
+"""
+import math
+
+try:
+    import numpy
+except ImportError:  # numpy es opcional: sin él la distancia se calcula fila por fila
+    numpy = None
+
+from django.db.models import Q
+
+RADIO_TIERRA_KM = 6371.0088
+
+# Precisión guardada: celdas de unos 5 m x 5 m
+PRECISION = 9
+
+# Máximo de prefijos por rectángulo; más celdas se cubren con prefijos más cortos
+MAX_CELDAS = 32
+
+# Radio inicial de la búsqueda de los más cercanos; se multiplica hasta juntar los pedidos
+RADIO_INICIAL_KM = 10
+RADIO_MAXIMO_KM = math.pi * RADIO_TIERRA_KM
+
+LIMITE_POR_DEFECTO = 20
+LIMITE_MAXIMO = 1000
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def codificar(latitud, longitud, precision=PRECISION):
+    """Geohash de un punto, o '' si falta alguna coordenada"""
+    if latitud is None or longitud is None:
+        return ''
+    latitud, longitud = float(latitud), float(longitud)
+    rango_lat, rango_lon = [-90.0, 90.0], [-180.0, 180.0]
+    resultado, bits, valor, par = [], 0, 0, True
+    while len(resultado) < precision:
+        rango, coordenada = (rango_lon, longitud) if par else (rango_lat, latitud)
+        medio = (rango[0] + rango[1]) / 2
+        if coordenada >= medio:
+            valor = valor * 2 + 1
+            rango[0] = medio
+        else:
+            valor = valor * 2
+            rango[1] = medio
+        par = not par
+        bits += 1
+        if bits == 5:
+            resultado.append(_BASE32[valor])
+            bits, valor = 0, 0
+    return ''.join(resultado)
+
+
+def decodificar(geohash):
+    """Centro (latitud, longitud) de la celda de un geohash"""
+    rango_lat, rango_lon = [-90.0, 90.0], [-180.0, 180.0]
+    par = True
+    for caracter in geohash:
+        valor = _BASE32.index(caracter)
+        for bit in range(4, -1, -1):
+            rango = rango_lon if par else rango_lat
+            medio = (rango[0] + rango[1]) / 2
+            if valor >> bit & 1:
+                rango[0] = medio
+            else:
+                rango[1] = medio
+            par = not par
+    return (rango_lat[0] + rango_lat[1]) / 2, (rango_lon[0] + rango_lon[1]) / 2
+
+
+def tamano_celda(precision):
+    """Alto y ancho en grados de una celda de geohash de la precisión dada"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def _indices(desde, hasta, origen, tamano, cantidad):
+    return range(
+        max(int((desde - origen) // tamano), 0),
+        min(int((hasta - origen) // tamano), cantidad - 1) + 1
+    )
+
+
+def prefijos_de_area(sur, oeste, norte, este):
+    """
+    Prefijos de geohash que cubren un rectángulo (sin cruzar el antimeridiano)
+
+    Usa la precisión más fina que no supera MAX_CELDAS prefijos.
+
+    Returns:
+        list: Prefijos, o None si el rectángulo abarca todo el mundo
+    """
+    elegidos = None
+    for precision in range(1, PRECISION + 1):
+        alto, ancho = tamano_celda(precision)
+        filas = _indices(sur, norte, -90.0, alto, round(180.0 / alto))
+        columnas = _indices(oeste, este, -180.0, ancho, round(360.0 / ancho))
+        if len(filas) * len(columnas) > MAX_CELDAS:
+            break
+        elegidos = sorted({
+            codificar(-90.0 + (fila + 0.5) * alto, -180.0 + (columna + 0.5) * ancho, precision)
+            for fila in filas for columna in columnas
+        })
+    if elegidos is None or len(elegidos) == 32 and len(elegidos[0]) == 1:
+        return None
+    return elegidos
+
+
+def _rectangulos(sur, oeste, norte, este):
+    if oeste > este:
+        return [(sur, oeste, norte, 180.0), (sur, -180.0, norte, este)]
+    return [(sur, oeste, norte, este)]
+
+
+def filtro_de_area(sur, oeste, norte, este):
+    """Q que selecciona los apiarios dentro del rectángulo (prefijos de geohash + coordenadas exactas)"""
+    condicion = Q(pk__in=[])
+    for s, o, n, e in _rectangulos(sur, oeste, norte, este):
+        rectangulo = Q(latitud__gte=s, latitud__lte=n, longitud__gte=o, longitud__lte=e)
+        prefijos = prefijos_de_area(s, o, n, e)
+        if prefijos is not None:
+            celdas = Q(pk__in=[])
+            for prefijo in prefijos:
+                celdas |= Q(geohash__startswith=prefijo)
+            rectangulo &= celdas
+        condicion |= rectangulo
+    return condicion
+
+
+def area_de_radio(latitud, longitud, radio_km):
+    """Rectángulo (sur, oeste, norte, este) que contiene el círculo"""
+    delta_lat = math.degrees(radio_km / RADIO_TIERRA_KM)
+    sur, norte = latitud - delta_lat, latitud + delta_lat
+    if sur <= -90 or norte >= 90:
+        # El círculo contiene un polo: todas las longitudes
+        return max(sur, -90.0), -180.0, min(norte, 90.0), 180.0
+    delta_lon = math.degrees(math.asin(min(math.sin(radio_km / RADIO_TIERRA_KM) / math.cos(math.radians(latitud)), 1)))
+    if delta_lon >= 180 or radio_km / RADIO_TIERRA_KM >= math.pi / 2:
+        return sur, -180.0, norte, 180.0
+    oeste, este = longitud - delta_lon, longitud + delta_lon
+    if oeste < -180:
+        oeste += 360
+    if este > 180:
+        este -= 360
+    return sur, oeste, norte, este
+
+
+def distancias_km(latitud, longitud, latitudes, longitudes):
+    """Distancia haversine del punto a cada par de coordenadas, en km"""
+    if numpy is not None:
+        lat1, lon1 = numpy.radians(latitud), numpy.radians(longitud)
+        lat2 = numpy.radians(numpy.asarray(latitudes, dtype=float))
+        lon2 = numpy.radians(numpy.asarray(longitudes, dtype=float))
+        a = numpy.sin((lat2 - lat1) / 2) ** 2 + numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin((lon2 - lon1) / 2) ** 2
+        return (2 * RADIO_TIERRA_KM * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))).tolist()
+
+    lat1, lon1 = math.radians(latitud), math.radians(longitud)
+    resultado = []
+    for lat, lon in zip(latitudes, longitudes):
+        lat2, lon2 = math.radians(float(lat)), math.radians(float(lon))
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        resultado.append(2 * RADIO_TIERRA_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return resultado
+
+
+def _dentro_del_radio(queryset, latitud, longitud, radio_km):
+    filas = list(queryset.filter(filtro_de_area(*area_de_radio(latitud, longitud, radio_km))).values_list(
+        'id', 'latitud', 'longitud'
+    ))
+    distancias = distancias_km(latitud, longitud, [fila[1] for fila in filas], [fila[2] for fila in filas])
+    return sorted(
+        ((distancia, fila[0]) for fila, distancia in zip(filas, distancias) if distancia <= radio_km)
+    )
+
+
+def cercanos(queryset, latitud, longitud, radio_km=None, limite=LIMITE_POR_DEFECTO):
+    """
+    Apiarios más cercanos a un punto, opcionalmente dentro de un radio
+
+    Sin radio, busca en radios crecientes hasta juntar 'limite' apiarios: los que
+    caen dentro del radio ya buscado son seguro los más cercanos.
+
+    Returns:
+        list: Pares (apiario_id, distancia_km) del más cercano al más lejano
+    """
+    if radio_km is not None:
+        encontrados = _dentro_del_radio(queryset, latitud, longitud, radio_km)
+    else:
+        radio = RADIO_INICIAL_KM
+        while True:
+            encontrados = _dentro_del_radio(queryset, latitud, longitud, radio)
+            if len(encontrados) >= limite or radio >= RADIO_MAXIMO_KM:
+                break
+            radio = min(radio * 4, RADIO_MAXIMO_KM)
+    return [(apiario_id, distancia) for distancia, apiario_id in encontrados[:limite]]
+
+
+# --- Parámetros de las consultas ---
+
+def _numero(params, nombre, minimo, maximo, requerido=True):
+    valor = params.get(nombre)
+    if valor in (None, ''):
+        if requerido:
+            raise ValueError(f"Falta el parámetro '{nombre}'")
+        return None
+    try:
+        numero = float(valor)
+    except ValueError:
+        raise ValueError(f"'{nombre}' debe ser un número")
+    if not math.isfinite(numero) or not minimo <= numero <= maximo:
+        raise ValueError(f"'{nombre}' debe estar entre {minimo} y {maximo}")
+    return numero
+
+
+def parse_limite(params, por_defecto=LIMITE_POR_DEFECTO):
+    valor = params.get('limite') or str(por_defecto)
+    if not valor.isdigit() or not 1 <= int(valor) <= LIMITE_MAXIMO:
+        raise ValueError(f"'limite' debe ser un entero entre 1 y {LIMITE_MAXIMO}")
+    return int(valor)
+
+
+def parse_bbox(params):
+    """
+    Interpreta ?bbox=oeste,sur,este,norte (el orden de GeoJSON)
+
+    Returns:
+        tuple: (sur, oeste, norte, este)
+
+    Raises:
+        ValueError: Si falta o es inválido
+    """
+    partes = (params.get('bbox') or '').split(',')
+    if len(partes) != 4:
+        raise ValueError("'bbox' debe tener cuatro números: oeste,sur,este,norte")
+    oeste, sur, este, norte = (
+        _numero({'bbox': parte}, 'bbox', *limites)
+        for parte, limites in zip(partes, ((-180, 180), (-90, 90), (-180, 180), (-90, 90)))
+    )
+    if sur > norte:
+        raise ValueError("En 'bbox' el sur no puede ser mayor que el norte")
+    return sur, oeste, norte, este
+
+
+def parse_punto(params):
+    """
+    Interpreta ?lat=&lon=&radio_km= de la consulta de cercanos
+
+    Returns:
+        tuple: (latitud, longitud, radio_km o None)
+    """
+    return (
+        _numero(params, 'lat', -90, 90),
+        _numero(params, 'lon', -180, 180),
+        _numero(params, 'radio_km', 0, RADIO_MAXIMO_KM, requerido=False),
+    )
@@ -0,0 +1,594 @@
+"""
+Importación masiva de apicultores, apiarios y tambores desde CSV
+
+El archivo se lee como flujo y se procesa en lotes. Cada lote se valida por
+columnas, las filas válidas se cargan en una tabla temporal de staging (con COPY
+en PostgreSQL, executemany en otras bases) y desde ahí se fusionan con las
+tablas reales en unas pocas sentencias INSERT ... SELECT / UPDATE ... FROM que
+resuelven las claves foráneas por clave natural:
+
+    apicultor -> (nombre, apellido)
+    apiario   -> (apicultor, nombre_apiario)
+    tambor    -> num_registro
+
+Las filas con errores se informan con su número de línea y no interrumpen el
+resto del lote. Si una fila repite la clave natural de otra del mismo lote, se
+usa la última. Las inserciones no disparan señales: al terminar se recuentan los
+totales del tablero y se aplican los deltas de humedad de los vínculos nuevos.
+"""
+import codecs
+import csv
+import io
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from . import geo, mapas, registros, resumenes, series, versiones
+from .models.Apicultor_model import Apicultor
+from .models.Apiario_model import Apiario
+from .models.MuestraTambor_model import MuestraTambor
+from .models.TamborApiario_model import TamborApiario
+from .models.ContienePool_model import ContienePool
+from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 5000
+
+# Máximo de filas con error detalladas en la respuesta (el total se informa siempre)
+MAX_ERRORES = 1000
+
+# Carpeta del storage con los CSV que esperan una importación en segundo plano
+CARPETA_SUBIDAS = 'importaciones'
+
+
+# --- Validación por columnas ---
+
+def _texto(max_length, requerido=True):
+    def convertir(valor):
+        if not valor:
+            if requerido:
+                raise ValueError('Campo obligatorio')
+            return None
+        if len(valor) > max_length:
+            raise ValueError(f'Máximo {max_length} caracteres')
+        return valor
+    return convertir
+
+
+def _entero(minimo=None):
+    def convertir(valor):
+        if not valor:
+            raise ValueError('Campo obligatorio')
+        try:
+            numero = int(valor)
+        except ValueError:
+            raise ValueError(f'Número entero inválido: {valor}')
+        if minimo is not None and numero < minimo:
+            raise ValueError(f'Debe ser mayor o igual a {minimo}')
+        return numero
+    return convertir
+
+
+def _coordenada(limite):
+    def convertir(valor):
+        if not valor:
+            return None
+        try:
+            numero = Decimal(valor.replace(',', '.'))
+        except InvalidOperation:
+            raise ValueError(f'Coordenada inválida: {valor}')
+        if not -limite <= numero <= limite:
+            raise ValueError(f'Debe estar entre -{limite} y {limite}')
+        return numero.quantize(Decimal('0.00000001'))
+    return convertir
+
+
+def _fecha(valor):
+    if not valor:
+        return None
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Fecha inválida (AAAA-MM-DD o DD/MM/AAAA): {valor}')
+
+
+def _tabla(modelo):
+    return connection.ops.quote_name(modelo._meta.db_table)
+
+
+def _columna(modelo, campo):
+    return connection.ops.quote_name(modelo._meta.get_field(campo).column)
+
+
+# --- Importadores ---
+
+class Importador(ABC):
+    """
+    Base de los importadores
+
+    columnas: columna del CSV -> conversor (cada conversor lanza ValueError con el mensaje de error)
+    opcionales: columnas que pueden faltar en el encabezado (se toman como vacías)
+    staging: columnas de la tabla temporal (nombre, tipo SQL); las primeras coinciden con `columnas`
+    tablas: modelos que escribe la fusión, para incrementar sus versiones (ETag de la API)
+    """
+    tipo = None
+    columnas = {}
+    opcionales = ()
+    staging = []
+    tablas = ()
+
+    def __init__(self):
+        self.tabla_staging = f'importacion_{self.tipo}'
+
+    def validar(self, lote):
+        """
+        Convierte un lote de filas del CSV columna por columna
+
+        Args:
+            lote (list): Pares (número de línea, dict de la fila)
+
+        Returns:
+            tuple: (filas válidas como tuplas (línea, valores...), {línea: [errores]})
+        """
+        lineas = [linea for linea, _ in lote]
+        errores = defaultdict(list)
+        valores = {}
+        for columna, convertir in self.columnas.items():
+            convertidos = []
+            for linea, fila in lote:
+                try:
+                    convertidos.append(convertir((fila.get(columna) or '').strip()))
+                except ValueError as e:
+                    errores[linea].append(f'{columna}: {e}')
+                    convertidos.append(None)
+            valores[columna] = convertidos
+
+        for indice, linea in enumerate(lineas):
+            for mensaje in self.validar_fila({columna: valores[columna][indice] for columna in self.columnas}):
+                errores[linea].append(mensaje)
+
+        validas = [
+            (linea, *(valores[columna][indice] for columna in self.columnas))
+            for indice, linea in enumerate(lineas)
+            if linea not in errores
+        ]
+        return validas, errores
+
+    def validar_fila(self, fila):
+        """Validaciones entre columnas de una misma fila; devuelve mensajes de error"""
+        return []
+
+    def cargar(self, cursor, filas):
+        """Crea la tabla temporal y carga las filas válidas"""
+        definicion = ', '.join(f'{nombre} {tipo}' for nombre, tipo in self.staging)
+        cursor.execute(f'CREATE TEMPORARY TABLE {self.tabla_staging} (fila integer, {definicion})')
+        columnas = ['fila'] + list(self.columnas)
+
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(filas)
+            buffer.seek(0)
+            sql = f"COPY {self.tabla_staging} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)"
+            crudo = cursor.cursor
+            if hasattr(crudo, 'copy_expert'):
+                crudo.copy_expert(sql, buffer)
+            else:
+                with crudo.copy(sql) as copia:
+                    copia.write(buffer.getvalue())
+        else:
+            marcadores = ', '.join(['%s'] * len(columnas))
+            cursor.executemany(
+                f"INSERT INTO {self.tabla_staging} ({', '.join(columnas)}) VALUES ({marcadores})",
+                filas
+            )
+
+    def descartar(self, cursor, condicion, mensaje, errores):
+        """Informa como error y quita del staging las filas que cumplen la condición"""
+        cursor.execute(f'SELECT fila FROM {self.tabla_staging} WHERE {condicion}')
+        for (linea,) in cursor.fetchall():
+            errores[linea].append(mensaje)
+        cursor.execute(f'DELETE FROM {self.tabla_staging} WHERE {condicion}')
+
+    def quitar_repetidas(self, cursor, *clave):
+        """Deja sólo la última fila de cada clave natural repetida en el lote"""
+        columnas = ', '.join(clave)
+        cursor.execute(
+            f'DELETE FROM {self.tabla_staging} WHERE fila NOT IN '
+            f'(SELECT MAX(fila) FROM {self.tabla_staging} GROUP BY {columnas})'
+        )
+
+    @abstractmethod
+    def fusionar(self, cursor, errores):
+        """Fusiona el staging con las tablas reales; devuelve los contadores del lote"""
+
+    def finalizar(self, resumen):
+        """Ajustes posteriores a la importación completa"""
+
+
+class ImportadorApicultores(Importador):
+    """Columnas: nombre, apellido. Los apicultores existentes no se modifican."""
+    tipo = 'apicultores'
+    tablas = (Apicultor,)
+    columnas = {
+        'nombre': _texto(100),
+        'apellido': _texto(100),
+    }
+    staging = [('nombre', 'varchar(100)'), ('apellido', 'varchar(100)')]
+
+    def fusionar(self, cursor, errores):
+        self.quitar_repetidas(cursor, 'nombre', 'apellido')
+        cursor.execute(f'SELECT COUNT(*) FROM {self.tabla_staging}')
+        distintos = cursor.fetchone()[0]
+
+        ahora = timezone.now()
+        tabla = _tabla(Apicultor)
+        nombre, apellido = _columna(Apicultor, 'nombre'), _columna(Apicultor, 'apellido')
+        creado, actualizado = _columna(Apicultor, 'created_at'), _columna(Apicultor, 'updated_at')
+        cursor.execute(
+            f'INSERT INTO {tabla} ({nombre}, {apellido}, {creado}, {actualizado}) '
+            f'SELECT s.nombre, s.apellido, %s, %s FROM {self.tabla_staging} s '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {tabla} a WHERE a.{nombre} = s.nombre AND a.{apellido} = s.apellido)',
+            [ahora, ahora]
+        )
+        return {'creados': cursor.rowcount, 'existentes': distintos - cursor.rowcount}
+
+    def finalizar(self, resumen):
+        resumenes.recontar_total('apicultores')
+
+
+class ImportadorApiarios(Importador):
+    """
+    Columnas: apicultor_nombre, apicultor_apellido, nombre_apiario, cant_colmenas,
+    localidad, latitud, longitud
+
+    El apicultor debe existir. Un apiario existente (mismo apicultor y nombre) se
+    actualiza; las coordenadas vacías no pisan las existentes.
+    """
+    tipo = 'apiarios'
+    tablas = (Apiario,)
+    columnas = {
+        'apicultor_nombre': _texto(100),
+        'apicultor_apellido': _texto(100),
+        'nombre_apiario': _texto(100),
+        'cant_colmenas': _entero(minimo=1),
+        'localidad': _texto(100),
+        'latitud': _coordenada(90),
+        'longitud': _coordenada(180),
+    }
+    opcionales = ('latitud', 'longitud')
+    staging = [
+        ('apicultor_nombre', 'varchar(100)'),
+        ('apicultor_apellido', 'varchar(100)'),
+        ('nombre_apiario', 'varchar(100)'),
+        ('cant_colmenas', 'integer'),
+        ('localidad', 'varchar(100)'),
+        ('latitud', 'numeric(10, 8)'),
+        ('longitud', 'numeric(11, 8)'),
+        ('apicultor_id', 'integer'),
+        ('coincidencias', 'integer'),
+        ('apiario_id', 'integer'),
+    ]
+
+    def fusionar(self, cursor, errores):
+        st = self.tabla_staging
+        apicultor, apiario = _tabla(Apicultor), _tabla(Apiario)
+        nombre, apellido = _columna(Apicultor, 'nombre'), _columna(Apicultor, 'apellido')
+        pk_apicultor = _columna(Apicultor, 'id')
+        id_apiario, id_apicultor = _columna(Apiario, 'id'), _columna(Apiario, 'apicultor')
+        nombre_apiario, colmenas = _columna(Apiario, 'nombre_apiario'), _columna(Apiario, 'cant_colmenas')
+        localidad, geohash = _columna(Apiario, 'localidad'), _columna(Apiario, 'geohash')
+        latitud, longitud = _columna(Apiario, 'latitud'), _columna(Apiario, 'longitud')
+        creado, actualizado = _columna(Apiario, 'created_at'), _columna(Apiario, 'updated_at')
+
+        # Resolver el apicultor por nombre y apellido
+        cursor.execute(
+            f'UPDATE {st} SET apicultor_id = a.id, coincidencias = a.cantidad '
+            f'FROM (SELECT {nombre} AS nombre, {apellido} AS apellido, '
+            f'MIN({pk_apicultor}) AS id, COUNT(*) AS cantidad FROM {apicultor} GROUP BY {nombre}, {apellido}) a '
+            f'WHERE a.nombre = {st}.apicultor_nombre AND a.apellido = {st}.apicultor_apellido'
+        )
+        self.descartar(cursor, 'apicultor_id IS NULL', 'Apicultor inexistente', errores)
+        self.descartar(cursor, 'coincidencias > 1', 'Hay más de un apicultor con ese nombre y apellido', errores)
+        self.quitar_repetidas(cursor, 'apicultor_id', 'nombre_apiario')
+
+        cursor.execute(
+            f'UPDATE {st} SET apiario_id = p.id '
+            f'FROM (SELECT {id_apicultor} AS apicultor_id, {nombre_apiario} AS nombre_apiario, '
+            f'MIN({id_apiario}) AS id FROM {apiario} GROUP BY {id_apicultor}, {nombre_apiario}) p '
+            f'WHERE p.apicultor_id = {st}.apicultor_id AND p.nombre_apiario = {st}.nombre_apiario'
+        )
+
+        ahora = timezone.now()
+        cursor.execute(
+            f'UPDATE {apiario} SET {colmenas} = s.cant_colmenas, {localidad} = s.localidad, '
+            f'{latitud} = COALESCE(s.latitud, {apiario}.{latitud}), '
+            f'{longitud} = COALESCE(s.longitud, {apiario}.{longitud}), {actualizado} = %s '
+            f'FROM {st} s WHERE s.apiario_id = {apiario}.{id_apiario}',
+            [ahora]
+        )
+        actualizados = cursor.rowcount
+
+        cursor.execute(
+            f'INSERT INTO {apiario} ({id_apicultor}, {nombre_apiario}, {colmenas}, {localidad}, '
+            f'{latitud}, {longitud}, {geohash}, {creado}, {actualizado}) '
+            f'SELECT apicultor_id, nombre_apiario, cant_colmenas, localidad, latitud, longitud, %s, %s, %s '
+            f'FROM {st} WHERE apiario_id IS NULL',
+            ['', ahora, ahora]
+        )
+        creados = cursor.rowcount
+
+        # El geohash se calcula en Python (Apiario.save no corre en la fusión)
+        cursor.execute(
+            f'SELECT p.{id_apiario}, p.{latitud}, p.{longitud}, p.{geohash} FROM {apiario} p JOIN {st} s '
+            f'ON s.apicultor_id = p.{id_apicultor} AND s.nombre_apiario = p.{nombre_apiario}'
+        )
+        cambios = [
+            (apiario_id, anterior, nuevo) for apiario_id, lat, lon, anterior in cursor.fetchall()
+            if (nuevo := geo.codificar(lat, lon)) != anterior
+        ]
+        cursor.executemany(
+            f'UPDATE {apiario} SET {geohash} = %s WHERE {id_apiario} = %s',
+            [(nuevo, apiario_id) for apiario_id, _, nuevo in cambios]
+        )
+        mapas.mover_apiarios(cambios)
+        return {'creados': creados, 'actualizados': actualizados}
+
+    def finalizar(self, resumen):
+        resumenes.recontar_total('apiarios')
+
+
+class ImportadorTambores(Importador):
+    """
+    Columnas: num_registro, fecha_de_extraccion y, opcionalmente, el apiario de
+    origen (apicultor_nombre, apicultor_apellido, nombre_apiario)
+
+    Un tambor de varios apiarios se importa con una fila por apiario. Los tambores
+    existentes actualizan su fecha de extracción si la fila la trae.
+    """
+    tipo = 'tambores'
+    tablas = (MuestraTambor, TamborApiario)
+    columnas = {
+        'num_registro': _texto(50),
+        'fecha_de_extraccion': _fecha,
+        'apicultor_nombre': _texto(100, requerido=False),
+        'apicultor_apellido': _texto(100, requerido=False),
+        'nombre_apiario': _texto(100, requerido=False),
+    }
+    opcionales = ('fecha_de_extraccion', 'apicultor_nombre', 'apicultor_apellido', 'nombre_apiario')
+    staging = [
+        ('num_registro', 'varchar(50)'),
+        ('fecha_de_extraccion', 'date'),
+        ('apicultor_nombre', 'varchar(100)'),
+        ('apicultor_apellido', 'varchar(100)'),
+        ('nombre_apiario', 'varchar(100)'),
+        ('apiario_id', 'integer'),
+        ('coincidencias', 'integer'),
+    ]
+    campos_apiario = ('apicultor_nombre', 'apicultor_apellido', 'nombre_apiario')
+
+    def __init__(self):
+        super().__init__()
+        # Mayor num_registro numérico importado, para ajustar la numeración automática
+        self.mayor_registro = 0
+
+    def validar_fila(self, fila):
+        informados = [campo for campo in self.campos_apiario if fila[campo]]
+        if informados and len(informados) < len(self.campos_apiario):
+            faltantes = [campo for campo in self.campos_apiario if not fila[campo]]
+            return [f"Para vincular un apiario faltan: {', '.join(faltantes)}"]
+        return []
+
+    def fusionar(self, cursor, errores):
+        st = self.tabla_staging
+        apicultor, apiario = _tabla(Apicultor), _tabla(Apiario)
+        tambor, vinculo = _tabla(MuestraTambor), _tabla(TamborApiario)
+        nombre, apellido = _columna(Apicultor, 'nombre'), _columna(Apicultor, 'apellido')
+        id_apicultor, nombre_apiario = _columna(Apiario, 'apicultor'), _columna(Apiario, 'nombre_apiario')
+        id_tambor, id_apiario = _columna(TamborApiario, 'tambor'), _columna(TamborApiario, 'apiario')
+
+        # Resolver el apiario por apicultor y nombre
+        cursor.execute(
+            f'UPDATE {st} SET apiario_id = p.id, coincidencias = p.cantidad '
+            f'FROM (SELECT a.{nombre} AS nombre, a.{apellido} AS apellido, p.{nombre_apiario} AS nombre_apiario, '
+            f'MIN(p.id) AS id, COUNT(*) AS cantidad '
+            f'FROM {apiario} p JOIN {apicultor} a ON a.id = p.{id_apicultor} '
+            f'GROUP BY a.{nombre}, a.{apellido}, p.{nombre_apiario}) p '
+            f'WHERE p.nombre = {st}.apicultor_nombre AND p.apellido = {st}.apicultor_apellido '
+            f'AND p.nombre_apiario = {st}.nombre_apiario'
+        )
+        self.descartar(
+            cursor, 'nombre_apiario IS NOT NULL AND apiario_id IS NULL', 'Apiario inexistente', errores
+        )
+        self.descartar(cursor, 'coincidencias > 1', 'Hay más de un apiario con ese nombre y apicultor', errores)
+
+        ultimas = f'(SELECT MAX(fila) FROM {st} GROUP BY num_registro)'
+        ahora = timezone.now()
+        cursor.execute(
+            f'UPDATE {tambor} SET fecha_de_extraccion = COALESCE(s.fecha_de_extraccion, {tambor}.fecha_de_extraccion), '
+            f'updated_at = %s FROM {st} s WHERE s.num_registro = {tambor}.num_registro AND s.fila IN {ultimas}',
+            [ahora]
+        )
+        actualizados = cursor.rowcount
+
+        cursor.execute(
+            f'INSERT INTO {tambor} (num_registro, estado_analisis_palinologico, fecha_de_extraccion, '
+            f'created_at, updated_at) '
+            f'SELECT num_registro, %s, fecha_de_extraccion, %s, %s FROM {st} WHERE fila IN {ultimas} '
+            f'ON CONFLICT (num_registro) DO NOTHING',
+            [False, ahora, ahora]
+        )
+        creados = cursor.rowcount
+
+        # Vínculos nuevos de tambores que ya tienen análisis físico-químicos (afectan el resumen de humedad)
+        nuevos = (
+            f'FROM {st} s JOIN {tambor} t ON t.num_registro = s.num_registro '
+            f'WHERE s.apiario_id IS NOT NULL AND NOT EXISTS ('
+            f'SELECT 1 FROM {vinculo} v WHERE v.{id_tambor} = t.id AND v.{id_apiario} = s.apiario_id)'
+        )
+        cursor.execute(
+            f'SELECT DISTINCT t.id, s.apiario_id {nuevos} AND EXISTS ('
+            f'SELECT 1 FROM {_tabla(AnalisisFisicoQuimico)} f '
+            f'WHERE f.{_columna(AnalisisFisicoQuimico, "tambor")} = t.id)'
+        )
+        con_analisis = cursor.fetchall()
+
+        cursor.execute(
+            f'INSERT INTO {vinculo} ({id_tambor}, {id_apiario}, fecha_asignacion) '
+            f'SELECT d.tambor_id, d.apiario_id, %s FROM ('
+            f'SELECT DISTINCT t.id AS tambor_id, s.apiario_id {nuevos}) d WHERE true '
+            f'ON CONFLICT ({id_tambor}, {id_apiario}) DO NOTHING',
+            [timezone.localdate()]
+        )
+        vinculos = cursor.rowcount
+        for tambor_id, apiario_id in con_analisis:
+            resumenes.aplicar_vinculo_tambor_apiario(tambor_id, apiario_id, 1)
+
+        # Fechas y vínculos nuevos cambian el reparto de los pools que ya tienen estos tambores
+        contiene = _tabla(ContienePool)
+        cursor.execute(
+            f'SELECT DISTINCT c.{_columna(ContienePool, "pool")} FROM {contiene} c '
+            f'JOIN {tambor} t ON t.id = c.{_columna(ContienePool, "tambor")} '
+            f'JOIN {st} s ON s.num_registro = t.num_registro'
+        )
+        series.actualizar_pools(pool_id for (pool_id,) in cursor.fetchall())
+
+        cursor.execute(f'SELECT num_registro FROM {st}')
+        numericos = [int(numero) for (numero,) in cursor.fetchall() if numero.isdigit()]
+        self.mayor_registro = max([self.mayor_registro] + numericos)
+
+        return {'creados': creados, 'actualizados': actualizados, 'vinculos_creados': vinculos}
+
+    def finalizar(self, resumen):
+        resumenes.recontar_total('tambores')
+        if self.mayor_registro:
+            registros.avanzar_hasta('muestra_tambor', self.mayor_registro)
+
+
+IMPORTADORES = {
+    importador.tipo: importador
+    for importador in (ImportadorApicultores, ImportadorApiarios, ImportadorTambores)
+}
+
+
+def lineas_de_archivo(archivo):
+    """Itera las líneas de texto de un archivo subido (UTF-8, con o sin BOM)"""
+    return codecs.iterdecode(archivo, 'utf-8-sig')
+
+
+def guardar_subida(tipo, archivo):
+    """
+    Controla el encabezado de un CSV subido y lo guarda en el storage por defecto
+    para importarlo en segundo plano
+
+    Returns:
+        str: Ruta del archivo en el storage
+
+    Raises:
+        ValueError, UnicodeDecodeError: Si el tipo o el encabezado son inválidos
+    """
+    primera = next(iter(lineas_de_archivo(archivo)), '')
+    verificar_encabezado(tipo, next(csv.reader([primera]), None))
+    archivo.seek(0)
+    return default_storage.save(f'{CARPETA_SUBIDAS}/{tipo}.csv', archivo)
+
+
+def verificar_tipo(tipo):
+    """
+    Raises:
+        ValueError: Si el tipo de importación no existe
+    """
+    if tipo not in IMPORTADORES:
+        raise ValueError(f"Tipo de importación desconocido: {tipo}. Opciones: {', '.join(IMPORTADORES)}")
+    return tipo
+
+
+def verificar_encabezado(tipo, encabezado):
+    """
+    Normaliza los nombres de columna y controla que estén las obligatorias
+
+    Returns:
+        list: Nombres de columna en minúsculas y sin espacios
+
+    Raises:
+        ValueError: Si el encabezado está vacío o faltan columnas obligatorias
+    """
+    importador = IMPORTADORES[verificar_tipo(tipo)]
+    if not encabezado:
+        raise ValueError('El archivo está vacío')
+    encabezado = [nombre.strip().lower() for nombre in encabezado]
+    faltantes = [
+        columna for columna in importador.columnas
+        if columna not in encabezado and columna not in importador.opcionales
+    ]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+    return encabezado
+
+
+def importar_csv(tipo, lineas, tamano_lote=TAMANO_LOTE, progreso=None):
+    """
+    Importa un CSV completo, lote por lote
+
+    Args:
+        tipo (str): Clave de IMPORTADORES
+        lineas (iterable): Líneas de texto del CSV, con encabezado
+        tamano_lote (int): Filas por lote
+        progreso (callable): Opcional, recibe la cantidad de filas procesadas después de cada lote
+
+    Returns:
+        dict: Contadores de la importación y errores por número de línea
+
+    Raises:
+        ValueError: Si el tipo es desconocido o faltan columnas obligatorias
+    """
+    importador = IMPORTADORES[verificar_tipo(tipo)]()
+    lector = csv.DictReader(lineas)
+    lector.fieldnames = verificar_encabezado(tipo, lector.fieldnames)
+
+    resumen = {'tipo': tipo, 'filas': 0, 'filas_con_error': 0}
+    errores_reportados = []
+    # La línea 1 es el encabezado
+    filas = ((lector.line_num, fila) for fila in lector)
+
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            break
+        resumen['filas'] += len(lote)
+
+        validas, errores = importador.validar(lote)
+        if validas:
+            try:
+                # Si algo falla, el rollback descarta también la tabla temporal
+                with transaction.atomic(), connection.cursor() as cursor:
+                    importador.cargar(cursor, validas)
+                    contadores = importador.fusionar(cursor, errores)
+                    cursor.execute(f'DROP TABLE {importador.tabla_staging}')
+                    versiones.incrementar_tablas(*importador.tablas)
+                for clave, valor in contadores.items():
+                    resumen[clave] = resumen.get(clave, 0) + valor
+            except DatabaseError as e:
+                logger.exception("Error al fusionar un lote de la importación de %s", tipo)
+                for linea, *_ in validas:
+                    errores[linea].append(f'Error de base de datos en el lote: {e}')
+
+        resumen['filas_con_error'] += len(errores)
+        for linea in sorted(errores):
+            if len(errores_reportados) < MAX_ERRORES:
+                errores_reportados.append({'fila': linea, 'errores': errores[linea]})
+        if progreso:
+            progreso(resumen['filas'])
+
+    importador.finalizar(resumen)
+    resumen['errores'] = errores_reportados
+    return resumen
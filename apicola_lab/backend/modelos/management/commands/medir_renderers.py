@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from modelos import compresion, renderers
+from modelos.views import AnalisisPalinologicoViewSet, EstadisticasView
+
+
+class Command(BaseCommand):
+    help = 'Compara tiempo y tamaño de los renderers sobre el listado de análisis y las estadísticas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeticiones', type=int, default=50,
+            help='Veces que se renderiza cada payload (se informa el mejor tiempo y la media)'
+        )
+        parser.add_argument(
+            '--filas', type=int, default=5000,
+            help='Filas del listado de análisis; se repiten las existentes hasta alcanzarlas (0 = sin repetir)'
+        )
+
+    def handle(self, *args, **options):
+        candidatos = [('JSONRenderer (DRF)', JSONRenderer()), ('OrjsonRenderer', renderers.OrjsonRenderer())]
+        if renderers.msgpack is not None:
+            candidatos.append(('MessagePackRenderer', renderers.MessagePackRenderer()))
+        else:
+            self.stdout.write('msgpack no está instalado: se omite MessagePackRenderer')
+
+        for nombre, datos in (
+            ('analisis palinologicos', self._listado(options['filas'])),
+            ('estadisticas', self._estadisticas()),
+        ):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{nombre}'))
+            self.stdout.write(
+                f"{'renderer':<22}{'mejor ms':>10}{'media ms':>10}{'bytes':>11}{'gzip':>10}"
+                + (f"{'br':>10}" if compresion.brotli is not None else '')
+            )
+            for etiqueta, renderer in candidatos:
+                self.stdout.write(self._medir(etiqueta, renderer, datos, options['repeticiones']))
+
+    def _listado(self, filas):
+        request = APIRequestFactory().get('/api/analisis-palinologicos/')
+        datos = AnalisisPalinologicoViewSet.as_view({'get': 'list'})(request).data
+        filas_originales = datos['results'] if isinstance(datos, dict) else list(datos)
+        if filas and filas_originales:
+            vueltas = -(-filas // len(filas_originales))
+            return (filas_originales * vueltas)[:filas]
+        return filas_originales
+
+    def _estadisticas(self):
+        request = APIRequestFactory().get('/api/estadisticas/')
+        return EstadisticasView.as_view()(request).data
+
+    def _medir(self, etiqueta, renderer, datos, repeticiones):
+        tiempos = []
+        for _ in range(max(repeticiones, 1)):
+            inicio = time.perf_counter()
+            contenido = renderer.render(datos, renderer.media_type, {})
+            tiempos.append(time.perf_counter() - inicio)
+
+        linea = (
+            f'{etiqueta:<22}{min(tiempos) * 1000:>10.2f}{sum(tiempos) / len(tiempos) * 1000:>10.2f}'
+            f'{len(contenido):>11}{len(compress_string(contenido)):>10}'
+        )
+        if compresion.brotli is not None:
+            linea += f'{len(compresion.brotli.compress(contenido, quality=compresion.CALIDAD_BROTLI)):>10}'
+        return linea
@@ -0,0 +1,55 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from modelos import trabajos
+
+
+class Command(BaseCommand):
+    help = 'Procesa los trabajos en segundo plano encolados en la tabla trabajo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo', type=float, default=2.0,
+            help='Segundos de espera cuando no hay trabajos disponibles'
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help='Procesar los trabajos disponibles y terminar'
+        )
+        parser.add_argument(
+            '--max-trabajos', type=int, default=0,
+            help='Terminar después de procesar esta cantidad de trabajos (0 = sin límite)'
+        )
+
+    def handle(self, *args, **options):
+        self.detener = False
+        # SIGTERM/SIGINT terminan el trabajo en curso antes de salir
+        signal.signal(signal.SIGTERM, self._pedir_detencion)
+        signal.signal(signal.SIGINT, self._pedir_detencion)
+
+        trabajador = trabajos.nombre_trabajador()
+        procesados = 0
+        self.stdout.write(f'Trabajador {trabajador} iniciado')
+
+        while not self.detener:
+            close_old_connections()
+            trabajo = trabajos.tomar_trabajo(trabajador)
+            if trabajo is None:
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f'Procesando trabajo {trabajo.id} ({trabajo.tipo}), intento {trabajo.intentos}')
+            trabajos.ejecutar(trabajo)
+            procesados += 1
+            if options['max_trabajos'] and procesados >= options['max_trabajos']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'Trabajador {trabajador} detenido, {procesados} trabajos procesados'))
+
+    def _pedir_detencion(self, signum, frame):
+        self.detener = True
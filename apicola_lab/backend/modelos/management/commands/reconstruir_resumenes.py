@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from modelos import resumenes
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde cero las tablas resumen del tablero de estadísticas'
+
+    def handle(self, *args, **options):
+        resumenes.reconstruir_todo()
+        self.stdout.write(self.style.SUCCESS('Resúmenes reconstruidos correctamente'))
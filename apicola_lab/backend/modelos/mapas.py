@@ -0,0 +1,223 @@
+"""
+Mosaicos del mapa con la composición polínica por zona
+
+CeldaPolen guarda los granos de cada especie por celda de geohash en varios
+niveles (largos de prefijo, ver NIVELES), sumando los de los apiarios de cada
+celda. Se alimenta de las series mensuales (modelos/series.py): cada diferencia
+que se aplica a SerieMensualPolen para un apiario se aplica también a las celdas
+de su geohash, y si cambian las coordenadas de un apiario sus granos se mueven de
+celdas. Así un mosaico no recorre análisis, pools ni tambores.
+
+Los mosaicos siguen la numeración z/x/y de los mapas web (Leaflet, OpenLayers).
+Cada uno usa el nivel con unas CELDAS_POR_MOSAICO celdas de ancho y se guarda en
+la caché versionada (ver modelos/cache.py) con la versión de las regiones que
+cubre: un cambio en una región sólo invalida los mosaicos que la tocan.
+"""
+import math
+from collections import defaultdict
+
+from django.db.models import Q, Sum
+
+from . import geo, versiones
+from .cache import mosaicos_mapa
+from .resumenes import incrementar_filas
+from .models.Apiario_model import Apiario
+from .models.SerieMensualPolen_model import SerieMensualPolen
+from .models.CeldaPolen_model import CeldaPolen
+
+# Largos de prefijo que se guardan: de unos 1250 km a 1 km de lado
+NIVELES = (2, 3, 4, 5, 6)
+
+# Las versiones se llevan por región (prefijo de este largo)
+NIVEL_REGION = 2
+
+# Mosaicos que tocan más regiones dependen de la versión general del mapa
+MAX_REGIONES = 16
+
+CELDAS_POR_MOSAICO = 8
+ESPECIES_POR_CELDA = 5
+MAX_ZOOM = 20
+
+# Se incrementa con cualquier cambio (mosaicos de poco zoom) y en cada reconstrucción
+MAPA = 'mapa'
+MAPA_RECONSTRUIDO = 'mapa:reconstruccion'
+
+CAMPOS = ('celda', 'latitud', 'longitud', 'granos', 'especies', 'otras')
+
+
+def celdas_de(geohash):
+    """Celdas de todos los niveles que contienen un geohash ('' si el apiario no tiene coordenadas)"""
+    return [geohash[:nivel] for nivel in NIVELES if len(geohash) >= nivel]
+
+
+def clave_region(celda):
+    return f'mapa:{celda[:NIVEL_REGION]}'
+
+
+def _sumar(deltas_por_celda):
+    """
+    Aplica deltas {(celda, especie_id): granos} de todos los niveles con un upsert
+    por lote e invalida las regiones tocadas
+    """
+    incrementar_filas(
+        CeldaPolen,
+        ('celda', 'nivel', 'especie_id'),
+        {
+            (celda, len(celda), especie_id): {'granos': delta}
+            for (celda, especie_id), delta in deltas_por_celda.items()
+        },
+        conflicto=('celda', 'especie_id')
+    )
+    regiones = {clave_region(celda) for (celda, _), delta in deltas_por_celda.items() if delta}
+    if regiones:
+        versiones.incrementar(MAPA, *regiones)
+
+
+def aplicar(deltas):
+    """
+    Aplica a las celdas las diferencias de granos de los apiarios
+
+    Args:
+        deltas (dict): (especie_id, apiario_id) -> diferencia de granos
+    """
+    geohashes = dict(Apiario.objects.filter(
+        id__in={apiario_id for _, apiario_id in deltas if apiario_id is not None}
+    ).values_list('id', 'geohash'))
+    por_celda = defaultdict(int)
+    for (especie_id, apiario_id), delta in deltas.items():
+        for celda in celdas_de(geohashes.get(apiario_id, '')):
+            por_celda[(celda, especie_id)] += delta
+    _sumar(por_celda)
+
+
+def mover_apiarios(cambios):
+    """
+    Mueve los granos de apiarios cuyas coordenadas cambiaron
+
+    Args:
+        cambios (list): Tuplas (apiario_id, geohash anterior, geohash nuevo)
+    """
+    cambios = {apiario_id: (anterior, nuevo) for apiario_id, anterior, nuevo in cambios if anterior != nuevo}
+    if not cambios:
+        return
+    por_celda = defaultdict(int)
+    for apiario_id, especie_id, granos in SerieMensualPolen.objects.filter(
+        apiario_id__in=list(cambios)
+    ).values('apiario_id', 'especie_id').annotate(total=Sum('granos')).order_by().values_list(
+        'apiario_id', 'especie_id', 'total'
+    ):
+        anterior, nuevo = cambios[apiario_id]
+        for celda in celdas_de(anterior):
+            por_celda[(celda, especie_id)] -= granos
+        for celda in celdas_de(nuevo):
+            por_celda[(celda, especie_id)] += granos
+    _sumar(por_celda)
+
+
+def reconstruir():
+    """Recalcula CeldaPolen desde SerieMensualPolen"""
+    CeldaPolen.objects.all().delete()
+    totales = defaultdict(int)
+    for geohash, especie_id, granos in SerieMensualPolen.objects.filter(
+        apiario__isnull=False
+    ).exclude(apiario__geohash='').values('apiario__geohash', 'especie_id').annotate(
+        total=Sum('granos')
+    ).order_by().values_list('apiario__geohash', 'especie_id', 'total'):
+        for celda in celdas_de(geohash):
+            totales[(celda, especie_id)] += granos
+    CeldaPolen.objects.bulk_create([
+        CeldaPolen(celda=celda, nivel=len(celda), especie_id=especie_id, granos=granos)
+        for (celda, especie_id), granos in totales.items() if granos
+    ], batch_size=1000)
+    versiones.incrementar(MAPA, MAPA_RECONSTRUIDO)
+
+
+# --- Mosaicos ---
+
+def validar_mosaico(z, x, y):
+    """
+    Raises:
+        ValueError: Si z/x/y no es un mosaico válido
+    """
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError(f"El zoom debe estar entre 0 y {MAX_ZOOM}")
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise ValueError(f"En el zoom {z}, x e y deben estar entre 0 y {2 ** z - 1}")
+
+
+def limites_de_mosaico(z, x, y):
+    """(sur, oeste, norte, este) del mosaico en la proyección de los mapas web"""
+    def latitud(fila):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * fila / 2 ** z))))
+    return latitud(y + 1), x / 2 ** z * 360 - 180, latitud(y), (x + 1) / 2 ** z * 360 - 180
+
+
+def nivel_de_zoom(z):
+    """Nivel con unas CELDAS_POR_MOSAICO celdas por ancho de mosaico"""
+    ancho = 360 / 2 ** z / CELDAS_POR_MOSAICO
+    for nivel in NIVELES:
+        if geo.tamano_celda(nivel)[1] <= ancho:
+            return nivel
+    return NIVELES[-1]
+
+
+def claves_de_mosaico(z, x, y):
+    """Claves de versión de las que depende un mosaico"""
+    prefijos = geo.prefijos_de_area(*limites_de_mosaico(z, x, y))
+    if prefijos is not None and len(prefijos[0]) >= NIVEL_REGION:
+        regiones = {clave_region(prefijo) for prefijo in prefijos}
+        if len(regiones) <= MAX_REGIONES:
+            return [MAPA_RECONSTRUIDO, *sorted(regiones)]
+    return [MAPA_RECONSTRUIDO, MAPA]
+
+
+def _armar(z, x, y):
+    nivel = nivel_de_zoom(z)
+    sur, oeste, norte, este = limites_de_mosaico(z, x, y)
+    filas = CeldaPolen.objects.filter(nivel=nivel, granos__gt=0)
+    prefijos = geo.prefijos_de_area(sur, oeste, norte, este)
+    if prefijos is not None:
+        if len(prefijos[0]) >= nivel:
+            filas = filas.filter(celda__in={prefijo[:nivel] for prefijo in prefijos})
+        else:
+            condicion = Q(pk__in=[])
+            for prefijo in prefijos:
+                condicion |= Q(celda__startswith=prefijo)
+            filas = filas.filter(condicion)
+
+    especies = defaultdict(list)
+    for celda, especie_id, granos in filas.values_list('celda', 'especie_id', 'granos'):
+        especies[celda].append((granos, especie_id))
+
+    celdas = []
+    for celda in sorted(especies):
+        latitud, longitud = geo.decodificar(celda)
+        # Cada celda va en el mosaico que contiene su centro
+        if not (sur <= latitud < norte and oeste <= longitud < este):
+            continue
+        ordenadas = sorted(especies[celda], key=lambda fila: (-fila[0], fila[1]))
+        total = sum(granos for granos, _ in ordenadas)
+        principales = [[especie_id, granos] for granos, especie_id in ordenadas[:ESPECIES_POR_CELDA]]
+        celdas.append([
+            celda, round(latitud, 5), round(longitud, 5), total, principales,
+            total - sum(granos for _, granos in principales)
+        ])
+    return {'z': z, 'x': x, 'y': y, 'nivel': nivel, 'campos': list(CAMPOS), 'celdas': celdas}
+
+
+def mosaico(z, x, y, claves=None):
+    """
+    Composición polínica de las celdas de un mosaico, desde la caché si está vigente
+
+    Returns:
+        dict: z, x, y, nivel, campos y celdas; cada celda es una lista con los
+            valores de 'campos' y 'especies' son las ESPECIES_POR_CELDA con más
+            granos como [especie_id, granos] ('otras' suma el resto)
+    """
+    version = versiones.obtener(*(claves or claves_de_mosaico(z, x, y)))
+    identificador = f'{z}/{x}/{y}'
+    datos = mosaicos_mapa.get(identificador, version)
+    if datos is None:
+        datos = _armar(z, x, y)
+        mosaicos_mapa.set(identificador, version, datos)
+    return datos
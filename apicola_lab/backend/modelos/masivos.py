@@ -0,0 +1,276 @@
+"""
+Modificaciones y bajas masivas filtradas (ver OperacionesMasivasMixin)
+
+Cada operación corre en una transacción con un único UPDATE o DELETE. Como
+QuerySet.update() y el DELETE directo no disparan las señales de modelos/signals.py,
+los modelos que alimentan resúmenes o versiones de caché leen primero (con bloqueo)
+las filas que van a tocar, escriben con WHERE pk IN (...) y aplican los deltas en bloque.
+
+Los modelos con dependientes (pools, tambores, apiarios) se eliminan con el
+Collector de Django: una consulta DELETE por tabla, con las cascadas y señales de
+cada fila, para que los resúmenes de lo eliminado en cascada queden correctos.
+"""
+from collections import Counter
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, router, transaction
+from django.db.models import ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.deletion import Collector
+from django.db.models.functions import Coalesce, NullIf, Round
+from django.utils import timezone
+
+from . import resumenes, series, versiones
+from .models.MuestraTambor_model import MuestraTambor
+from .models.Pool_model import Pool
+from .models.AnalisisPalinologico_model import AnalisisPalinologico
+from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+
+# Cantidad de ids que se devuelven como muestra en un dry_run
+TAMANO_MUESTRA = 20
+
+VALORES_VERDADEROS = ('true', '1', 'si', 'sí')
+
+
+def es_verdadero(valor):
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in VALORES_VERDADEROS
+
+
+def _convertir(campo, valor):
+    if campo.is_relation:
+        campo = campo.target_field
+    try:
+        return campo.to_python(valor)
+    except ValidationError as e:
+        raise ValueError(f"Valor inválido para '{campo.name}': {valor} ({'; '.join(e.messages)})")
+
+
+def parse_filtros(modelo, datos, permitidos):
+    """
+    Convierte los filtros pedidos en argumentos de QuerySet.filter()
+
+    Args:
+        modelo (Model): Modelo filtrado
+        datos (dict): {'campo': valor} o {'campo__lookup': valor}; los valores de
+            __in pueden ser una lista o un texto separado por comas
+        permitidos (dict): campo -> lookups admitidos por el viewset
+
+    Raises:
+        ValueError: Si no hay filtros o alguno no está permitido o es inválido
+    """
+    if not isinstance(datos, dict) or not datos:
+        raise ValueError("Se requiere al menos un filtro en 'filtros'")
+
+    filtros = {}
+    for clave, valor in datos.items():
+        nombre, _, lookup = clave.partition('__')
+        lookup = lookup or 'exact'
+        if lookup not in permitidos.get(nombre, ()):
+            raise ValueError(f"Filtro no permitido: {clave}")
+        try:
+            campo = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            raise ValueError(f"Filtro no permitido: {clave}")
+
+        if lookup == 'isnull':
+            filtros[clave] = es_verdadero(valor)
+        elif lookup == 'in':
+            if isinstance(valor, str):
+                valor = [parte.strip() for parte in valor.split(',') if parte.strip()]
+            if not isinstance(valor, list) or not valor:
+                raise ValueError(f"'{clave}' debe ser una lista no vacía")
+            filtros[clave] = [_convertir(campo, elemento) for elemento in valor]
+        else:
+            filtros[clave] = _convertir(campo, valor)
+    return filtros
+
+
+def _con_marca_de_tiempo(modelo, cambios):
+    """QuerySet.update() no aplica auto_now: se agrega updated_at explícitamente"""
+    try:
+        modelo._meta.get_field('updated_at')
+    except FieldDoesNotExist:
+        return cambios
+    return {**cambios, 'updated_at': timezone.now()}
+
+
+def _restar_totales(modelo, creados):
+    """Descuenta de los totales y la ventana diaria las filas eliminadas, agrupadas por día"""
+    resumenes.sumar_totales(resumenes.clave_de_modelo(modelo), {
+        fecha: -cantidad for fecha, cantidad in Counter(timezone.localdate(creado) for creado in creados).items()
+    })
+
+
+def borrar_por_ids(modelo, ids):
+    """
+    Elimina filas con DELETE ... WHERE id IN (...) por lote, sin cargar instancias
+    ni disparar señales: quien llama aplica los deltas de lo eliminado
+
+    Returns:
+        int: Filas eliminadas
+    """
+    ids = sorted(ids)
+    if not ids:
+        return 0
+    conexion = connections[router.db_for_write(modelo)]
+    q = conexion.ops.quote_name
+    clave = modelo._meta.pk
+    lote = conexion.ops.bulk_batch_size([clave], ids)
+    eliminadas = 0
+    with conexion.cursor() as cursor:
+        for inicio in range(0, len(ids), lote):
+            parte = ids[inicio:inicio + lote]
+            cursor.execute(
+                f'DELETE FROM {q(modelo._meta.db_table)} WHERE {q(clave.column)} IN ({", ".join(["%s"] * len(parte))})',
+                parte
+            )
+            eliminadas += cursor.rowcount
+    return eliminadas
+
+
+def recalcular_porcentajes(pool_ids):
+    """Recalcula el porcentaje de granos de los análisis palinológicos de los pools con un solo UPDATE"""
+    pool_ids = list(pool_ids)
+    if not pool_ids:
+        return
+    total = AnalisisPalinologico.objects.filter(pool=OuterRef('pool')).values('pool').annotate(
+        total=Sum('cantidad_granos')
+    ).values('total')
+    AnalisisPalinologico.objects.filter(pool_id__in=pool_ids).update(porcentaje=Coalesce(
+        Round(
+            ExpressionWrapper(
+                F('cantidad_granos') * 100.0 / NullIf(Subquery(total), 0), output_field=FloatField()
+            ),
+            2
+        ),
+        Value(0.0),
+        output_field=FloatField()
+    ))
+
+
+# --- Efectos de cada modelo ---
+# Cada función recibe las filas leídas antes de escribir (dicts con los campos
+# indicados en EFECTOS) y los cambios aplicados (None en una baja).
+
+def _pools(filas, cambios):
+    versiones.incrementar_pools(fila['id'] for fila in filas)
+
+
+def _analisis_palinologicos(filas, cambios):
+    if cambios is None:
+        resumenes.aplicar_analisis_palinologicos(
+            [(fila['especie_id'], fila['cantidad_granos']) for fila in filas], []
+        )
+        _restar_totales(AnalisisPalinologico, [fila['created_at'] for fila in filas])
+    elif 'especie' in cambios:
+        especie_id = cambios['especie'].pk
+        resumenes.aplicar_analisis_palinologicos(
+            [(fila['especie_id'], fila['cantidad_granos']) for fila in filas],
+            [(especie_id, fila['cantidad_granos']) for fila in filas]
+        )
+    if cambios is None or 'especie' in cambios:
+        series.actualizar_pools({fila['pool_id'] for fila in filas})
+    if cambios is None:
+        # Los análisis que quedan en cada pool pasan a repartirse el total
+        recalcular_porcentajes({fila['pool_id'] for fila in filas})
+    versiones.incrementar_pools({fila['pool_id'] for fila in filas})
+
+
+def _tambores(filas, cambios):
+    if 'fecha_de_extraccion' in cambios:
+        series.actualizar_pools(series.pools_de_tambores(fila['id'] for fila in filas))
+
+
+def _analisis_fisicoquimicos(filas, cambios):
+    # La humedad y el tambor no se modifican en masa (ver campos_masivos en views.py)
+    if cambios is None:
+        resumenes.aplicar_analisis_fisicoquimicos([(fila['tambor_id'], fila['humedad']) for fila in filas], -1)
+        _restar_totales(AnalisisFisicoQuimico, [fila['created_at'] for fila in filas])
+
+
+# modelo -> (campos a leer antes de escribir, efectos)
+EFECTOS = {
+    Pool: (('id',), _pools),
+    MuestraTambor: (('id',), _tambores),
+    AnalisisPalinologico: (('id', 'pool_id', 'especie_id', 'cantidad_granos', 'created_at'), _analisis_palinologicos),
+    AnalisisFisicoQuimico: (('id', 'tambor_id', 'humedad', 'created_at'), _analisis_fisicoquimicos),
+}
+
+# Modelos sin dependientes que se eliminan con un DELETE directo (sin Collector)
+ELIMINACION_DIRECTA = (AnalisisPalinologico, AnalisisFisicoQuimico)
+
+
+def _leer_previas(queryset):
+    campos, _ = EFECTOS[queryset.model]
+    return list(queryset.select_for_update().order_by('pk').values(*campos))
+
+
+def simular(queryset, eliminar):
+    """
+    Informa qué haría la operación sin escribir nada
+
+    En una baja con cascadas, detalle incluye lo que se eliminaría de cada tabla.
+
+    Raises:
+        ProtectedError, RestrictedError: Si la baja no está permitida
+    """
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:TAMANO_MUESTRA])
+    resultado = {'dry_run': True, 'afectados': queryset.count(), 'ids': ids}
+    if eliminar and queryset.model not in ELIMINACION_DIRECTA:
+        collector = Collector(using=queryset.db)
+        collector.collect(queryset)
+        detalle = Counter({modelo._meta.label: len(instancias) for modelo, instancias in collector.data.items()})
+        for rapido in collector.fast_deletes:
+            detalle[rapido.model._meta.label] += rapido.count()
+        resultado['detalle'] = dict(detalle)
+    return resultado
+
+
+@transaction.atomic
+def actualizar(queryset, cambios):
+    """
+    Aplica los mismos cambios a todas las filas del queryset con un único UPDATE
+
+    Args:
+        cambios (dict): Campo -> valor ya validado (instancias para las FK)
+
+    Returns:
+        dict: {'dry_run': False, 'afectados': filas actualizadas}
+    """
+    modelo = queryset.model
+    cambios_update = _con_marca_de_tiempo(modelo, cambios)
+    if modelo not in EFECTOS:
+        afectados = queryset.update(**cambios_update)
+    else:
+        filas = _leer_previas(queryset)
+        afectados = modelo.objects.filter(pk__in=[fila['id'] for fila in filas]).update(**cambios_update)
+        EFECTOS[modelo][1](filas, cambios)
+    if afectados:
+        versiones.incrementar_tablas(modelo)
+    return {'dry_run': False, 'afectados': afectados}
+
+
+@transaction.atomic
+def eliminar(queryset):
+    """
+    Elimina las filas del queryset
+
+    Returns:
+        dict: {'dry_run': False, 'afectados': filas eliminadas del modelo pedido,
+            'detalle': filas eliminadas por tabla, incluidas las cascadas}
+
+    Raises:
+        ProtectedError, RestrictedError: Si otra tabla impide la baja
+    """
+    modelo = queryset.model
+    if modelo in ELIMINACION_DIRECTA:
+        filas = _leer_previas(queryset)
+        afectados = borrar_por_ids(modelo, [fila['id'] for fila in filas])
+        EFECTOS[modelo][1](filas, None)
+        if afectados:
+            versiones.incrementar_tablas(modelo)
+        return {'dry_run': False, 'afectados': afectados, 'detalle': {modelo._meta.label: afectados}}
+
+    _, detalle = queryset.delete()
+    return {'dry_run': False, 'afectados': detalle.get(modelo._meta.label, 0), 'detalle': detalle}
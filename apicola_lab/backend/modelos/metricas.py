@@ -0,0 +1,285 @@
+"""
+Métricas de requests en formato de exposición de Prometheus
+
+MetricasMiddleware registra, por vista resuelta, la latencia, la cantidad de
+consultas SQL, el tiempo total en la base de datos y el tamaño de la respuesta
+(también de las respuestas en streaming, al cerrarlas).
+Los valores se guardan en memoria del proceso: con varios workers de gunicorn
+cada uno expone sus propios contadores, identificados por la etiqueta pid.
+
+/metrics sólo responde a las direcciones de METRICAS_IPS_PERMITIDAS o a quien
+envíe el token de METRICAS_TOKEN (ver acceso_permitido).
+"""
+import hmac
+import ipaddress
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_BYTES = (1024, 10240, 102400, 1048576, 10485760)
+
+SIN_RUTA = '<sin_ruta>'
+
+
+class Histograma:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * len(buckets)
+        self.suma = 0
+        self.total = 0
+
+    def observar(self, valor):
+        self.suma += valor
+        self.total += 1
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.conteos[i] += 1
+
+    def lineas(self, nombre, etiquetas):
+        lineas = []
+        for limite, conteo in zip(self.buckets, self.conteos):
+            lineas.append(f'{nombre}_bucket{_etiquetas(etiquetas, le=_numero(limite))} {conteo}')
+        lineas.append(f'{nombre}_bucket{_etiquetas(etiquetas, le="+Inf")} {self.total}')
+        lineas.append(f'{nombre}_sum{_etiquetas(etiquetas)} {_numero(self.suma)}')
+        lineas.append(f'{nombre}_count{_etiquetas(etiquetas)} {self.total}')
+        return lineas
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(etiquetas, **extra):
+    pares = list(etiquetas) + list(extra.items())
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in pares) + '}'
+
+
+class RegistroMetricas:
+    """Acumula las métricas de requests del proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.latencia = defaultdict(lambda: Histograma(BUCKETS_LATENCIA))
+            self.consultas = defaultdict(lambda: Histograma(BUCKETS_CONSULTAS))
+            self.tiempo_db = defaultdict(float)
+            self.bytes_respuesta = defaultdict(lambda: Histograma(BUCKETS_BYTES))
+            self.sobre_presupuesto = defaultdict(int)
+
+    def observar(self, vista, metodo, estado, duracion, consultas, tiempo_db, tamano, excedido):
+        with self._lock:
+            self.requests[(vista, metodo, str(estado))] += 1
+            self.latencia[(vista, metodo)].observar(duracion)
+            self.consultas[(vista, metodo)].observar(consultas)
+            self.tiempo_db[(vista, metodo)] += tiempo_db
+            self.bytes_respuesta[(vista, metodo)].observar(tamano)
+            if excedido:
+                self.sobre_presupuesto[(vista, metodo)] += 1
+
+    def exportar(self):
+        """Devuelve las métricas en el formato de texto de Prometheus (0.0.4)"""
+        pid = ('pid', os.getpid())
+        lineas = []
+        with self._lock:
+            lineas += [
+                '# HELP apicola_http_requests_total Requests atendidos por vista, método y estado.',
+                '# TYPE apicola_http_requests_total counter',
+            ]
+            for (vista, metodo, estado), total in sorted(self.requests.items()):
+                lineas.append(
+                    f'apicola_http_requests_total'
+                    f'{_etiquetas([pid, ("vista", vista), ("metodo", metodo), ("estado", estado)])} {total}'
+                )
+
+            for nombre, ayuda, datos in (
+                ('apicola_http_request_duration_seconds', 'Latencia de los requests.', self.latencia),
+                ('apicola_db_queries_per_request', 'Consultas SQL por request.', self.consultas),
+                ('apicola_http_response_bytes', 'Tamaño del cuerpo de la respuesta.', self.bytes_respuesta),
+            ):
+                lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} histogram']
+                for (vista, metodo), histograma in sorted(datos.items()):
+                    lineas += histograma.lineas(nombre, [pid, ('vista', vista), ('metodo', metodo)])
+
+            lineas += [
+                '# HELP apicola_db_time_seconds_total Tiempo acumulado en consultas SQL.',
+                '# TYPE apicola_db_time_seconds_total counter',
+            ]
+            for (vista, metodo), segundos in sorted(self.tiempo_db.items()):
+                lineas.append(
+                    f'apicola_db_time_seconds_total'
+                    f'{_etiquetas([pid, ("vista", vista), ("metodo", metodo)])} {_numero(segundos)}'
+                )
+
+            lineas += [
+                '# HELP apicola_requests_over_query_budget_total Requests que superaron el presupuesto de consultas.',
+                '# TYPE apicola_requests_over_query_budget_total counter',
+            ]
+            for (vista, metodo), total in sorted(self.sobre_presupuesto.items()):
+                lineas.append(
+                    f'apicola_requests_over_query_budget_total'
+                    f'{_etiquetas([pid, ("vista", vista), ("metodo", metodo)])} {total}'
+                )
+
+        lineas += _metricas_cache(pid)
+        return '\n'.join(lineas) + '\n'
+
+
+def _metricas_cache(pid):
+    from .cache import estadisticas_pool, mosaicos_mapa, reportes_pdf
+    from .catalogo import catalogo
+
+    lineas = [
+        '# HELP apicola_cache_requests_total Consultas a las cachés versionadas por resultado.',
+        '# TYPE apicola_cache_requests_total counter',
+    ]
+    for cache in (estadisticas_pool, reportes_pdf, mosaicos_mapa):
+        for resultado, total in (('acierto', cache.aciertos), ('fallo', cache.fallos)):
+            lineas.append(
+                f'apicola_cache_requests_total'
+                f'{_etiquetas([pid, ("cache", cache.prefijo), ("resultado", resultado)])} {total}'
+            )
+    lineas += [
+        '# HELP apicola_catalogo_especies_reconstrucciones_total Veces que se reconstruyó el catálogo de especies.',
+        '# TYPE apicola_catalogo_especies_reconstrucciones_total counter',
+        f'apicola_catalogo_especies_reconstrucciones_total{_etiquetas([pid])} {catalogo.reconstrucciones}',
+    ]
+    if 'modelos.similitud' in sys.modules:
+        indice = sys.modules['modelos.similitud'].indice
+        lineas += [
+            '# HELP apicola_indice_similitud_refrescos_total Veces que se armó el índice de similitud de pools.',
+            '# TYPE apicola_indice_similitud_refrescos_total counter',
+            f'apicola_indice_similitud_refrescos_total{_etiquetas([pid, ("tipo", "completo")])} {indice.reconstrucciones}',
+            f'apicola_indice_similitud_refrescos_total{_etiquetas([pid, ("tipo", "incremental")])} {indice.actualizaciones}',
+        ]
+    return lineas
+
+
+registro = RegistroMetricas()
+
+
+class _ContadorConsultas:
+    """execute_wrapper que cuenta las consultas y mide su duración"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.tiempo += time.perf_counter() - inicio
+
+
+def acceso_permitido(request):
+    """
+    Indica si el request puede leer /metrics
+
+    Se acepta la dirección de origen (REMOTE_ADDR, no X-Forwarded-For, que el
+    cliente puede inventar) si cae en alguna red de METRICAS_IPS_PERMITIDAS, o el
+    encabezado Authorization: Bearer <METRICAS_TOKEN> si el token está configurado.
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if token:
+        tipo, _, enviado = request.headers.get('Authorization', '').partition(' ')
+        if tipo.lower() == 'bearer' and hmac.compare_digest(enviado.strip().encode(), token.encode()):
+            return True
+    try:
+        origen = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        origen in ipaddress.ip_network(red.strip(), strict=False)
+        for red in getattr(settings, 'METRICAS_IPS_PERMITIDAS', ()) if red.strip()
+    )
+
+
+class _CuerpoMedido:
+    """Itera el cuerpo de una respuesta en streaming contando sus consultas y sus bytes"""
+
+    def __init__(self, contenido, contador):
+        self.contenido = iter(contenido)
+        self.contador = contador
+        self.bytes = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with connection.execute_wrapper(self.contador):
+            trozo = next(self.contenido)
+        self.bytes += len(trozo)
+        return trozo
+
+
+class MetricasMiddleware:
+    """
+    Mide cada request y marca los que superan METRICAS_PRESUPUESTO_CONSULTAS
+
+    Las respuestas en streaming (exportaciones, ZIP de reportes) consultan la base
+    mientras se envía el cuerpo: se registran al cerrar la respuesta, con las
+    consultas del cuerpo y la latencia hasta el último byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = _ContadorConsultas()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(contador):
+            response = self.get_response(request)
+
+        if response.streaming:
+            cuerpo = _CuerpoMedido(response.streaming_content, contador)
+            response.streaming_content = cuerpo
+            response._resource_closers.append(
+                lambda: self.registrar(request, response, contador, inicio, cuerpo.bytes)
+            )
+        else:
+            self.registrar(request, response, contador, inicio, len(response.content))
+
+        if settings.DEBUG:
+            response['X-DB-Queries'] = str(contador.consultas)
+            response['X-DB-Time-Ms'] = f'{contador.tiempo * 1000:.1f}'
+        return response
+
+    def registrar(self, request, response, contador, inicio, tamano):
+        duracion = time.perf_counter() - inicio
+        match = getattr(request, 'resolver_match', None)
+        vista = (match.view_name or match._func_path) if match else SIN_RUTA
+
+        presupuesto = getattr(settings, 'METRICAS_PRESUPUESTO_CONSULTAS', 50)
+        excedido = contador.consultas > presupuesto
+        if excedido:
+            logger.warning(
+                "%s %s (%s) ejecutó %d consultas SQL, presupuesto %d",
+                request.method, request.path, vista, contador.consultas, presupuesto
+            )
+
+        registro.observar(
+            vista, request.method, response.status_code, duracion,
+            contador.consultas, contador.tiempo, tamano, excedido
+        )
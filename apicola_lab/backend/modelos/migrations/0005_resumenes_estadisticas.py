@@ -0,0 +1,127 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:19
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def construir_resumenes(apps, schema_editor):
+    """Carga inicial de las tablas resumen con los datos existentes"""
+    totales = {
+        'apicultores': 'Apicultor',
+        'apiarios': 'Apiario',
+        'tambores': 'MuestraTambor',
+        'pools': 'Pool',
+        'analisis_palinologicos': 'AnalisisPalinologico',
+        'analisis_fisicoquimicos': 'AnalisisFisicoQuimico',
+    }
+    ResumenTotal = apps.get_model('modelos', 'ResumenTotal')
+    ResumenEspecie = apps.get_model('modelos', 'ResumenEspecie')
+    ResumenHumedadApiario = apps.get_model('modelos', 'ResumenHumedadApiario')
+    ResumenDiario = apps.get_model('modelos', 'ResumenDiario')
+    AnalisisPalinologico = apps.get_model('modelos', 'AnalisisPalinologico')
+    AnalisisFisicoQuimico = apps.get_model('modelos', 'AnalisisFisicoQuimico')
+
+    for clave, nombre in totales.items():
+        ResumenTotal.objects.create(clave=clave, valor=apps.get_model('modelos', nombre).objects.count())
+
+    ResumenEspecie.objects.bulk_create([
+        ResumenEspecie(especie_id=fila['especie'], total_analisis=fila['total'], total_granos=fila['granos'] or 0)
+        for fila in AnalisisPalinologico.objects.values('especie').annotate(
+            total=Count('id'), granos=Sum('cantidad_granos')
+        ).order_by()
+    ])
+
+    ResumenHumedadApiario.objects.bulk_create([
+        ResumenHumedadApiario(
+            apiario_id=fila['tambor__apiarios'],
+            cantidad_analisis=fila['total'],
+            cantidad_humedad=fila['con_humedad'],
+            suma_humedad=fila['suma'] or 0
+        )
+        for fila in AnalisisFisicoQuimico.objects.filter(tambor__apiarios__isnull=False).values(
+            'tambor__apiarios'
+        ).annotate(total=Count('id'), con_humedad=Count('humedad'), suma=Sum('humedad')).order_by()
+    ])
+
+    for clave in ('pools', 'analisis_palinologicos', 'analisis_fisicoquimicos'):
+        modelo = apps.get_model('modelos', totales[clave])
+        ResumenDiario.objects.bulk_create([
+            ResumenDiario(fecha=fila['fecha'], clave=clave, cantidad=fila['cantidad'])
+            for fila in modelo.objects.annotate(fecha=TruncDate('created_at')).values('fecha').annotate(
+                cantidad=Count('id')
+            ).order_by()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0004_muestratambor_estado_analisis_palinologico'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=50, unique=True)),
+                ('valor', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Resumen Total',
+                'verbose_name_plural': 'Resúmenes Totales',
+                'db_table': 'resumen_total',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenHumedadApiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad_analisis', models.BigIntegerField(default=0)),
+                ('cantidad_humedad', models.BigIntegerField(default=0, help_text='Análisis con humedad informada')),
+                ('suma_humedad', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('apiario', models.OneToOneField(db_column='id_apiario', on_delete=django.db.models.deletion.CASCADE, related_name='resumen_humedad', to='modelos.apiario')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Humedad por Apiario',
+                'verbose_name_plural': 'Resúmenes de Humedad por Apiario',
+                'db_table': 'resumen_humedad_apiario',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('clave', models.CharField(max_length=50)),
+                ('cantidad', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario',
+                'verbose_name_plural': 'Resúmenes Diarios',
+                'db_table': 'resumen_diario',
+                'unique_together': {('fecha', 'clave')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenEspecie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_analisis', models.BigIntegerField(default=0)),
+                ('total_granos', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('especie', models.OneToOneField(db_column='id_especie', on_delete=django.db.models.deletion.CASCADE, related_name='resumen', to='modelos.especie')),
+            ],
+            options={
+                'verbose_name': 'Resumen por Especie',
+                'verbose_name_plural': 'Resúmenes por Especie',
+                'db_table': 'resumen_especie',
+                'indexes': [models.Index(fields=['-total_analisis'], name='idx_resumen_especie_total')],
+            },
+        ),
+        migrations.RunPython(construir_resumenes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+SECUENCIAS = {
+    'pool': 'Pool',
+    'muestra_tambor': 'MuestraTambor',
+    'analisis_fisicoquimico': 'AnalisisFisicoQuimico',
+}
+
+
+def _ultimo_numerico(modelo):
+    numeros = [
+        int(num_registro)
+        for num_registro in modelo.objects.exclude(num_registro__isnull=True).values_list('num_registro', flat=True)
+        if num_registro and num_registro.isdigit()
+    ]
+    return max(numeros, default=0)
+
+
+def crear_secuencias(apps, schema_editor):
+    """Inicia cada secuencia (o contador) después del mayor num_registro numérico existente"""
+    ContadorRegistro = apps.get_model('modelos', 'ContadorRegistro')
+    for nombre, modelo in SECUENCIAS.items():
+        ultimo = _ultimo_numerico(apps.get_model('modelos', modelo))
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(
+                f'CREATE SEQUENCE IF NOT EXISTS registro_{nombre}_seq START WITH {ultimo + 1}'
+            )
+        else:
+            ContadorRegistro.objects.create(nombre=nombre, ultimo=ultimo)
+
+
+def eliminar_secuencias(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for nombre in SECUENCIAS:
+            schema_editor.execute(f'DROP SEQUENCE IF EXISTS registro_{nombre}_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0006_version_datos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorRegistro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('ultimo', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador de Registro',
+                'verbose_name_plural': 'Contadores de Registro',
+                'db_table': 'contador_registro',
+            },
+        ),
+        migrations.AlterField(
+            model_name='muestratambor',
+            name='num_registro',
+            field=models.CharField(blank=True, help_text='Si se deja vacío se asigna el próximo número de registro', max_length=50, unique=True),
+        ),
+        migrations.RunPython(crear_secuencias, eliminar_secuencias),
+    ]
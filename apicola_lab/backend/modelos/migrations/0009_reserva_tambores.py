@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0008_trabajo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='muestratambor',
+            name='reservado_hasta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='muestratambor',
+            name='reservado_por',
+            field=models.ForeignKey(blank=True, db_column='id_reservado_por', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tambores_reservados', to='modelos.analista'),
+        ),
+        migrations.AddIndex(
+            model_name='muestratambor',
+            index=models.Index(condition=models.Q(('estado_analisis_palinologico', False)), fields=['id'], name='idx_tambor_disponible'),
+        ),
+    ]
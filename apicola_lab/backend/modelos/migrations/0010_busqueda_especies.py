@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:49
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def _normalizar(*textos):
+    unido = ' '.join(texto for texto in textos if texto)
+    sin_acentos = ''.join(
+        caracter for caracter in unicodedata.normalize('NFKD', unido.lower())
+        if not unicodedata.combining(caracter)
+    )
+    return _NO_ALFANUMERICO.sub(' ', sin_acentos).strip()
+
+
+def completar_nombre_busqueda(apps, schema_editor):
+    """Calcula nombre_busqueda de las especies existentes"""
+    Especie = apps.get_model('modelos', 'Especie')
+    especies = list(Especie.objects.only('nombre_cientifico', 'nombre_comun', 'familia'))
+    for especie in especies:
+        especie.nombre_busqueda = _normalizar(especie.nombre_cientifico, especie.nombre_comun, especie.familia)
+    Especie.objects.bulk_update(especies, ['nombre_busqueda'], batch_size=1000)
+
+
+def crear_indice_trigramas(apps, schema_editor):
+    """Índice GIN de pg_trgm para LIKE y word_similarity sobre nombre_busqueda (sólo PostgreSQL)"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_especies_busqueda_trgm '
+            'ON especies USING gin (nombre_busqueda gin_trgm_ops)'
+        )
+
+
+def eliminar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS idx_especies_busqueda_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0009_reserva_tambores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='especie',
+            name='nombre_busqueda',
+            field=models.CharField(blank=True, default='', editable=False, max_length=360),
+        ),
+        migrations.RunPython(completar_nombre_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_trigramas, eliminar_indice_trigramas),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:55
+
+from collections import defaultdict
+from fractions import Fraction
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def construir_series(apps, schema_editor):
+    """Carga inicial de las series con los análisis existentes (mismo reparto que modelos/series.py)"""
+    ContienePool = apps.get_model('modelos', 'ContienePool')
+    TamborApiario = apps.get_model('modelos', 'TamborApiario')
+    AnalisisPalinologico = apps.get_model('modelos', 'AnalisisPalinologico')
+    SerieMensualPolen = apps.get_model('modelos', 'SerieMensualPolen')
+    AporteSeriePool = apps.get_model('modelos', 'AporteSeriePool')
+
+    apiarios = defaultdict(list)
+    for tambor_id, apiario_id in TamborApiario.objects.order_by('apiario_id').values_list('tambor_id', 'apiario_id'):
+        apiarios[tambor_id].append(apiario_id)
+    tambores = defaultdict(list)
+    for pool_id, tambor_id, mes in ContienePool.objects.filter(
+        tambor__fecha_de_extraccion__isnull=False
+    ).annotate(mes=TruncMonth('tambor__fecha_de_extraccion')).values_list('pool_id', 'tambor_id', 'mes'):
+        tambores[pool_id].append((tambor_id, mes.isoformat()))
+
+    pesos = {}
+    for pool_id, lista in tambores.items():
+        pesos[pool_id] = defaultdict(Fraction)
+        for tambor_id, mes in lista:
+            destinos = apiarios.get(tambor_id) or [None]
+            for apiario_id in destinos:
+                pesos[pool_id][(mes, apiario_id)] += Fraction(1, len(lista) * len(destinos))
+
+    aportes = defaultdict(dict)
+    for pool_id, especie_id, cantidad in AnalisisPalinologico.objects.filter(
+        pool_id__in=list(pesos)
+    ).values_list('pool_id', 'especie_id', 'cantidad_granos'):
+        exactos = {clave: (cantidad or 0) * peso for clave, peso in pesos[pool_id].items()}
+        enteros = {clave: int(valor) for clave, valor in exactos.items()}
+        faltan = (cantidad or 0) - sum(enteros.values())
+        for clave in sorted(exactos, key=lambda c: (enteros[c] - exactos[c], c[0], c[1] or 0))[:faltan]:
+            enteros[clave] += 1
+        for (mes, apiario_id), granos in enteros.items():
+            if granos:
+                clave = (mes, especie_id, apiario_id)
+                aportes[pool_id][clave] = aportes[pool_id].get(clave, 0) + granos
+
+    totales = defaultdict(int)
+    for aporte in aportes.values():
+        for clave, granos in aporte.items():
+            totales[clave] += granos
+    AporteSeriePool.objects.bulk_create([
+        AporteSeriePool(pool_id=pool_id, aportes=[
+            [mes, especie_id, apiario_id, granos]
+            for (mes, especie_id, apiario_id), granos in sorted(aporte.items(), key=lambda i: (i[0][0], i[0][1], i[0][2] or 0))
+        ])
+        for pool_id, aporte in aportes.items() if aporte
+    ], batch_size=1000)
+    SerieMensualPolen.objects.bulk_create([
+        SerieMensualPolen(mes=mes, especie_id=especie_id, apiario_id=apiario_id, granos=granos)
+        for (mes, especie_id, apiario_id), granos in totales.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0010_busqueda_especies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AporteSeriePool',
+            fields=[
+                ('pool_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('aportes', models.JSONField(default=list, help_text='Lista de [mes ISO, especie_id, apiario_id, granos]')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Aporte de Pool a la Serie',
+                'verbose_name_plural': 'Aportes de Pools a la Serie',
+                'db_table': 'aporte_serie_pool',
+            },
+        ),
+        migrations.CreateModel(
+            name='SerieMensualPolen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primer día del mes de extracción de los tambores')),
+                ('granos', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('apiario', models.ForeignKey(blank=True, db_column='id_apiario', help_text='Nulo para los tambores sin apiario vinculado', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='series_mensuales', to='modelos.apiario')),
+                ('especie', models.ForeignKey(db_column='id_especie', on_delete=django.db.models.deletion.CASCADE, related_name='series_mensuales', to='modelos.especie')),
+            ],
+            options={
+                'verbose_name': 'Serie Mensual de Polen',
+                'verbose_name_plural': 'Series Mensuales de Polen',
+                'db_table': 'serie_mensual_polen',
+                'indexes': [models.Index(fields=['mes'], name='idx_serie_mes')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='seriemensualpolen',
+            constraint=models.UniqueConstraint(condition=models.Q(('apiario__isnull', False)), fields=('mes', 'especie', 'apiario'), name='uq_serie_mes_especie_apiario'),
+        ),
+        migrations.AddConstraint(
+            model_name='seriemensualpolen',
+            constraint=models.UniqueConstraint(condition=models.Q(('apiario__isnull', True)), fields=('mes', 'especie'), name='uq_serie_mes_especie_sin_apiario'),
+        ),
+        migrations.RunPython(construir_series, migrations.RunPython.noop),
+    ]
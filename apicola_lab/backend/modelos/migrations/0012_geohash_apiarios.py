@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:58
+
+from django.db import migrations, models
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def _codificar(latitud, longitud, precision=9):
+    if latitud is None or longitud is None:
+        return ''
+    latitud, longitud = float(latitud), float(longitud)
+    rango_lat, rango_lon = [-90.0, 90.0], [-180.0, 180.0]
+    resultado, bits, valor, par = [], 0, 0, True
+    while len(resultado) < precision:
+        rango, coordenada = (rango_lon, longitud) if par else (rango_lat, latitud)
+        medio = (rango[0] + rango[1]) / 2
+        if coordenada >= medio:
+            valor = valor * 2 + 1
+            rango[0] = medio
+        else:
+            valor = valor * 2
+            rango[1] = medio
+        par = not par
+        bits += 1
+        if bits == 5:
+            resultado.append(_BASE32[valor])
+            bits, valor = 0, 0
+    return ''.join(resultado)
+
+
+def completar_geohash(apps, schema_editor):
+    """Calcula el geohash de los apiarios existentes con coordenadas"""
+    Apiario = apps.get_model('modelos', 'Apiario')
+    apiarios = list(Apiario.objects.filter(latitud__isnull=False, longitud__isnull=False).only('latitud', 'longitud'))
+    for apiario in apiarios:
+        apiario.geohash = _codificar(apiario.latitud, apiario.longitud)
+    Apiario.objects.bulk_update(apiarios, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0011_series_mensuales_polen'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiario',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(completar_geohash, migrations.RunPython.noop),
+    ]
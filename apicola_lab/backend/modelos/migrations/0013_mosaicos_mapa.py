@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:01
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+
+
+def construir_celdas(apps, schema_editor):
+    """Carga inicial de las celdas del mapa desde las series mensuales (niveles de modelos/mapas.py)"""
+    SerieMensualPolen = apps.get_model('modelos', 'SerieMensualPolen')
+    CeldaPolen = apps.get_model('modelos', 'CeldaPolen')
+    totales = defaultdict(int)
+    for geohash, especie_id, granos in SerieMensualPolen.objects.filter(
+        apiario__isnull=False
+    ).exclude(apiario__geohash='').values('apiario__geohash', 'especie_id').annotate(
+        total=Sum('granos')
+    ).order_by().values_list('apiario__geohash', 'especie_id', 'total'):
+        for nivel in (2, 3, 4, 5, 6):
+            totales[(geohash[:nivel], especie_id)] += granos
+    CeldaPolen.objects.bulk_create([
+        CeldaPolen(celda=celda, nivel=len(celda), especie_id=especie_id, granos=granos)
+        for (celda, especie_id), granos in totales.items() if granos
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0012_geohash_apiarios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CeldaPolen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('celda', models.CharField(help_text='Prefijo del geohash de los apiarios de la celda', max_length=12)),
+                ('nivel', models.PositiveSmallIntegerField(help_text='Largo del prefijo')),
+                ('granos', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('especie', models.ForeignKey(db_column='id_especie', on_delete=django.db.models.deletion.CASCADE, related_name='celdas_mapa', to='modelos.especie')),
+            ],
+            options={
+                'verbose_name': 'Celda de Polen',
+                'verbose_name_plural': 'Celdas de Polen',
+                'db_table': 'celda_polen',
+                'indexes': [models.Index(fields=['nivel', 'celda'], name='idx_celda_nivel')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='celdapolen',
+            constraint=models.UniqueConstraint(fields=('celda', 'especie'), name='uq_celda_especie'),
+        ),
+        migrations.RunPython(construir_celdas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,345 @@
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+def planificar_consultas(serializer, modelo, catalogo=None):
+    """
+    Deduce los select_related/prefetch_related que necesita un serializer
+
+    Recorre los campos ya resueltos (incluidas las expansiones de ?include=):
+    las relaciones simples anidadas se resuelven con JOIN y las múltiples
+    (y todo lo que cuelga de ellas) con una consulta extra por relación, así
+    la cantidad de consultas no depende de la cantidad de filas. Los serializers
+    con desde_catalogo = True no necesitan ninguna de las dos.
+
+    Args:
+        serializer (Serializer): Serializer de un elemento (no ListSerializer)
+        modelo (Model): Modelo del queryset
+        catalogo (list): Si se indica, recibe las rutas que se leen del catálogo
+
+    Returns:
+        tuple: (rutas select_related, rutas prefetch_related)
+    """
+    select, prefetch = [], []
+    _recorrer_campos(serializer, modelo, '', False, select, prefetch, catalogo)
+    return select, prefetch
+
+
+def _recorrer_campos(serializer, modelo, prefijo, en_prefetch, select, prefetch, catalogo):
+    for campo in serializer.fields.values():
+        if campo.source == '*' or not campo.source_attrs:
+            continue
+        try:
+            relacion = modelo._meta.get_field(campo.source_attrs[0])
+        except FieldDoesNotExist:
+            continue
+        if not relacion.is_relation:
+            continue
+
+        ruta = prefijo + relacion.name
+        if getattr(campo, 'desde_catalogo', False):
+            if catalogo is not None:
+                catalogo.append(ruta)
+            continue
+        if isinstance(campo, serializers.ListSerializer):
+            prefetch.append(ruta)
+            _recorrer_campos(campo.child, relacion.related_model, ruta + '__', True, select, prefetch, catalogo)
+        elif isinstance(campo, serializers.BaseSerializer):
+            (prefetch if en_prefetch else select).append(ruta)
+            _recorrer_campos(campo, relacion.related_model, ruta + '__', en_prefetch, select, prefetch, catalogo)
+        elif isinstance(campo, serializers.ManyRelatedField):
+            prefetch.append(ruta)
+
+
+def columnas_necesarias(serializer, modelo, prefijo=''):
+    """
+    Columnas que lee un serializer, para acotar la consulta con .only()
+
+    Las relaciones simples anidadas aportan sus propias columnas (van por JOIN);
+    las múltiples se resuelven con prefetch y sólo necesitan la clave primaria,
+    igual que las que se leen del catálogo en memoria (desde_catalogo).
+
+    Returns:
+        list | None: Rutas para .only(), o None si algún campo puede leer
+            cualquier atributo de la instancia (source='*', propiedades, métodos)
+    """
+    columnas = []
+    for campo in serializer._readable_fields:
+        if campo.source == '*' or len(campo.source_attrs) != 1:
+            return None
+        try:
+            relacion = modelo._meta.get_field(campo.source_attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if relacion.many_to_many or relacion.one_to_many or not relacion.concrete:
+            continue
+
+        columnas.append(prefijo + relacion.name)
+        if relacion.is_relation and isinstance(campo, serializers.BaseSerializer) and not getattr(
+            campo, 'desde_catalogo', False
+        ):
+            anidadas = columnas_necesarias(campo, relacion.related_model, prefijo + relacion.name + '__')
+            # Sin columnas anidadas, .only() trae la fila relacionada completa
+            columnas.extend(anidadas or [])
+    return columnas
+
+
+def _lector_plano(serializer, modelo):
+    """
+    Arma la lectura con .values() de un serializer sin relaciones anidadas
+
+    Returns:
+        tuple | None: (columnas de .values(), lectores por campo en el orden del
+            serializer) o None si el serializer no es plano. Cada lector es
+            (nombre, columna, conversor, relación muchos a muchos o None).
+    """
+    if type(serializer).to_representation is not serializers.ModelSerializer.to_representation:
+        return None
+    columnas, lectores = [modelo._meta.pk.attname], []
+    for nombre, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+        if campo.source == '*' or len(campo.source_attrs) != 1:
+            return None
+        try:
+            relacion = modelo._meta.get_field(campo.source_attrs[0])
+        except FieldDoesNotExist:
+            return None
+
+        if isinstance(campo, serializers.ManyRelatedField):
+            if not relacion.many_to_many or not relacion.concrete or not isinstance(
+                campo.child_relation, serializers.PrimaryKeyRelatedField
+            ) or campo.child_relation.pk_field is not None:
+                return None
+            lectores.append((nombre, None, None, relacion))
+        elif isinstance(campo, serializers.PrimaryKeyRelatedField):
+            if not relacion.many_to_one or campo.pk_field is not None:
+                return None
+            columnas.append(relacion.attname)
+            lectores.append((nombre, relacion.attname, None, None))
+        elif isinstance(campo, (serializers.BaseSerializer, serializers.RelatedField)) or relacion.is_relation:
+            return None
+        else:
+            columnas.append(relacion.attname)
+            lectores.append((nombre, relacion.attname, campo.to_representation, None))
+    return columnas, lectores
+
+
+def _relacionados(relacion, ids):
+    """Claves primarias relacionadas por una muchos a muchos, leídas de la tabla intermedia"""
+    intermedia = relacion.remote_field.through
+    origen = intermedia._meta.get_field(relacion.m2m_field_name()).attname
+    destino = intermedia._meta.get_field(relacion.m2m_reverse_field_name()).attname
+    relacionados = {pk: [] for pk in ids}
+    for pk, relacionado in intermedia.objects.filter(
+        **{f'{origen}__in': ids}
+    ).order_by(intermedia._meta.pk.attname).values_list(origen, destino):
+        relacionados[pk].append(relacionado)
+    return relacionados
+
+
+class IncluirRelacionesMixin:
+    """
+    Agrega ?include=relacion.subrelacion, ?fields= y ?omit= a un ModelViewSet
+
+    Pasa las expansiones y la selección de campos al serializer y arma
+    automáticamente los select_related/prefetch_related de lo que el serializer
+    va a anidar, acotando las columnas leídas con .only().
+
+    Los listados cuyo serializer (después de ?fields=/?omit=) no anida relaciones
+    se leen con .values() y se convierten campo por campo, sin crear instancias
+    del modelo ni recorrer el ModelSerializer fila por fila.
+    """
+    acciones_con_include = ('list', 'retrieve')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.acciones_con_include:
+            for parametro in ('include', 'fields', 'omit'):
+                context[parametro] = self.request.query_params.get(parametro)
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.acciones_con_include:
+            serializer = self.get_serializer()
+            select, prefetch = planificar_consultas(serializer, queryset.model)
+            columnas = columnas_necesarias(serializer, queryset.model)
+            if columnas is not None:
+                # Los select_related del viewset podrían apuntar a columnas diferidas
+                queryset = queryset.select_related(None).only(*columnas)
+            if select:
+                queryset = queryset.select_related(*select)
+            if prefetch:
+                queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        modelo = self.get_queryset().model
+        lector = _lector_plano(serializer, modelo)
+        if lector is None:
+            return super().list(request, *args, **kwargs)
+
+        columnas, lectores = lector
+        filas = self.filter_queryset(self.get_queryset()).values(*columnas)
+        pagina = self.paginate_queryset(filas)
+        filas = list(filas if pagina is None else pagina)
+
+        pk = modelo._meta.pk.attname
+        relacionados = {
+            nombre: _relacionados(relacion, [fila[pk] for fila in filas])
+            for nombre, _, _, relacion in lectores if relacion is not None
+        }
+        datos = []
+        for fila in filas:
+            dato = {}
+            for nombre, columna, convertir, relacion in lectores:
+                if relacion is not None:
+                    dato[nombre] = relacionados[nombre][fila[pk]]
+                    continue
+                valor = fila[columna]
+                dato[nombre] = valor if valor is None or convertir is None else convertir(valor)
+            datos.append(dato)
+
+        if pagina is not None:
+            return self.get_paginated_response(datos)
+        return Response(datos)
+
+
+class GetCondicionalMixin:
+    """
+    Agrega ETag y Last-Modified a list y retrieve (ver modelos/condicional.py)
+
+    Las versiones que se consultan son las de las tablas que lee el serializer,
+    incluidas las expansiones de ?include=. Si el cliente ya tiene la versión
+    vigente se responde 304 antes de ejecutar la consulta y el serializer.
+    """
+
+    def claves_condicionales(self):
+        from . import versiones
+        from .condicional import tablas_de_consulta
+        catalogo = []
+        select, prefetch = planificar_consultas(self.get_serializer(), self.get_queryset().model, catalogo)
+        modelos = tablas_de_consulta(self.get_queryset().model, select + prefetch + catalogo)
+        return [versiones.clave_tabla(modelo) for modelo in modelos]
+
+    def extras_condicionales(self):
+        """Valores adicionales que cambian la respuesta sin incrementar una versión"""
+        return ()
+
+    def _condicional(self, accion, request, *args, **kwargs):
+        from .condicional import responder
+        return responder(
+            request,
+            self.claves_condicionales(),
+            lambda: accion(request, *args, **kwargs),
+            *self.extras_condicionales()
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self._condicional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._condicional(super().retrieve, request, *args, **kwargs)
+
+
+class ImportarCSVMixin:
+    """
+    Agrega POST importar/ para cargar un CSV masivo (ver modelos/importacion.py)
+
+    El archivo va en el campo multipart 'archivo'. Con asincrono=true el archivo se
+    guarda en el storage (MEDIA_ROOT), la importación se encola como trabajo en
+    segundo plano y se responde 202 con el trabajo creado.
+    """
+    tipo_importacion = None
+
+    @action(detail=False, methods=['post'])
+    def importar(self, request):
+        from .importacion import guardar_subida, importar_csv, lineas_de_archivo
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response({'error': "Falta el archivo CSV en el campo 'archivo'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if str(request.data.get('asincrono', '')).lower() in ('true', '1'):
+                from .serializers import TrabajoSerializer
+                from .trabajos import encolar
+                # El trabajo guarda sólo la ruta del archivo, no su contenido
+                ruta = guardar_subida(self.tipo_importacion, archivo)
+                trabajo = encolar('importar_csv', {'tipo': self.tipo_importacion, 'archivo': ruta})
+                return Response(TrabajoSerializer(trabajo).data, status=status.HTTP_202_ACCEPTED)
+
+            resumen = importar_csv(self.tipo_importacion, lineas_de_archivo(archivo))
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(resumen)
+
+
+class OperacionesMasivasMixin:
+    """
+    Agrega PATCH y DELETE masivo/ a un ModelViewSet (ver modelos/masivos.py)
+
+    Cuerpo: {"filtros": {"analista": 3, "fecha_analisis__gte": "2024-01-01"},
+    "cambios": {"analista": 5}, "dry_run": true}. En DELETE los filtros también
+    pueden ir como parámetros de la URL. Sólo se aceptan los filtros de
+    filtros_masivos (campo -> lookups) y los campos de campos_masivos.
+    """
+    filtros_masivos = {'id': ('exact', 'in')}
+    campos_masivos = ()
+
+    def _validar_cambios(self, datos):
+        if not isinstance(datos, dict) or not datos:
+            raise serializers.ValidationError({'cambios': 'Se requiere al menos un campo a modificar'})
+        serializer = self.get_serializer()
+        cambios, errores = {}, {}
+        for nombre, valor in datos.items():
+            campo = serializer.fields.get(nombre)
+            if nombre not in self.campos_masivos or campo is None or campo.read_only:
+                errores[nombre] = 'Campo no modificable en forma masiva'
+                continue
+            try:
+                valor = campo.run_validation(valor)
+                validar = getattr(serializer, f'validate_{nombre}', None)
+                cambios[campo.source] = validar(valor) if validar else valor
+            except serializers.ValidationError as e:
+                errores[nombre] = e.detail
+        if errores:
+            raise serializers.ValidationError(errores)
+        return cambios
+
+    @action(detail=False, methods=['patch', 'delete'])
+    def masivo(self, request):
+        from django.db import IntegrityError
+        from django.db.models import ProtectedError, RestrictedError
+        from . import masivos
+
+        eliminar = request.method == 'DELETE'
+        datos = request.data if isinstance(request.data, dict) else {}
+        filtros = datos.get('filtros')
+        if filtros is None and eliminar:
+            filtros = {clave: valor for clave, valor in request.query_params.items() if clave != 'dry_run'}
+        dry_run = masivos.es_verdadero(datos.get('dry_run', request.query_params.get('dry_run', False)))
+
+        try:
+            queryset = self.get_queryset().filter(
+                **masivos.parse_filtros(self.get_queryset().model, filtros, self.filtros_masivos)
+            )
+            cambios = None if eliminar else self._validar_cambios(datos.get('cambios'))
+            if dry_run:
+                return Response(masivos.simular(queryset, eliminar))
+            if eliminar:
+                return Response(masivos.eliminar(queryset))
+            return Response(masivos.actualizar(queryset, cambios))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except serializers.ValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except (ProtectedError, RestrictedError) as e:
+            return Response({'error': e.args[0]}, status=status.HTTP_409_CONFLICT)
+        except IntegrityError as e:
+            return Response({'error': f'La operación viola una restricción de la base de datos: {e}'},
+                            status=status.HTTP_409_CONFLICT)
@@ -10,6 +10,16 @@ from .models.Pool_model import Pool
 from .models.ContienePool_model import ContienePool
 from .models.AnalisisPalinologico_model import AnalisisPalinologico
 from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from .models.ResumenTotal_model import ResumenTotal
+from .models.ResumenEspecie_model import ResumenEspecie
+from .models.ResumenHumedadApiario_model import ResumenHumedadApiario
+from .models.ResumenDiario_model import ResumenDiario
+from .models.SerieMensualPolen_model import SerieMensualPolen
+from .models.AporteSeriePool_model import AporteSeriePool
+from .models.CeldaPolen_model import CeldaPolen
+from .models.VersionDatos_model import VersionDatos
+from .models.ContadorRegistro_model import ContadorRegistro
+from .models.Trabajo_model import Trabajo
 
 __all__ = [
     'Apicultor',
@@ -22,6 +32,16 @@ __all__ = [
     'Pool',
     'ContienePool',
     'AnalisisPalinologico',
-    'AnalisisFisicoQuimico'
+    'AnalisisFisicoQuimico',
+    'ResumenTotal',
+    'ResumenEspecie',
+    'ResumenHumedadApiario',
+    'ResumenDiario',
+    'SerieMensualPolen',
+    'AporteSeriePool',
+    'CeldaPolen',
+    'VersionDatos',
+    'ContadorRegistro',
+    'Trabajo'
 ]
 
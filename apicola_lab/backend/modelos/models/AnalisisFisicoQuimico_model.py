@@ -38,5 +38,11 @@ class AnalisisFisicoQuimico(models.Model):
         verbose_name = 'Análisis Físico-Químico'
         verbose_name_plural = 'Análisis Físico-Químicos'
 
+    def save(self, *args, **kwargs):
+        # Próximo número de la secuencia, o avanzarla hasta el número indicado
+        from modelos.registros import asignar_registro
+        asignar_registro(self, 'analisis_fisicoquimico')
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Análisis F-Q {self.num_registro or self.id} - {self.tambor}" 
\ No newline at end of file
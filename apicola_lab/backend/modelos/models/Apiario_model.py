@@ -32,6 +32,8 @@ class Apiario(models.Model):
         blank=True,
         help_text="Coordenada de longitud"
     )
+    # Índice para las consultas por área y cercanía (ver modelos/geo.py)
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -43,5 +45,13 @@ class Apiario(models.Model):
             models.Index(fields=['apicultor'], name='idx_apiarios_apicultor'),
         ]
 
+    def save(self, *args, **kwargs):
+        from modelos.geo import codificar
+        self.geohash = codificar(self.latitud, self.longitud)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.nombre_apiario} - {self.apicultor}"
\ No newline at end of file
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class AporteSeriePool(models.Model):
+    """
+    Lo que cada pool sumó a SerieMensualPolen, para aplicar sólo la diferencia cuando cambia
+
+    pool_id no es clave foránea: la fila tiene que sobrevivir a la baja del pool
+    para poder descontar su aporte.
+    """
+    pool_id = models.BigIntegerField(primary_key=True)
+    aportes = models.JSONField(
+        default=list,
+        help_text="Lista de [mes ISO, especie_id, apiario_id, granos]"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'aporte_serie_pool'
+        verbose_name = 'Aporte de Pool a la Serie'
+        verbose_name_plural = 'Aportes de Pools a la Serie'
+
+    def __str__(self):
+        return f"Aporte del pool {self.pool_id}"
@@ -0,0 +1,30 @@
+from django.db import models
+from modelos.models.Especie_model import Especie
+
+
+class CeldaPolen(models.Model):
+    """Granos de polen por celda de geohash y especie, para los mosaicos del mapa (ver modelos/mapas.py)"""
+    celda = models.CharField(max_length=12, help_text="Prefijo del geohash de los apiarios de la celda")
+    nivel = models.PositiveSmallIntegerField(help_text="Largo del prefijo")
+    especie = models.ForeignKey(
+        Especie,
+        on_delete=models.CASCADE,
+        related_name='celdas_mapa',
+        db_column='id_especie'
+    )
+    granos = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'celda_polen'
+        verbose_name = 'Celda de Polen'
+        verbose_name_plural = 'Celdas de Polen'
+        constraints = [
+            models.UniqueConstraint(fields=['celda', 'especie'], name='uq_celda_especie'),
+        ]
+        indexes = [
+            models.Index(fields=['nivel', 'celda'], name='idx_celda_nivel'),
+        ]
+
+    def __str__(self):
+        return f"{self.celda} {self.especie_id}: {self.granos}"
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class ContadorRegistro(models.Model):
+    """Último número de registro asignado, para bases de datos sin secuencias"""
+    nombre = models.CharField(max_length=50, unique=True)
+    ultimo = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'contador_registro'
+        verbose_name = 'Contador de Registro'
+        verbose_name_plural = 'Contadores de Registro'
+
+    def __str__(self):
+        return f"{self.nombre}: {self.ultimo}"
@@ -7,6 +7,8 @@ class Especie(models.Model):
     nombre_cientifico = models.CharField(max_length=150, unique=True)
     nombre_comun = models.CharField(max_length=100, blank=True, null=True)
     familia = models.CharField(max_length=100)
+    # Nombres normalizados para la búsqueda (ver modelos/busqueda.py)
+    nombre_busqueda = models.CharField(max_length=360, blank=True, default='', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -18,6 +20,14 @@ class Especie(models.Model):
             models.Index(fields=['nombre_cientifico'], name='idx_especies_nombre'),
         ]
 
+    def save(self, *args, **kwargs):
+        from modelos.busqueda import normalizar
+        self.nombre_busqueda = normalizar(self.nombre_cientifico, self.nombre_comun, self.familia)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'nombre_busqueda'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         if self.nombre_comun:
             return f"{self.nombre_cientifico} ({self.nombre_comun})"
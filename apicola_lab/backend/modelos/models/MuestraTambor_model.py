@@ -1,10 +1,17 @@
 from django.db import models
+from django.db.models import Q
+from modelos.models.Analista_model import Analista
 from modelos.models.Apiario_model import Apiario
 
 
 class MuestraTambor(models.Model):
     """Modelo para los tambores de miel"""
-    num_registro = models.CharField(max_length=50, unique=True)
+    num_registro = models.CharField(
+        max_length=50,
+        unique=True,
+        blank=True,
+        help_text="Si se deja vacío se asigna el próximo número de registro"
+    )
     estado_analisis_palinologico = models.BooleanField(
         default=False, 
         help_text="True si el tambor está asignado a un grupo de análisis, False si está disponible"
@@ -15,6 +22,16 @@ class MuestraTambor(models.Model):
         through='TamborApiario',
         related_name='tambores'
     )
+    # Reserva temporal mientras un analista arma un pool; vencida, el tambor vuelve a estar libre
+    reservado_por = models.ForeignKey(
+        Analista,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tambores_reservados',
+        db_column='id_reservado_por'
+    )
+    reservado_hasta = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -22,6 +39,20 @@ class MuestraTambor(models.Model):
         db_table = 'muestra_tambor'
         verbose_name = 'MuestraTambor'
         verbose_name_plural = 'MuestrasTambores'
+        indexes = [
+            # Sólo los tambores libres: la búsqueda de disponibles no recorre los ya analizados
+            models.Index(
+                fields=['id'],
+                name='idx_tambor_disponible',
+                condition=Q(estado_analisis_palinologico=False)
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Próximo número de la secuencia, o avanzarla hasta el número indicado
+        from modelos.registros import asignar_registro
+        asignar_registro(self, 'muestra_tambor')
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"MuestraTambor {self.num_registro}"
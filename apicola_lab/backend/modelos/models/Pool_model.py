@@ -32,14 +32,9 @@ class Pool(models.Model):
         ]
 
     def save(self, *args, **kwargs):
-        if not self.num_registro or self.num_registro == '':
-            # Buscar el último número de registro existente
-            ultimo = Pool.objects.order_by('-id').first()
-            if ultimo and ultimo.num_registro and ultimo.num_registro.isdigit():
-                nuevo_num = int(ultimo.num_registro) + 1
-            else:
-                nuevo_num = 1
-            self.num_registro = str(nuevo_num).zfill(5)  # Ejemplo: 00001, 00002
+        # Próximo número de la secuencia, o avanzarla hasta el número indicado
+        from modelos.registros import asignar_registro
+        asignar_registro(self, 'pool')
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class ResumenDiario(models.Model):
+    """Cantidad de registros creados por día, para las ventanas de tiempo del tablero"""
+    fecha = models.DateField()
+    clave = models.CharField(max_length=50)
+    cantidad = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'resumen_diario'
+        unique_together = ('fecha', 'clave')
+        verbose_name = 'Resumen Diario'
+        verbose_name_plural = 'Resúmenes Diarios'
+
+    def __str__(self):
+        return f"{self.fecha} {self.clave}: {self.cantidad}"
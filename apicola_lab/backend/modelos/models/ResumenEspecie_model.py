@@ -0,0 +1,32 @@
+from django.db import models
+from modelos.models.Especie_model import Especie
+
+
+class ResumenEspecie(models.Model):
+    """Cantidad de análisis y granos acumulados por especie"""
+    especie = models.OneToOneField(
+        Especie,
+        on_delete=models.CASCADE,
+        related_name='resumen',
+        db_column='id_especie'
+    )
+    total_analisis = models.BigIntegerField(default=0)
+    total_granos = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'resumen_especie'
+        verbose_name = 'Resumen por Especie'
+        verbose_name_plural = 'Resúmenes por Especie'
+        indexes = [
+            models.Index(fields=['-total_analisis'], name='idx_resumen_especie_total'),
+        ]
+
+    @property
+    def promedio_granos(self):
+        if not self.total_analisis:
+            return None
+        return self.total_granos / self.total_analisis
+
+    def __str__(self):
+        return f"Resumen {self.especie}"
@@ -0,0 +1,27 @@
+from django.db import models
+from modelos.models.Apiario_model import Apiario
+
+
+class ResumenHumedadApiario(models.Model):
+    """Sumas de humedad de los análisis físico-químicos por apiario"""
+    apiario = models.OneToOneField(
+        Apiario,
+        on_delete=models.CASCADE,
+        related_name='resumen_humedad',
+        db_column='id_apiario'
+    )
+    cantidad_analisis = models.BigIntegerField(default=0)
+    cantidad_humedad = models.BigIntegerField(
+        default=0,
+        help_text="Análisis con humedad informada"
+    )
+    suma_humedad = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'resumen_humedad_apiario'
+        verbose_name = 'Resumen de Humedad por Apiario'
+        verbose_name_plural = 'Resúmenes de Humedad por Apiario'
+
+    def __str__(self):
+        return f"Resumen humedad {self.apiario}"
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class ResumenTotal(models.Model):
+    """Totales precalculados para el tablero de estadísticas"""
+    clave = models.CharField(max_length=50, unique=True)
+    valor = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'resumen_total'
+        verbose_name = 'Resumen Total'
+        verbose_name_plural = 'Resúmenes Totales'
+
+    def __str__(self):
+        return f"{self.clave}: {self.valor}"
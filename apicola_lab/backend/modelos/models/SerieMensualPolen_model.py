@@ -0,0 +1,49 @@
+from django.db import models
+from django.db.models import Q
+from modelos.models.Especie_model import Especie
+from modelos.models.Apiario_model import Apiario
+
+
+class SerieMensualPolen(models.Model):
+    """Granos de polen por mes de extracción, especie y apiario de origen (ver modelos/series.py)"""
+    mes = models.DateField(help_text="Primer día del mes de extracción de los tambores")
+    especie = models.ForeignKey(
+        Especie,
+        on_delete=models.CASCADE,
+        related_name='series_mensuales',
+        db_column='id_especie'
+    )
+    apiario = models.ForeignKey(
+        Apiario,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='series_mensuales',
+        db_column='id_apiario',
+        help_text="Nulo para los tambores sin apiario vinculado"
+    )
+    granos = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'serie_mensual_polen'
+        verbose_name = 'Serie Mensual de Polen'
+        verbose_name_plural = 'Series Mensuales de Polen'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['mes', 'especie', 'apiario'],
+                condition=Q(apiario__isnull=False),
+                name='uq_serie_mes_especie_apiario'
+            ),
+            models.UniqueConstraint(
+                fields=['mes', 'especie'],
+                condition=Q(apiario__isnull=True),
+                name='uq_serie_mes_especie_sin_apiario'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['mes'], name='idx_serie_mes'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%Y-%m} {self.especie_id}/{self.apiario_id}: {self.granos}"
@@ -0,0 +1,54 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Trabajo(models.Model):
+    """Trabajo en segundo plano procesado por `manage.py procesar_trabajos`"""
+    PENDIENTE = 'pendiente'
+    EN_PROCESO = 'en_proceso'
+    COMPLETADO = 'completado'
+    FALLIDO = 'fallido'
+    CANCELADO = 'cancelado'
+
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_PROCESO, 'En proceso'),
+        (COMPLETADO, 'Completado'),
+        (FALLIDO, 'Fallido'),
+        (CANCELADO, 'Cancelado'),
+    ]
+
+    tipo = models.CharField(max_length=50, help_text="Nombre del handler registrado en modelos/trabajos.py")
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=PENDIENTE)
+    progreso = models.PositiveSmallIntegerField(default=0, help_text="Porcentaje completado (0 a 100)")
+    mensaje = models.CharField(max_length=255, blank=True, default='')
+    resultado = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    disponible_desde = models.DateTimeField(
+        default=timezone.now,
+        help_text="El trabajo no se toma antes de esta fecha (se posterga en cada reintento)"
+    )
+    tomado_por = models.CharField(max_length=100, blank=True, default='')
+    vence_en = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Si el trabajador no informa progreso antes de esta fecha, otro puede retomarlo"
+    )
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    finalizado_en = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'trabajo'
+        verbose_name = 'Trabajo'
+        verbose_name_plural = 'Trabajos'
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde'], name='idx_trabajo_estado'),
+        ]
+
+    def __str__(self):
+        return f"Trabajo {self.id} ({self.tipo}) - {self.estado}"
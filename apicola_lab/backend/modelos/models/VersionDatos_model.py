@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class VersionDatos(models.Model):
+    """Contadores de versión de datos, usados para invalidar cachés"""
+    clave = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'version_datos'
+        verbose_name = 'Versión de Datos'
+        verbose_name_plural = 'Versiones de Datos'
+
+    def __str__(self):
+        return f"{self.clave} v{self.version}"
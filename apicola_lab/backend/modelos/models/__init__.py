@@ -8,6 +8,16 @@ from .Pool_model import Pool
 from .ContienePool_model import ContienePool
 from .AnalisisPalinologico_model import AnalisisPalinologico
 from .AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from .ResumenTotal_model import ResumenTotal
+from .ResumenEspecie_model import ResumenEspecie
+from .ResumenHumedadApiario_model import ResumenHumedadApiario
+from .ResumenDiario_model import ResumenDiario
+from .VersionDatos_model import VersionDatos
+from .ContadorRegistro_model import ContadorRegistro
+from .Trabajo_model import Trabajo
+from .SerieMensualPolen_model import SerieMensualPolen
+from .AporteSeriePool_model import AporteSeriePool
+from .CeldaPolen_model import CeldaPolen
 
 from django.apps import apps
 def get_model(model_name):
@@ -23,5 +33,15 @@ __all__ = [
     'Muestra_model',
     'MuestraTambor_model',
     'AnalisisPalinologico_model',
-    'AnalisisFisicoQuimico_model'
+    'AnalisisFisicoQuimico_model',
+    'ResumenTotal_model',
+    'ResumenEspecie_model',
+    'ResumenHumedadApiario_model',
+    'ResumenDiario_model',
+    'VersionDatos_model',
+    'ContadorRegistro_model',
+    'Trabajo_model',
+    'SerieMensualPolen_model',
+    'AporteSeriePool_model',
+    'CeldaPolen_model'
 ]
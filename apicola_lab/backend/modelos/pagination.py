@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CursorPaginacion(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre la clave primaria
+
+    El cursor codifica el último id entregado, por lo que las páginas siguen
+    siendo estables aunque se inserten filas nuevas mientras se recorre el listado
+    y el costo de cada página no crece con el tamaño de la tabla. Los listados
+    responden {next, previous, results}; el frontend recorre las páginas con
+    obtenerTodos (frontend/src/paginacion.js). El orden es por id ascendente, el
+    mismo que tenían los listados antes de paginarlos.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
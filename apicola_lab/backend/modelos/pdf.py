@@ -0,0 +1,141 @@
+"""
+Maquetado del reporte palinológico de un pool en PDF
+
+Este módulo no importa Django: renderizar_reporte_pool recibe el diccionario de
+PoolStatsService.get_pool_stats y devuelve los bytes del PDF, así puede
+ejecutarse en los procesos hijos de modelos/reportes.py.
+"""
+import io
+from datetime import date
+from xml.sax.saxutils import escape
+
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+COLOR_ENCABEZADO = colors.HexColor('#3182CE')
+
+# Mismos colores que el gráfico de torta del frontend
+COLORES_TORTA = [
+    '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0',
+    '#9966FF', '#FF9F40', '#FF6384', '#C9CBCF'
+]
+
+# Las especies por debajo de este porcentaje se agrupan como "Otras" en la torta
+PORCENTAJE_MINIMO_TORTA = 2
+
+
+def _fecha(valor):
+    if not valor:
+        return 'Sin fecha'
+    return date.fromisoformat(valor).strftime('%d/%m/%Y')
+
+
+def _tabla_info(pool_info, estilos):
+    filas = [
+        ('Estudio ID', pool_info['id']),
+        ('Protocolo/ID', pool_info['num_registro'] or f"Pool {pool_info['id']}"),
+        ('Fecha de Análisis', _fecha(pool_info['fecha_analisis'])),
+        ('Analista', pool_info['analista'] or 'N/A'),
+        ('Total de granos', pool_info['total_granos']),
+        ('Especies identificadas', pool_info['total_especies']),
+    ]
+    tabla = Table(
+        [[Paragraph(f'<b>{etiqueta}</b>', estilos['Normal']), str(valor)] for etiqueta, valor in filas],
+        colWidths=[5 * cm, 11 * cm],
+        hAlign='LEFT'
+    )
+    tabla.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ]))
+    return tabla
+
+
+def _tabla_especies(detalle, estilos):
+    encabezado = ['Nombre Científico', 'Nombre Vulgar', 'Cantidad', 'Porcentaje']
+    filas = [[
+        Paragraph(f"<i>{escape(item['especie'])}</i>", estilos['Normal']),
+        Paragraph(escape(item['nombre_comun'] or '—'), estilos['Normal']),
+        str(item['cantidad']),
+        f"{item['porcentaje']:.1f}%",
+    ] for item in sorted(detalle, key=lambda item: item['cantidad'], reverse=True)]
+
+    tabla = Table([encabezado] + filas, colWidths=[6.5 * cm, 4.5 * cm, 2.5 * cm, 2.5 * cm], repeatRows=1)
+    tabla.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), COLOR_ENCABEZADO),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F7FAFC')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#CBD5E0')),
+    ]))
+    return tabla
+
+
+def _grafico_torta(detalle):
+    principales = [item for item in detalle if item['porcentaje'] >= PORCENTAJE_MINIMO_TORTA]
+    otras = sum(item['porcentaje'] for item in detalle if item['porcentaje'] < PORCENTAJE_MINIMO_TORTA)
+    datos = [(item['especie'], item['porcentaje']) for item in principales]
+    if otras:
+        datos.append(('Otras', round(otras, 2)))
+
+    dibujo = Drawing(16 * cm, 8 * cm)
+    torta = Pie()
+    torta.x, torta.y = 1 * cm, 0.5 * cm
+    torta.width = torta.height = 7 * cm
+    torta.data = [porcentaje for _, porcentaje in datos]
+    torta.slices.strokeWidth = 0.5
+    torta.slices.strokeColor = colors.white
+    for i in range(len(datos)):
+        torta.slices[i].fillColor = colors.HexColor(COLORES_TORTA[i % len(COLORES_TORTA)])
+    dibujo.add(torta)
+
+    # Leyenda a la derecha de la torta
+    y = 7.5 * cm
+    for i, (nombre, porcentaje) in enumerate(datos):
+        y -= 0.5 * cm
+        color = colors.HexColor(COLORES_TORTA[i % len(COLORES_TORTA)])
+        dibujo.add(Rect(9 * cm, y, 0.3 * cm, 0.3 * cm, fillColor=color, strokeColor=None))
+        dibujo.add(String(9.5 * cm, y + 1, f'{nombre} ({porcentaje:.1f}%)', fontName='Helvetica', fontSize=8))
+    return dibujo
+
+
+def renderizar_reporte_pool(datos):
+    """
+    Genera el PDF del reporte melisopalinológico de un pool
+
+    Args:
+        datos (dict): Resultado de PoolStatsService.get_pool_stats con status 200
+
+    Returns:
+        bytes: Contenido del PDF
+    """
+    pool_info = datos['pool_info']
+    detalle = datos['pie_chart']['detailed_data']
+    estilos = getSampleStyleSheet()
+
+    salida = io.BytesIO()
+    documento = SimpleDocTemplate(
+        salida,
+        pagesize=A4,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+        title=f"Reporte Melisopalinológico - Pool {pool_info['num_registro'] or pool_info['id']}",
+    )
+    documento.build([
+        Paragraph('Reporte Melisopalinológico', estilos['Title']),
+        _tabla_info(pool_info, estilos),
+        Spacer(1, 0.6 * cm),
+        Paragraph('Composición polínica', estilos['Heading2']),
+        _grafico_torta(detalle),
+        Spacer(1, 0.4 * cm),
+        _tabla_especies(detalle, estilos),
+    ])
+    return salida.getvalue()
@@ -0,0 +1,124 @@
+"""
+Asignación de números de registro (num_registro) sin contención
+
+En PostgreSQL cada tipo de registro usa su propia secuencia: nextval() no es
+transaccional, así que dos analistas creando pools en paralelo nunca leen el
+mismo valor ni se bloquean entre sí. En otras bases se usa una fila contador
+(tabla contador_registro) incrementada con un UPDATE atómico.
+"""
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models.ContadorRegistro_model import ContadorRegistro
+
+DIGITOS = 5
+
+# nombre de la secuencia -> modelo cuyo num_registro numera
+SECUENCIAS = {
+    'pool': 'Pool',
+    'muestra_tambor': 'MuestraTambor',
+    'analisis_fisicoquimico': 'AnalisisFisicoQuimico',
+}
+
+
+def nombre_secuencia(nombre):
+    return f'registro_{nombre}_seq'
+
+
+def ultimo_registro_numerico(modelo):
+    """Mayor num_registro numérico existente en la tabla del modelo"""
+    numeros = [
+        int(num_registro)
+        for num_registro in modelo.objects.exclude(num_registro__isnull=True).values_list('num_registro', flat=True)
+        if num_registro and num_registro.isdigit()
+    ]
+    return max(numeros, default=0)
+
+
+def formatear(numero):
+    return str(numero).zfill(DIGITOS)  # Ejemplo: 00001, 00002
+
+
+def _reservar_secuencia(nombre, cantidad):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(%s) FROM generate_series(1, %s)',
+            [nombre_secuencia(nombre), cantidad]
+        )
+        return sorted(fila[0] for fila in cursor.fetchall())
+
+
+def _reservar_contador(nombre, cantidad):
+    with transaction.atomic():
+        if not ContadorRegistro.objects.filter(nombre=nombre).update(ultimo=F('ultimo') + cantidad):
+            modelo = apps.get_model('modelos', SECUENCIAS[nombre])
+            ContadorRegistro.objects.bulk_create(
+                [ContadorRegistro(nombre=nombre, ultimo=ultimo_registro_numerico(modelo))],
+                ignore_conflicts=True
+            )
+            ContadorRegistro.objects.filter(nombre=nombre).update(ultimo=F('ultimo') + cantidad)
+        ultimo = ContadorRegistro.objects.filter(nombre=nombre).values_list('ultimo', flat=True).get()
+    return list(range(ultimo - cantidad + 1, ultimo + 1))
+
+
+def reservar_registros(nombre, cantidad):
+    """
+    Reserva un bloque de números de registro
+
+    Args:
+        nombre (str): Clave de SECUENCIAS ('pool', 'muestra_tambor', 'analisis_fisicoquimico')
+        cantidad (int): Cantidad de números a reservar
+
+    Returns:
+        list: Números de registro formateados, en orden creciente
+    """
+    if nombre not in SECUENCIAS:
+        raise ValueError(f"Secuencia de registro desconocida: {nombre}")
+    if cantidad < 1:
+        return []
+    if connection.vendor == 'postgresql':
+        numeros = _reservar_secuencia(nombre, cantidad)
+    else:
+        numeros = _reservar_contador(nombre, cantidad)
+    return [formatear(numero) for numero in numeros]
+
+
+def siguiente_registro(nombre):
+    """Reserva un único número de registro"""
+    return reservar_registros(nombre, 1)[0]
+
+
+def asignar_registro(instancia, nombre):
+    """
+    Completa el num_registro de una instancia antes de guardarla
+
+    Si viene vacío se reserva el próximo número; si viene un número explícito
+    (cargado a mano o por la API) se avanza la secuencia hasta él, para que la
+    numeración automática no lo vuelva a entregar.
+    """
+    if not instancia.num_registro:
+        instancia.num_registro = siguiente_registro(nombre)
+    elif instancia.num_registro.isdigit():
+        avanzar_hasta(nombre, int(instancia.num_registro))
+
+
+def avanzar_hasta(nombre, numero):
+    """
+    Garantiza que los próximos números reservados sean mayores a numero
+
+    Se usa después de guardar registros con número explícito (altas por la API,
+    importaciones), para que la numeración automática no reutilice un número existente.
+    """
+    if nombre not in SECUENCIAS:
+        raise ValueError(f"Secuencia de registro desconocida: {nombre}")
+    if connection.vendor == 'postgresql':
+        secuencia = nombre_secuencia(nombre)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT setval(%s, %s) FROM {connection.ops.quote_name(secuencia)} '
+                f'WHERE (CASE WHEN is_called THEN last_value ELSE last_value - 1 END) < %s',
+                [secuencia, numero, numero]
+            )
+    else:
+        ContadorRegistro.objects.filter(nombre=nombre, ultimo__lt=numero).update(ultimo=numero)
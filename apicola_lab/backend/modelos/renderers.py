@@ -0,0 +1,114 @@
+"""
+Renderers de la API elegidos por negociación de contenido
+
+OrjsonRenderer reemplaza a JSONRenderer de DRF: serializa con orjson y sólo pasa
+por el encoder de Python para los tipos que orjson no resuelve (Decimal, fechas,
+textos traducibles), con el mismo resultado que el encoder original. La única
+diferencia son los float no finitos: orjson escribe NaN e Infinity como null,
+mientras que JSONRenderer (STRICT_JSON) falla y JsonResponse escribe NaN, que no
+es JSON válido. Si msgpack está instalado, MessagePackRenderer responde a
+'Accept: application/msgpack' o ?format=msgpack con el mismo contenido en binario.
+
+Las vistas que no pasan por DRF (estadísticas de pools) usan respuesta(), que
+aplica la misma negociación. La compresión gzip/brotli la hace CompresionMiddleware
+(ver modelos/compresion.py).
+"""
+from functools import lru_cache
+
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional
+    msgpack = None
+
+MEDIA_TYPE_MSGPACK = 'application/msgpack'
+
+# Separadores de línea que JSONRenderer escapa para poder incrustar el JSON en <script>
+_SEPARADORES = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+@lru_cache(maxsize=None)
+def _convertidor(encoder_class):
+    """Función default para orjson/msgpack: la conversión del encoder indicado"""
+    return encoder_class().default
+
+
+def a_json(datos, encoder_class=JSONEncoder, indentar=False):
+    """
+    Serializa datos a JSON (bytes) con orjson
+
+    Args:
+        encoder_class: Encoder cuyo default() convierte los tipos no nativos
+            (JSONEncoder de DRF para las vistas DRF, DjangoJSONEncoder para JsonResponse)
+        indentar (bool): Indentar con 2 espacios (API navegable)
+    """
+    opciones = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if indentar:
+        opciones |= orjson.OPT_INDENT_2
+    contenido = orjson.dumps(datos, default=_convertidor(encoder_class), option=opciones)
+    for separador, escapado in _SEPARADORES:
+        if separador in contenido:
+            contenido = contenido.replace(separador, escapado)
+    return contenido
+
+
+def a_msgpack(datos, encoder_class=JSONEncoder):
+    """Serializa datos a MessagePack con las mismas conversiones que a_json()"""
+    return msgpack.packb(datos, default=_convertidor(encoder_class), use_bin_type=True, datetime=False)
+
+
+class OrjsonRenderer(BaseRenderer):
+    """JSON con orjson, compatible con rest_framework.renderers.JSONRenderer"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indentar = bool(renderer_context.get('indent')) or 'indent=' in (accepted_media_type or '')
+        return a_json(data, self.encoder_class, indentar)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack para clientes que lo piden explícitamente (requiere msgpack)"""
+    media_type = MEDIA_TYPE_MSGPACK
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return a_msgpack(data, self.encoder_class)
+
+
+def pide_msgpack(request):
+    """True si el cliente pidió MessagePack y msgpack está instalado"""
+    if msgpack is None:
+        return False
+    if request.GET.get('format') == 'msgpack':
+        return True
+    return any(
+        tipo.split(';')[0].strip() in (MEDIA_TYPE_MSGPACK, 'application/x-msgpack')
+        for tipo in request.META.get('HTTP_ACCEPT', '').split(',')
+    )
+
+
+def respuesta(request, datos, status=200):
+    """
+    Reemplazo de JsonResponse con negociación de formato para vistas fuera de DRF
+
+    Conserva las conversiones de DjangoJSONEncoder (Decimal como texto).
+    """
+    if pide_msgpack(request):
+        return HttpResponse(a_msgpack(datos, DjangoJSONEncoder), content_type=MEDIA_TYPE_MSGPACK, status=status)
+    return HttpResponse(a_json(datos, DjangoJSONEncoder), content_type='application/json', status=status)
@@ -0,0 +1,180 @@
+"""
+Reportes PDF de pools
+
+El maquetado (modelos/pdf.py) consume CPU, así que se ejecuta en un
+ProcessPoolExecutor propio de cada worker en lugar de en el hilo que atiende el
+request. Los PDFs se guardan en la caché versionada con las mismas versiones
+que PoolStatsService: un reporte sólo se vuelve a generar cuando cambian los
+análisis del pool, el pool, el catálogo de especies o los analistas.
+"""
+import logging
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from . import versiones
+from .cache import reportes_pdf
+from .pdf import renderizar_reporte_pool
+
+logger = logging.getLogger(__name__)
+
+# Máximo de pools por pedido de reportes en lote
+MAX_LOTE = 200
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _obtener_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: los hijos no heredan conexiones a la base ni hilos del worker
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.REPORTES_PROCESOS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def _descartar_executor(executor):
+    """Descarta un executor cuyo proceso hijo murió para que el próximo pedido cree otro"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def nombre_archivo(pool_id):
+    return f'reporte_palinologico_{pool_id}.pdf'
+
+
+def _versiones_por_pool(pool_ids):
+    """Versiones de las que depende el reporte de cada pool, leídas en una sola consulta"""
+    from .services import PoolStatsService
+    claves = {pool_id: PoolStatsService.claves_version(pool_id) for pool_id in pool_ids}
+    actuales = versiones.obtener(*{clave for lista in claves.values() for clave in lista})
+    return {pool_id: {clave: actuales[clave] for clave in lista} for pool_id, lista in claves.items()}
+
+
+def generar_reportes(pool_ids):
+    """
+    Genera los PDFs de varios pools, renderizando en paralelo los que no están en caché
+
+    Args:
+        pool_ids (iterable): IDs de pools
+
+    Yields:
+        tuple: (pool_id, pdf, error) a medida que cada reporte está listo; pdf es None
+            y error un dict con 'error' y 'status' si el reporte no se pudo generar
+    """
+    from .services import PoolStatsService
+
+    pool_ids = list(dict.fromkeys(pool_ids))
+    version_de = _versiones_por_pool(pool_ids)
+
+    executor = None
+    pendientes = {}
+    for pool_id in pool_ids:
+        pdf = reportes_pdf.get(pool_id, version_de[pool_id])
+        if pdf is not None:
+            yield pool_id, pdf, None
+            continue
+
+        datos = PoolStatsService.get_pool_stats(pool_id)
+        if datos['status'] != 200:
+            yield pool_id, None, {'error': datos['error'], 'status': datos['status']}
+            continue
+
+        executor = executor or _obtener_executor()
+        try:
+            pendientes[executor.submit(renderizar_reporte_pool, datos)] = (pool_id, executor)
+        except (BrokenProcessPool, RuntimeError):
+            logger.exception("No se pudo encolar el reporte del pool %s", pool_id)
+            _descartar_executor(executor)
+            executor = None
+            yield pool_id, None, {'error': 'El proceso de generación de reportes no está disponible', 'status': 500}
+
+    if not pendientes:
+        return
+
+    try:
+        for futuro in as_completed(pendientes, timeout=settings.REPORTES_TIMEOUT):
+            pool_id, executor = pendientes.pop(futuro)
+            try:
+                pdf = futuro.result()
+            except BrokenProcessPool:
+                logger.exception("Se interrumpió el proceso que generaba el reporte del pool %s", pool_id)
+                _descartar_executor(executor)
+                yield pool_id, None, {'error': 'El proceso de generación de reportes se interrumpió', 'status': 500}
+                continue
+            except Exception as e:
+                logger.exception("Error al generar el reporte del pool %s", pool_id)
+                yield pool_id, None, {'error': f'Error al generar el reporte: {str(e)}', 'status': 500}
+                continue
+
+            reportes_pdf.set(pool_id, version_de[pool_id], pdf)
+            yield pool_id, pdf, None
+    except TimeoutError:
+        for futuro, (pool_id, _) in pendientes.items():
+            futuro.cancel()
+            yield pool_id, None, {'error': 'Se agotó el tiempo para generar el reporte', 'status': 504}
+
+
+def obtener_reporte(pool_id):
+    """
+    PDF del reporte de un pool
+
+    Returns:
+        tuple: (pdf, error) con la misma convención que generar_reportes
+    """
+    _, pdf, error = next(generar_reportes([pool_id]))
+    return pdf, error
+
+
+class _SalidaZip:
+    """Destino no posicionable para ZipFile que acumula lo escrito hasta que se vacía"""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self.partes)
+        self.partes = []
+        return datos
+
+
+def zip_reportes(pool_ids):
+    """
+    Genera un ZIP con los reportes de los pools, listo para StreamingHttpResponse
+
+    Cada PDF se escribe en el ZIP apenas termina de renderizarse. Los pools que no
+    se pudieron generar se listan en errores.txt al final del archivo.
+
+    Yields:
+        bytes: Fragmentos consecutivos del ZIP
+    """
+    salida = _SalidaZip()
+    errores = []
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_STORED) as archivo:
+        for pool_id, pdf, error in generar_reportes(pool_ids):
+            if pdf is None:
+                errores.append(f"Pool {pool_id}: {error['error']}")
+                continue
+            archivo.writestr(nombre_archivo(pool_id), pdf)
+            yield salida.vaciar()
+        if errores:
+            archivo.writestr('errores.txt', '\n'.join(errores) + '\n')
+    yield salida.vaciar()
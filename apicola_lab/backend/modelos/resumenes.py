@@ -0,0 +1,496 @@
+"""
+Resúmenes precalculados para el tablero de estadísticas
+
+Las tablas resumen_* se mantienen al día con deltas atómicos desde las señales de
+modelos/signals.py y desde las operaciones masivas que no disparan señales. Todos
+los deltas de una escritura se aplican con un INSERT ... ON CONFLICT DO UPDATE
+SET x = x + EXCLUDED.x por tabla (ver incrementar_filas), no con una sentencia por
+fila. El comando `manage.py reconstruir_resumenes` las recalcula desde cero.
+"""
+import operator
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+
+from django.db import connections, router, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import versiones
+from .catalogo import catalogo
+from .models.Apicultor_model import Apicultor
+from .models.Apiario_model import Apiario
+from .models.MuestraTambor_model import MuestraTambor
+from .models.TamborApiario_model import TamborApiario
+from .models.Pool_model import Pool
+from .models.AnalisisPalinologico_model import AnalisisPalinologico
+from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from .models.ResumenTotal_model import ResumenTotal
+from .models.ResumenEspecie_model import ResumenEspecie
+from .models.ResumenHumedadApiario_model import ResumenHumedadApiario
+from .models.ResumenDiario_model import ResumenDiario
+
+# Totales generales del tablero: clave -> modelo contado
+TOTALES = {
+    'apicultores': Apicultor,
+    'apiarios': Apiario,
+    'tambores': MuestraTambor,
+    'pools': Pool,
+    'analisis_palinologicos': AnalisisPalinologico,
+    'analisis_fisicoquimicos': AnalisisFisicoQuimico,
+}
+
+# Modelos con conteo diario para la ventana de los últimos 30 días
+DIARIOS = ('pools', 'analisis_palinologicos', 'analisis_fisicoquimicos')
+
+DIAS_VENTANA = 30
+
+
+def clave_de_modelo(modelo):
+    """Devuelve la clave de TOTALES correspondiente a un modelo, o None"""
+    for clave, modelo_total in TOTALES.items():
+        if modelo_total is modelo:
+            return clave
+    return None
+
+
+# Motores con INSERT ... ON CONFLICT (...) DO UPDATE; en el resto se aplica fila por fila
+MOTORES_UPSERT = ('postgresql', 'sqlite')
+
+
+def incrementar_fila(modelo, claves, crear=True, **deltas):
+    """
+    Aplica deltas a una fila resumen con un único UPDATE atómico
+
+    Si la fila no existe y crear es True se inserta (tolerando inserciones
+    concurrentes) y se vuelve a aplicar el delta. Es el camino de los motores sin
+    upsert; el resto del código usa incrementar_filas.
+    """
+    cambios = {campo: F(campo) + delta for campo, delta in deltas.items() if delta}
+    if not cambios:
+        return
+    if modelo.objects.filter(**claves).update(**cambios) or not crear:
+        return
+    modelo.objects.bulk_create([modelo(**claves)], ignore_conflicts=True)
+    modelo.objects.filter(**claves).update(**cambios)
+
+
+def incrementar_filas(modelo, claves, filas, conflicto=None):
+    """
+    Aplica deltas a varias filas resumen con un INSERT ... ON CONFLICT DO UPDATE por lote
+
+    Las filas con algún delta positivo que no existen se insertan con el delta como
+    valor inicial (los campos sumados tienen default 0) y las que existen lo suman en
+    la misma sentencia, así las escrituras concurrentes no se pisan. Las claves que
+    admiten nulo se resuelven contra índices únicos parciales (WHERE campo IS NULL /
+    IS NOT NULL), como los de SerieMensualPolen. Las filas que sólo restan no se
+    crean: se actualizan las existentes con un UPDATE ... CASE (por ejemplo cuando se
+    está eliminando en cascada el apiario o la especie de la fila).
+
+    Args:
+        modelo (Model): Tabla resumen con una restricción única sobre las claves
+        claves (tuple): Atributos que identifican la fila (por ejemplo 'especie_id')
+        filas (dict): Tupla con los valores de las claves -> {campo: delta}
+        conflicto (tuple): Claves de la restricción única, si no son todas (las demás
+            sólo se escriben al insertar; por ejemplo el nivel de CeldaPolen)
+    """
+    filas = {valores: deltas for valores, deltas in filas.items() if any(deltas.values())}
+    if not filas:
+        return
+    conexion = connections[router.db_for_write(modelo)]
+    if conexion.vendor not in MOTORES_UPSERT:
+        for valores, deltas in filas.items():
+            incrementar_fila(
+                modelo, dict(zip(claves, valores)), crear=any(delta > 0 for delta in deltas.values()), **deltas
+            )
+        return
+
+    # Un lote por combinación de claves nulas: cada una tiene su índice único
+    grupos = defaultdict(dict)
+    restas = {}
+    for valores, deltas in filas.items():
+        if any(delta > 0 for delta in deltas.values()):
+            grupos[tuple(valor is None for valor in valores)][valores] = deltas
+        else:
+            restas[valores] = deltas
+    for nulas, grupo in sorted(grupos.items()):
+        _upsert(conexion, modelo, claves, conflicto or claves, nulas, grupo)
+    if restas:
+        _actualizar_existentes(conexion, modelo, claves, restas)
+
+
+def _ordenadas(filas):
+    # Orden fijo de las filas: dos escrituras concurrentes bloquean en el mismo orden
+    return sorted(filas.items(), key=lambda fila: tuple((valor is None, valor) for valor in fila[0]))
+
+
+def _upsert(conexion, modelo, claves, conflicto, nulas, filas):
+    """INSERT ... ON CONFLICT DO UPDATE de filas cuyas claves nulas coinciden con 'nulas'"""
+    q = conexion.ops.quote_name
+    opciones = modelo._meta
+    tabla = q(opciones.db_table)
+    campos = [campo for campo in opciones.concrete_fields if not campo.primary_key or campo.attname in claves]
+    columnas = {campo.attname: q(campo.column) for campo in campos}
+    sumados = sorted({campo for deltas in filas.values() for campo in deltas})
+
+    objetivo = ', '.join(columnas[clave] for clave, nula in zip(claves, nulas) if clave in conflicto and not nula)
+    condiciones = [
+        f'{columnas[clave]} IS {"NULL" if nula else "NOT NULL"}'
+        for clave, nula in zip(claves, nulas) if clave in conflicto and opciones.get_field(clave).null
+    ]
+    asignaciones = [
+        f'{columnas[campo]} = {tabla}.{columnas[campo]} + EXCLUDED.{columnas[campo]}' for campo in sumados
+    ] + [
+        f'{q(campo.column)} = EXCLUDED.{q(campo.column)}' for campo in campos if getattr(campo, 'auto_now', False)
+    ]
+
+    objetos = [modelo(**dict(zip(claves, valores)), **deltas) for valores, deltas in _ordenadas(filas)]
+    marcadores = '(' + ', '.join(['%s'] * len(campos)) + ')'
+    lote = conexion.ops.bulk_batch_size(campos, objetos)
+    with conexion.cursor() as cursor:
+        for inicio in range(0, len(objetos), lote):
+            parte = objetos[inicio:inicio + lote]
+            cursor.execute(
+                f'INSERT INTO {tabla} ({", ".join(columnas.values())}) '
+                f'VALUES {", ".join([marcadores] * len(parte))} '
+                f'ON CONFLICT ({objetivo})'
+                f'{" WHERE " + " AND ".join(condiciones) if condiciones else ""} '
+                f'DO UPDATE SET {", ".join(asignaciones)}',
+                [
+                    campo.get_db_prep_save(campo.pre_save(objeto, True), conexion)
+                    for objeto in parte for campo in campos
+                ]
+            )
+
+
+def _actualizar_existentes(conexion, modelo, claves, filas):
+    """Suma los deltas a las filas que existen con un UPDATE ... SET x = x + CASE ... por lote"""
+    opciones = modelo._meta
+    sumados = sorted({campo for deltas in filas.values() for campo in deltas})
+    marcas = {
+        campo.attname: timezone.now() for campo in opciones.concrete_fields if getattr(campo, 'auto_now', False)
+    }
+    parametros_por_fila = (len(claves) + 1) * (len(sumados) + 1)
+    maximo = conexion.features.max_query_params
+    lote = max(maximo // parametros_por_fila, 1) if maximo else len(filas)
+
+    ordenadas = _ordenadas(filas)
+    for inicio in range(0, len(ordenadas), lote):
+        condiciones = [(Q(**dict(zip(claves, valores))), deltas) for valores, deltas in ordenadas[inicio:inicio + lote]]
+        cambios = {}
+        for nombre in sumados:
+            campo = opciones.get_field(nombre)
+            cambios[nombre] = F(nombre) + Case(
+                *[When(condicion, then=Value(deltas.get(nombre, 0), output_field=campo)) for condicion, deltas in condiciones],
+                default=Value(0, output_field=campo),
+                output_field=campo
+            )
+        modelo.objects.filter(reduce(operator.or_, (condicion for condicion, _ in condiciones))).update(
+            **cambios, **marcas
+        )
+
+
+def recontar_total(clave):
+    """Recalcula un total desde la tabla de origen"""
+    ResumenTotal.objects.update_or_create(
+        clave=clave,
+        defaults={'valor': TOTALES[clave].objects.count()}
+    )
+
+
+def sumar_total(clave, delta, fecha=None):
+    """
+    Suma delta al total de la clave y, si corresponde, al conteo diario de la fecha
+
+    Args:
+        clave (str): Clave de TOTALES
+        delta (int): Cantidad de filas creadas (positivo) o eliminadas (negativo)
+        fecha (date): Día de creación de las filas, para la ventana de 30 días
+    """
+    sumar_totales(clave, {fecha: delta})
+
+
+def sumar_totales(clave, deltas_por_fecha):
+    """
+    Suma al total de la clave las filas creadas o eliminadas de varios días
+
+    Aplica un único UPDATE al total y un upsert a los conteos diarios, cualquiera
+    sea la cantidad de días.
+
+    Args:
+        clave (str): Clave de TOTALES
+        deltas_por_fecha (dict): Día de creación (o None si no se conoce) -> delta
+    """
+    delta = sum(deltas_por_fecha.values())
+    if delta and not ResumenTotal.objects.filter(clave=clave).update(valor=F('valor') + delta):
+        recontar_total(clave)
+    if clave in DIARIOS:
+        incrementar_filas(ResumenDiario, ('fecha', 'clave'), {
+            (fecha, clave): {'cantidad': cantidad}
+            for fecha, cantidad in deltas_por_fecha.items() if fecha is not None
+        })
+
+
+def fecha_de_creacion(instancia):
+    """Día (en la zona horaria del proyecto) en que se creó la instancia"""
+    creado = getattr(instancia, 'created_at', None) or timezone.now()
+    return timezone.localdate(creado)
+
+
+def aplicar_analisis_palinologicos(anteriores, nuevos):
+    """
+    Actualiza los resúmenes por especie a partir de análisis reemplazados
+
+    Args:
+        anteriores (iterable): Pares (especie_id, cantidad_granos) que dejan de existir
+        nuevos (iterable): Pares (especie_id, cantidad_granos) que pasan a existir
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for especie_id, cantidad in anteriores:
+        deltas[especie_id][0] -= 1
+        deltas[especie_id][1] -= cantidad
+    for especie_id, cantidad in nuevos:
+        deltas[especie_id][0] += 1
+        deltas[especie_id][1] += cantidad
+
+    incrementar_filas(ResumenEspecie, ('especie_id',), {
+        (especie_id,): {'total_analisis': analisis, 'total_granos': granos}
+        for especie_id, (analisis, granos) in deltas.items()
+    })
+
+
+def aplicar_humedad_por_apiario(por_apiario):
+    """Aplica {apiario_id: (cantidad, cantidad_humedad, suma_humedad)} con un upsert"""
+    incrementar_filas(ResumenHumedadApiario, ('apiario_id',), {
+        (apiario_id,): {
+            'cantidad_analisis': cantidad,
+            'cantidad_humedad': cantidad_humedad,
+            'suma_humedad': suma_humedad
+        }
+        for apiario_id, (cantidad, cantidad_humedad, suma_humedad) in por_apiario.items()
+    })
+
+
+def humedad_de_analisis(analisis):
+    """
+    Deltas de humedad por apiario de análisis físico-químicos que se suman o restan
+
+    Los apiarios salen de los vínculos vigentes al momento de la llamada, con una
+    sola consulta; el resultado se puede aplicar más tarde con aplicar_humedad_por_apiario.
+
+    Args:
+        analisis (iterable): Ternas (tambor_id, humedad, signo), signo 1 para sumar y -1 para restar
+
+    Returns:
+        dict: apiario_id -> [cantidad, cantidad_humedad, suma_humedad]
+    """
+    por_tambor = defaultdict(lambda: [0, 0, Decimal(0)])
+    for tambor_id, humedad, signo in analisis:
+        por_tambor[tambor_id][0] += signo
+        if humedad is not None:
+            por_tambor[tambor_id][1] += signo
+            por_tambor[tambor_id][2] += signo * Decimal(humedad)
+
+    por_apiario = defaultdict(lambda: [0, 0, Decimal(0)])
+    if por_tambor:
+        for tambor_id, apiario_id in TamborApiario.objects.filter(
+            tambor_id__in=por_tambor
+        ).values_list('tambor_id', 'apiario_id'):
+            for i, valor in enumerate(por_tambor[tambor_id]):
+                por_apiario[apiario_id][i] += valor
+    return por_apiario
+
+
+def humedad_de_vinculos(pares):
+    """
+    Deltas de humedad por apiario de vínculos tambor-apiario que se agregan o quitan
+
+    Suma o resta a cada apiario los análisis físico-químicos existentes del tambor,
+    leídos con una consulta agrupada por tambor.
+
+    Args:
+        pares (iterable): Ternas (tambor_id, apiario_id, signo), signo 1 para vínculos nuevos y -1 para eliminados
+
+    Returns:
+        dict: apiario_id -> [cantidad, cantidad_humedad, suma_humedad]
+    """
+    pares = list(pares)
+    por_apiario = defaultdict(lambda: [0, 0, Decimal(0)])
+    if not pares:
+        return por_apiario
+    por_tambor = {
+        fila['tambor_id']: (fila['cantidad'], fila['cantidad_humedad'], fila['suma_humedad'] or 0)
+        for fila in AnalisisFisicoQuimico.objects.filter(
+            tambor_id__in={tambor_id for tambor_id, _, _ in pares}
+        ).values('tambor_id').annotate(
+            cantidad=Count('id'),
+            cantidad_humedad=Count('humedad'),
+            suma_humedad=Sum('humedad')
+        ).order_by()
+    }
+    for tambor_id, apiario_id, signo in pares:
+        for i, valor in enumerate(por_tambor.get(tambor_id, (0, 0, 0))):
+            por_apiario[apiario_id][i] += signo * valor
+    return por_apiario
+
+
+def aplicar_analisis_fisicoquimico(tambor_id, humedad, signo):
+    """Suma (signo=1) o resta (signo=-1) un análisis físico-químico a los apiarios de su tambor"""
+    aplicar_analisis_fisicoquimicos([(tambor_id, humedad)], signo)
+
+
+def aplicar_analisis_fisicoquimicos(analisis, signo):
+    """
+    Suma o resta varios análisis físico-químicos a los apiarios de sus tambores
+
+    Agrupa por apiario antes de escribir: un único upsert para todos los apiarios afectados.
+
+    Args:
+        analisis (iterable): Pares (tambor_id, humedad)
+        signo (int): 1 para sumar, -1 para restar
+    """
+    aplicar_humedad_por_apiario(humedad_de_analisis(
+        (tambor_id, humedad, signo) for tambor_id, humedad in analisis
+    ))
+
+
+def aplicar_vinculo_tambor_apiario(tambor_id, apiario_id, signo):
+    """Suma o resta al apiario todos los análisis físico-químicos de un tambor vinculado"""
+    aplicar_vinculos_tambor_apiario([(tambor_id, apiario_id)], signo)
+
+
+def aplicar_vinculos_tambor_apiario(pares, signo):
+    """
+    Suma o resta a cada apiario los análisis físico-químicos de los tambores que se le vinculan
+
+    Una consulta agrupada por tambor y un upsert, sin importar cuántos vínculos cambian.
+
+    Args:
+        pares (iterable): Pares (tambor_id, apiario_id) que se agregan o quitan
+        signo (int): 1 para vínculos nuevos, -1 para vínculos eliminados
+    """
+    aplicar_humedad_por_apiario(humedad_de_vinculos(
+        (tambor_id, apiario_id, signo) for tambor_id, apiario_id in pares
+    ))
+
+
+@transaction.atomic
+def reconstruir_todo():
+    """Recalcula todas las tablas resumen desde los datos originales"""
+    for clave in TOTALES:
+        recontar_total(clave)
+
+    ResumenEspecie.objects.all().delete()
+    ResumenEspecie.objects.bulk_create([
+        ResumenEspecie(
+            especie_id=fila['especie'],
+            total_analisis=fila['total_analisis'],
+            total_granos=fila['total_granos'] or 0
+        )
+        for fila in AnalisisPalinologico.objects.values('especie').annotate(
+            total_analisis=Count('id'),
+            total_granos=Sum('cantidad_granos')
+        ).order_by()
+    ])
+
+    ResumenHumedadApiario.objects.all().delete()
+    ResumenHumedadApiario.objects.bulk_create([
+        ResumenHumedadApiario(
+            apiario_id=fila['tambor__apiarios'],
+            cantidad_analisis=fila['cantidad_analisis'],
+            cantidad_humedad=fila['cantidad_humedad'],
+            suma_humedad=fila['suma_humedad'] or 0
+        )
+        for fila in AnalisisFisicoQuimico.objects.filter(
+            tambor__apiarios__isnull=False
+        ).values('tambor__apiarios').annotate(
+            cantidad_analisis=Count('id'),
+            cantidad_humedad=Count('humedad'),
+            suma_humedad=Sum('humedad')
+        ).order_by()
+    ])
+
+    ResumenDiario.objects.all().delete()
+    for clave in DIARIOS:
+        ResumenDiario.objects.bulk_create([
+            ResumenDiario(fecha=fila['fecha'], clave=clave, cantidad=fila['cantidad'])
+            for fila in TOTALES[clave].objects.annotate(
+                fecha=TruncDate('created_at')
+            ).values('fecha').annotate(cantidad=Count('id')).order_by()
+        ])
+
+    from . import mapas, series
+    series.reconstruir()
+    mapas.reconstruir()
+
+    versiones.incrementar(versiones.RESUMENES)
+
+
+def estadisticas_tablero():
+    """
+    Arma la respuesta de EstadisticasView leyendo sólo las tablas resumen
+
+    Returns:
+        dict: estadisticas_generales, analisis_por_especie y humedad_por_apiario
+    """
+    totales = dict(ResumenTotal.objects.values_list('clave', 'valor'))
+
+    fecha_limite = timezone.localdate() - timedelta(days=DIAS_VENTANA)
+    ventana = dict(
+        ResumenDiario.objects.filter(fecha__gte=fecha_limite).values('clave').annotate(
+            total=Sum('cantidad')
+        ).values_list('clave', 'total')
+    )
+
+    stats = {
+        'total_apicultores': totales.get('apicultores', 0),
+        'total_apiarios': totales.get('apiarios', 0),
+        'total_tambores': totales.get('tambores', 0),
+        'total_muestras': totales.get('pools', 0),
+        'total_analisis': {
+            'palinologicos': totales.get('analisis_palinologicos', 0),
+            'fisicoquimicos': totales.get('analisis_fisicoquimicos', 0)
+        },
+        'ultimos_30_dias': {
+            'muestras_nuevas': ventana.get('pools', 0),
+            'analisis_nuevos': {
+                'palinologicos': ventana.get('analisis_palinologicos', 0),
+                'fisicoquimicos': ventana.get('analisis_fisicoquimicos', 0)
+            }
+        }
+    }
+
+    # Los nombres de las especies salen del catálogo en memoria, sin JOIN
+    especies = catalogo.obtener()
+    analisis_por_especie = [{
+        'especie__nombre_cientifico': especies.nombre(resumen.especie_id),
+        'total': resumen.total_analisis,
+        'promedio_granos': resumen.promedio_granos
+    } for resumen in ResumenEspecie.objects.filter(
+        total_analisis__gt=0
+    ).order_by('-total_analisis')[:10]]
+
+    # Se agrupa por nombre de apiario, igual que la consulta original
+    humedad_por_apiario = []
+    for fila in ResumenHumedadApiario.objects.filter(cantidad_analisis__gt=0).values(
+        'apiario__nombre_apiario'
+    ).annotate(
+        suma=Sum('suma_humedad'),
+        cantidad=Sum('cantidad_humedad')
+    ).order_by():
+        humedad_por_apiario.append({
+            'tambor__apiarios__nombre_apiario': fila['apiario__nombre_apiario'],
+            'promedio_humedad': fila['suma'] / fila['cantidad'] if fila['cantidad'] else None
+        })
+    humedad_por_apiario.sort(
+        key=lambda fila: (fila['promedio_humedad'] is not None, fila['promedio_humedad'] or 0),
+        reverse=True
+    )
+
+    return {
+        'estadisticas_generales': stats,
+        'analisis_por_especie': analisis_por_especie,
+        'humedad_por_apiario': humedad_por_apiario
+    }
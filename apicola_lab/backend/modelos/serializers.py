@@ -1,3 +1,5 @@
+import sys
+from collections import Counter
 from rest_framework import serializers
 from .models.Analista_model import Analista
 from .models.Apiario_model import Apiario
@@ -9,56 +11,187 @@ from .models.Pool_model import Pool
 from .models.ContienePool_model import ContienePool
 from .models.AnalisisPalinologico_model import AnalisisPalinologico
 from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from .models.Trabajo_model import Trabajo
 
-class ApicultorSerializer(serializers.ModelSerializer):
+
+def parse_include(valor):
+    """
+    Convierte ?include=apiarios.apicultor,analista en un árbol de expansiones
+
+    Returns:
+        dict: {'apiarios': {'apicultor': {}}, 'analista': {}}
+    """
+    arbol = {}
+    for ruta in (valor or '').split(','):
+        nodo = arbol
+        for parte in ruta.split('.'):
+            parte = parte.strip()
+            if parte:
+                nodo = nodo.setdefault(parte, {})
+    return arbol
+
+
+class ExpansionSerializerMixin:
+    """
+    Permite expandir relaciones bajo demanda con ?include= y elegir campos con ?fields= / ?omit=
+
+    `expandibles` mapea el nombre del campo al nombre del serializer anidado
+    (o a una tupla nombre, opciones). Los serializers anidados ya declarados
+    también reciben las sub-expansiones (por ejemplo apiarios.apicultor).
+    Los tres parámetros usan la misma sintaxis con puntos: ?fields=id,pool.num_registro
+    deja sólo el id y, del pool anidado, su num_registro.
+    La raíz toma los árboles de `context['include']`, `context['fields']` y
+    `context['omit']`; los anidados los reciben por los argumentos `include`,
+    `campos` y `omitir`.
+    """
+    expandibles = {}
+
+    def __init__(self, *args, include=None, campos=None, omitir=None, **kwargs):
+        self._arboles = {'include': include, 'fields': campos, 'omit': omitir}
+        super().__init__(*args, **kwargs)
+
+    def _arbol(self, parametro):
+        if self._arboles[parametro] is not None:
+            return self._arboles[parametro]
+        padre = self.parent
+        es_raiz = padre is None or (isinstance(padre, serializers.ListSerializer) and padre.parent is None)
+        return parse_include(self.context.get(parametro)) if es_raiz else {}
+
+    def _error(self, parametro, mensaje):
+        return serializers.ValidationError({parametro: f"{mensaje} en {self.Meta.model.__name__}"})
+
+    def get_fields(self):
+        fields = super().get_fields()
+        modulo = sys.modules[__name__]
+        include, campos, omitir = self._arbol('include'), self._arbol('fields'), self._arbol('omit')
+
+        def anidado(nombre, actual, parametro):
+            arboles = {
+                'include': include.get(nombre, {}),
+                'campos': campos.get(nombre, {}),
+                'omitir': omitir.get(nombre, {}),
+            }
+            if isinstance(actual, serializers.ListSerializer) and isinstance(actual.child, ExpansionSerializerMixin):
+                return type(actual.child)(many=True, read_only=True, **arboles)
+            if isinstance(actual, ExpansionSerializerMixin):
+                return type(actual)(read_only=True, **arboles)
+            raise self._error(parametro, f"'{nombre}' no es una relación anidada")
+
+        for nombre in include:
+            if nombre in self.expandibles:
+                clase, opciones = self.expandibles[nombre], {}
+                if isinstance(clase, tuple):
+                    clase, opciones = clase
+                fields[nombre] = getattr(modulo, clase)(
+                    read_only=True, include=include[nombre],
+                    campos=campos.get(nombre, {}), omitir=omitir.get(nombre, {}), **opciones
+                )
+            elif nombre in fields:
+                fields[nombre] = anidado(nombre, fields[nombre], 'include')
+            else:
+                raise self._error('include', f"No se puede expandir '{nombre}'")
+
+        for parametro, arbol in (('fields', campos), ('omit', omitir)):
+            desconocidos = sorted(set(arbol) - set(fields))
+            if desconocidos:
+                raise self._error(parametro, f"Campos inexistentes: {', '.join(desconocidos)}")
+        if campos:
+            fields = {nombre: campo for nombre, campo in fields.items() if nombre in campos}
+        for nombre, subarbol in omitir.items():
+            if not subarbol:
+                fields.pop(nombre, None)
+
+        # Selección dentro de relaciones anidadas que no se expandieron con include
+        for nombre in list(fields):
+            if nombre not in include and (campos.get(nombre) or omitir.get(nombre)):
+                fields[nombre] = anidado(nombre, fields[nombre], 'fields' if campos.get(nombre) else 'omit')
+        return fields
+
+class ApicultorSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Apicultor
         fields = '__all__'
 
-class AnalistaSerializer(serializers.ModelSerializer):
+class AnalistaSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Analista
         fields = ['id', 'nombres', 'apellidos', 'contacto', 'username', 'email', 'is_active']
         read_only_fields = ['is_active']
 
-class ApiarioSerializer(serializers.ModelSerializer):
+class ApiarioSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'apicultor': 'ApicultorSerializer'}
+
     class Meta:
         model = Apiario
-        fields = '__all__'
+        exclude = ['geohash']
+
+class TamborSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'apiarios': ('ApiarioSerializer', {'many': True})}
 
-class TamborSerializer(serializers.ModelSerializer):
     class Meta:
         model = MuestraTambor
         fields = '__all__'
+        read_only_fields = ['reservado_por', 'reservado_hasta']
+
+class TamborApiarioSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'tambor': 'MuestraTamborSerializer', 'apiario': 'ApiarioSerializer'}
 
-class TamborApiarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = TamborApiario
         fields = '__all__'
 
-class EspecieSerializer(serializers.ModelSerializer):
+class EspecieSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Especie
-        fields = '__all__'
+        exclude = ['nombre_busqueda']
+
+class EspecieCatalogoSerializer(EspecieSerializer):
+    """
+    EspecieSerializer anidado que lee la especie del catálogo en memoria (modelos/catalogo.py)
+
+    Sólo usa la clave foránea de la fila, así que el planificador de consultas no
+    agrega el JOIN con especies. La instantánea se obtiene una vez por serializer raíz.
+    """
+    desde_catalogo = True
+
+    def get_attribute(self, instance):
+        from .catalogo import catalogo
+        raiz = self.root
+        if not hasattr(raiz, '_catalogo_especies'):
+            raiz._catalogo_especies = catalogo.obtener()
+        especie_id = getattr(instance, instance._meta.get_field(self.source).attname)
+        return raiz._catalogo_especies.especies.get(especie_id)
+
+    def to_representation(self, especie):
+        return {nombre: especie[nombre] for nombre in self.fields if nombre in especie}
+
+class PoolSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'analista': 'AnalistaSerializer', 'tambores': ('MuestraTamborSerializer', {'many': True})}
 
-class PoolSerializer(serializers.ModelSerializer):
     class Meta:
         model = Pool
         fields = '__all__'
 
-class PoolDetailSerializer(serializers.ModelSerializer):
+class PoolDetailSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'tambores': ('MuestraTamborSerializer', {'many': True})}
+
     analista = AnalistaSerializer(read_only=True)
     
     class Meta:
         model = Pool
         fields = ['id', 'analista', 'fecha_analisis', 'num_registro', 'observaciones', 'created_at', 'updated_at']
 
-class MuestraTamborSerializer(serializers.ModelSerializer):
+class MuestraTamborSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'apiarios': ('ApiarioSerializer', {'many': True})}
+
     class Meta:
         model = MuestraTambor
         fields = '__all__'
+        read_only_fields = ['reservado_por', 'reservado_hasta']
+
+class AnalisisPalinologicoSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'pool': 'PoolSerializer', 'especie': 'EspecieCatalogoSerializer'}
 
-class AnalisisPalinologicoSerializer(serializers.ModelSerializer):
     class Meta:
         model = AnalisisPalinologico
         fields = ['id', 'pool', 'especie', 'cantidad_granos', 'marca_especial', 'porcentaje', 'created_at', 'updated_at']
@@ -90,20 +223,104 @@ class AnalisisPalinologicoSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class AnalisisFisicoQuimicoSerializer(serializers.ModelSerializer):
+class ConteoEspecieSerializer(serializers.Serializer):
+    especie = serializers.IntegerField()
+    cantidad_granos = serializers.IntegerField(min_value=0)
+    marca_especial = serializers.ChoiceField(
+        choices=AnalisisPalinologico.MARCA_CHOICES,
+        required=False,
+        allow_null=True,
+        allow_blank=True
+    )
+
+class ConteoMasivoSerializer(serializers.Serializer):
+    """Conteos completos de una sesión del contador de polen para un pool"""
+    pool = serializers.PrimaryKeyRelatedField(queryset=Pool.objects.all())
+    conteos = ConteoEspecieSerializer(many=True, allow_empty=False)
+    reemplazar = serializers.BooleanField(default=False)
+
+    def to_internal_value(self, data):
+        # Aceptar también el formato mapa {id_especie: cantidad_granos}
+        conteos = data.get('conteos') if hasattr(data, 'get') else None
+        if isinstance(conteos, dict):
+            data = dict(data.items())
+            data['conteos'] = [
+                {'especie': especie, 'cantidad_granos': cantidad}
+                for especie, cantidad in conteos.items()
+            ]
+        return super().to_internal_value(data)
+
+    def validate_conteos(self, conteos):
+        """Validar todas las especies con una única consulta"""
+        ids = [conteo['especie'] for conteo in conteos]
+        repetidas = sorted(especie for especie, veces in Counter(ids).items() if veces > 1)
+        if repetidas:
+            raise serializers.ValidationError(f"Especies repetidas en los conteos: {repetidas}")
+
+        existentes = set(Especie.objects.filter(id__in=ids).values_list('id', flat=True))
+        inexistentes = sorted(set(ids) - existentes)
+        if inexistentes:
+            raise serializers.ValidationError(f"Especies inexistentes: {inexistentes}")
+
+        for conteo in conteos:
+            if not conteo.get('marca_especial'):
+                conteo['marca_especial'] = None
+        return conteos
+
+class ReservaTamboresSerializer(serializers.Serializer):
+    """Reserva de tambores: una cantidad de tambores libres o una lista concreta"""
+    analista = serializers.PrimaryKeyRelatedField(queryset=Analista.objects.all())
+    cantidad = serializers.IntegerField(min_value=1, max_value=500, required=False)
+    tambores = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500,
+        required=False
+    )
+    minutos = serializers.IntegerField(min_value=1, max_value=24 * 60, required=False)
+
+    def validate(self, data):
+        if ('cantidad' in data) == ('tambores' in data):
+            raise serializers.ValidationError("Se requiere 'cantidad' o 'tambores', pero no ambos")
+        return data
+
+class LiberarReservaSerializer(serializers.Serializer):
+    analista = serializers.PrimaryKeyRelatedField(queryset=Analista.objects.all())
+    tambores = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False)
+
+class EnsamblarPoolSerializer(serializers.ModelSerializer):
+    """Datos de un pool nuevo y los tambores que lo forman"""
+    tambores = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False
+    )
+
+    class Meta:
+        model = Pool
+        fields = ['analista', 'fecha_analisis', 'num_registro', 'observaciones', 'tambores']
+
+    def validate_tambores(self, tambores):
+        repetidos = sorted(tambor for tambor, veces in Counter(tambores).items() if veces > 1)
+        if repetidos:
+            raise serializers.ValidationError(f"Tambores repetidos: {repetidos}")
+        return tambores
+
+class AnalisisFisicoQuimicoSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'analista': 'AnalistaSerializer', 'tambor': 'MuestraTamborSerializer'}
+
     class Meta:
         model = AnalisisFisicoQuimico
         fields = '__all__'
 
 # Serializers anidados para relaciones
-class ApiarioDetailSerializer(serializers.ModelSerializer):
+class ApiarioDetailSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     apicultor = ApicultorSerializer(read_only=True)
     
     class Meta:
         model = Apiario
-        fields = '__all__'
+        exclude = ['geohash']
 
-class MuestraDetailSerializer(serializers.ModelSerializer):
+class MuestraDetailSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     analista = AnalistaSerializer(read_only=True)
     tambores = MuestraTamborSerializer(many=True, read_only=True)
     
@@ -111,15 +328,15 @@ class MuestraDetailSerializer(serializers.ModelSerializer):
         model = Pool
         fields = ['id', 'analista', 'tambores', 'fecha_analisis', 'num_registro', 'observaciones', 'created_at', 'updated_at']
 
-class AnalisisPalinologicoDetailSerializer(serializers.ModelSerializer):
+class AnalisisPalinologicoDetailSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     pool = PoolDetailSerializer(read_only=True)
-    especie = EspecieSerializer(read_only=True)
+    especie = EspecieCatalogoSerializer(read_only=True)
     
     class Meta:
         model = AnalisisPalinologico
         fields = '__all__'
 
-class AnalisisFisicoQuimicoDetailSerializer(serializers.ModelSerializer):
+class AnalisisFisicoQuimicoDetailSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     analista = AnalistaSerializer(read_only=True)
     tambor = MuestraTamborSerializer(read_only=True)
     
@@ -142,15 +359,50 @@ class EstadisticasSerializer(serializers.Serializer):
         child=serializers.DictField()
     )
 
-class ContienePoolSerializer(serializers.ModelSerializer):
+class ContienePoolSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
+    expandibles = {'pool': 'PoolSerializer', 'tambor': 'MuestraTamborSerializer'}
+
     class Meta:
         model = ContienePool
         fields = '__all__'
 
 # --- Nuevo serializer para tambores con apiarios y apicultor anidados ---
-class TamborWithApiariosSerializer(serializers.ModelSerializer):
+class TamborWithApiariosSerializer(ExpansionSerializerMixin, serializers.ModelSerializer):
     apiarios = ApiarioDetailSerializer(many=True, read_only=True)
 
     class Meta:
         model = MuestraTambor
-        fields = ['id', 'num_registro', 'fecha_de_extraccion', 'estado_analisis_palinologico', 'apiarios']
\ No newline at end of file
+        fields = [
+            'id', 'num_registro', 'fecha_de_extraccion', 'estado_analisis_palinologico', 'apiarios',
+            'reservado_por', 'reservado_hasta'
+        ]
+        read_only_fields = ['reservado_por', 'reservado_hasta']
+
+class TrabajoSerializer(serializers.ModelSerializer):
+    """Alta y seguimiento de trabajos en segundo plano"""
+
+    class Meta:
+        model = Trabajo
+        fields = [
+            'id', 'tipo', 'parametros', 'estado', 'progreso', 'mensaje', 'resultado', 'error',
+            'intentos', 'max_intentos', 'disponible_desde', 'tomado_por',
+            'iniciado_en', 'finalizado_en', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'estado', 'progreso', 'mensaje', 'resultado', 'error', 'intentos',
+            'disponible_desde', 'tomado_por', 'iniciado_en', 'finalizado_en',
+            'created_at', 'updated_at'
+        ]
+
+    def validate_tipo(self, tipo):
+        from .trabajos import HANDLERS
+        if tipo not in HANDLERS:
+            raise serializers.ValidationError(
+                f"Tipo de trabajo desconocido. Opciones: {', '.join(sorted(HANDLERS))}"
+            )
+        return tipo
+
+    def validate_max_intentos(self, valor):
+        if not 1 <= valor <= 10:
+            raise serializers.ValidationError("max_intentos debe estar entre 1 y 10")
+        return valor
@@ -0,0 +1,370 @@
+"""
+Series mensuales y estacionales de polen por mes de extracción
+
+Desde la migración 0003 la fecha de extracción es de cada tambor, no del pool. Los
+granos de un análisis palinológico se reparten entre los tambores del pool que
+tienen fecha (partes iguales) y, dentro de cada tambor, entre sus apiarios; el
+reparto usa restos mayores para que cada pool aporte exactamente sus granos en
+números enteros. Los pools sin ningún tambor con fecha no aportan.
+
+SerieMensualPolen guarda el total por (mes, especie, apiario) y AporteSeriePool lo
+que sumó cada pool. Cualquier cambio que afecte a un pool (análisis, tambores del
+pool, fecha de un tambor, apiarios de un tambor) recalcula el aporte de ese pool
+y aplica sólo la diferencia, en una transacción propia que bloquea el aporte del
+pool (dentro de la del cambio cuando quien escribe usa atomic). Así las
+consultas de tendencia de varios años leen la tabla resumen sin recorrer los
+análisis. Las mismas diferencias alimentan los mosaicos del mapa (ver modelos/mapas.py). `manage.py reconstruir_resumenes` también recalcula estas tablas.
+"""
+from collections import defaultdict
+from datetime import date
+from fractions import Fraction
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from . import mapas, versiones
+from .resumenes import incrementar_filas
+from .models.Apiario_model import Apiario
+from .models.MuestraTambor_model import MuestraTambor
+from .models.TamborApiario_model import TamborApiario
+from .models.ContienePool_model import ContienePool
+from .models.AnalisisPalinologico_model import AnalisisPalinologico
+from .models.SerieMensualPolen_model import SerieMensualPolen
+from .models.AporteSeriePool_model import AporteSeriePool
+
+# Pools por consulta al recalcular aportes
+TAMANO_LOTE = 500
+
+# Meses del tablero en muestras_por_mes
+MESES_TABLERO = 12
+
+# Estaciones del hemisferio sur; diciembre abre el verano del año siguiente
+ESTACIONES = (
+    ('verano', (12, 1, 2)),
+    ('otono', (3, 4, 5)),
+    ('invierno', (6, 7, 8)),
+    ('primavera', (9, 10, 11)),
+)
+ESTACION_DE_MES = {mes: (orden, nombre) for orden, (nombre, meses) in enumerate(ESTACIONES) for mes in meses}
+
+AGRUPACIONES = ('mes', 'temporada')
+DIMENSIONES = {
+    'especie': 'especie',
+    'apiario': 'apiario',
+    'localidad': 'apiario__localidad',
+}
+
+
+def temporada(mes):
+    """
+    Temporada de un mes como (año, orden, nombre)
+
+    Example:
+        date(2024, 12, 1) -> (2025, 0, 'verano')
+    """
+    orden, nombre = ESTACION_DE_MES[mes.month]
+    return (mes.year + 1 if mes.month == 12 else mes.year, orden, nombre)
+
+
+# --- Aportes de cada pool ---
+
+def _repartir(cantidad, pesos):
+    """
+    Reparte una cantidad entera proporcionalmente a los pesos (que suman 1)
+
+    Método de restos mayores: el resultado suma exactamente la cantidad.
+    """
+    exactos = {clave: cantidad * peso for clave, peso in pesos.items()}
+    enteros = {clave: int(valor) for clave, valor in exactos.items()}
+    faltan = cantidad - sum(enteros.values())
+    for clave in sorted(exactos, key=lambda clave: (enteros[clave] - exactos[clave], _orden(clave)))[:faltan]:
+        enteros[clave] += 1
+    return enteros
+
+
+def _orden(clave):
+    mes, apiario_id = clave
+    return (mes, apiario_id or 0)
+
+
+def calcular_aportes(pool_ids):
+    """
+    Calcula con tres consultas lo que aportarían ahora los pools indicados
+
+    Returns:
+        dict: pool_id -> {(mes ISO, especie_id, apiario_id): granos}
+    """
+    pool_ids = list(pool_ids)
+    tambores = defaultdict(list)
+    for pool_id, tambor_id, mes in ContienePool.objects.filter(
+        pool_id__in=pool_ids, tambor__fecha_de_extraccion__isnull=False
+    ).annotate(mes=TruncMonth('tambor__fecha_de_extraccion')).values_list('pool_id', 'tambor_id', 'mes'):
+        tambores[pool_id].append((tambor_id, mes.isoformat()))
+
+    apiarios = defaultdict(list)
+    for tambor_id, apiario_id in TamborApiario.objects.filter(
+        tambor_id__in={tambor_id for lista in tambores.values() for tambor_id, _ in lista}
+    ).order_by('apiario_id').values_list('tambor_id', 'apiario_id'):
+        apiarios[tambor_id].append(apiario_id)
+
+    pesos = {}
+    for pool_id, lista in tambores.items():
+        pesos[pool_id] = defaultdict(Fraction)
+        for tambor_id, mes in lista:
+            destinos = apiarios.get(tambor_id) or [None]
+            for apiario_id in destinos:
+                pesos[pool_id][(mes, apiario_id)] += Fraction(1, len(lista) * len(destinos))
+
+    aportes = {pool_id: {} for pool_id in pool_ids}
+    for pool_id, especie_id, cantidad in AnalisisPalinologico.objects.filter(
+        pool_id__in=list(pesos)
+    ).values_list('pool_id', 'especie_id', 'cantidad_granos'):
+        for (mes, apiario_id), granos in _repartir(cantidad or 0, pesos[pool_id]).items():
+            if granos:
+                clave = (mes, especie_id, apiario_id)
+                aportes[pool_id][clave] = aportes[pool_id].get(clave, 0) + granos
+    return aportes
+
+
+def _desde_json(aportes):
+    return {(mes, especie_id, apiario_id): granos for mes, especie_id, apiario_id, granos in aportes}
+
+
+def _a_json(aportes):
+    return [[mes, especie_id, apiario_id, granos] for (mes, especie_id, apiario_id), granos in sorted(
+        aportes.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or 0)
+    )]
+
+
+def _aplicar(deltas):
+    """Aplica las diferencias a SerieMensualPolen con un upsert por lote"""
+    incrementar_filas(SerieMensualPolen, ('mes', 'especie_id', 'apiario_id'), {
+        (date.fromisoformat(mes), especie_id, apiario_id): {'granos': delta}
+        for (mes, especie_id, apiario_id), delta in deltas.items()
+    })
+    por_apiario = defaultdict(int)
+    for (_, especie_id, apiario_id), delta in deltas.items():
+        if delta and apiario_id is not None:
+            por_apiario[(especie_id, apiario_id)] += delta
+    # Los mosaicos del mapa suman los mismos granos por celda del apiario
+    mapas.aplicar(por_apiario)
+
+
+def actualizar_pools(pool_ids):
+    """
+    Recalcula el aporte de los pools y aplica la diferencia a SerieMensualPolen
+
+    Se llama después del cambio, desde las señales o dentro del atomic de quien
+    escribe. Los aportes se bloquean antes de recalcular, así dos escrituras sobre el mismo pool no
+    aplican dos veces la misma diferencia. También sirve para pools ya eliminados
+    (su aporte nuevo es vacío).
+    """
+    pool_ids = sorted({pool_id for pool_id in pool_ids if pool_id is not None})
+    if not pool_ids:
+        return
+    # Sin savepoint propio: dentro de otra transacción comparte su lote de versiones (ver modelos/diferido.py)
+    with transaction.atomic(savepoint=False):
+        AporteSeriePool.objects.bulk_create(
+            [AporteSeriePool(pool_id=pool_id) for pool_id in pool_ids], ignore_conflicts=True
+        )
+        anteriores = {
+            fila.pool_id: fila for fila in AporteSeriePool.objects.select_for_update().filter(pool_id__in=pool_ids)
+        }
+        nuevos = calcular_aportes(pool_ids)
+
+        deltas = defaultdict(int)
+        cambiados = []
+        for pool_id in pool_ids:
+            anterior, nuevo = _desde_json(anteriores[pool_id].aportes), nuevos[pool_id]
+            if anterior == nuevo:
+                continue
+            cambiados.append(pool_id)
+            for clave in anterior.keys() | nuevo.keys():
+                deltas[clave] += nuevo.get(clave, 0) - anterior.get(clave, 0)
+            fila = anteriores[pool_id]
+            fila.aportes = _a_json(nuevo)
+            fila.save(update_fields=['aportes', 'updated_at'])
+
+        _aplicar(deltas)
+        AporteSeriePool.objects.filter(pool_id__in=[pool_id for pool_id in pool_ids if not nuevos[pool_id]]).delete()
+        if cambiados:
+            # Las estadísticas del pool muestran su reparto por mes de extracción
+            versiones.incrementar_pools(cambiados)
+            versiones.incrementar_tablas(SerieMensualPolen)
+
+
+def pools_de_tambores(tambor_ids):
+    """Pools que contienen alguno de los tambores"""
+    return set(ContienePool.objects.filter(tambor_id__in=list(tambor_ids)).values_list('pool_id', flat=True))
+
+
+def aportes_de_pool(pool_id):
+    """Aporte vigente de un pool como lista de (mes, especie_id, apiario_id, granos)"""
+    fila = AporteSeriePool.objects.filter(pool_id=pool_id).values_list('aportes', flat=True).first()
+    return [(date.fromisoformat(mes), especie_id, apiario_id, granos) for mes, especie_id, apiario_id, granos in fila or []]
+
+
+@transaction.atomic
+def reconstruir():
+    """Recalcula SerieMensualPolen y AporteSeriePool desde los análisis"""
+    SerieMensualPolen.objects.all().delete()
+    AporteSeriePool.objects.all().delete()
+
+    totales = defaultdict(int)
+    pool_ids = list(AnalisisPalinologico.objects.order_by('pool_id').values_list('pool_id', flat=True).distinct())
+    for inicio in range(0, len(pool_ids), TAMANO_LOTE):
+        aportes = calcular_aportes(pool_ids[inicio:inicio + TAMANO_LOTE])
+        AporteSeriePool.objects.bulk_create([
+            AporteSeriePool(pool_id=pool_id, aportes=_a_json(aporte))
+            for pool_id, aporte in aportes.items() if aporte
+        ])
+        for aporte in aportes.values():
+            for clave, granos in aporte.items():
+                totales[clave] += granos
+
+    SerieMensualPolen.objects.bulk_create([
+        SerieMensualPolen(mes=date.fromisoformat(mes), especie_id=especie_id, apiario_id=apiario_id, granos=granos)
+        for (mes, especie_id, apiario_id), granos in totales.items()
+    ], batch_size=1000)
+    versiones.incrementar_tablas(SerieMensualPolen)
+
+
+# --- Consultas ---
+
+def parse_filtros(params):
+    """
+    Interpreta los parámetros de la consulta de series
+
+    Args:
+        params (QueryDict): agrupar (mes|temporada), por (especie|apiario|localidad),
+            especie (ids separados por coma), apiario, localidad, desde y hasta (AAAA-MM)
+
+    Raises:
+        ValueError: Si algún parámetro es inválido
+    """
+    filtros = {'agrupar': params.get('agrupar') or 'mes', 'por': params.get('por') or None}
+    if filtros['agrupar'] not in AGRUPACIONES:
+        raise ValueError(f"'agrupar' debe ser uno de: {', '.join(AGRUPACIONES)}")
+    if filtros['por'] is not None and filtros['por'] not in DIMENSIONES:
+        raise ValueError(f"'por' debe ser uno de: {', '.join(DIMENSIONES)}")
+
+    especies = [valor.strip() for valor in (params.get('especie') or '').split(',') if valor.strip()]
+    if not all(valor.isdigit() for valor in especies):
+        raise ValueError("'especie' debe ser una lista de IDs separados por comas")
+    if especies:
+        filtros['especies'] = [int(valor) for valor in especies]
+
+    apiario = params.get('apiario')
+    if apiario:
+        if not apiario.isdigit():
+            raise ValueError(f"Identificador inválido en 'apiario': {apiario}")
+        filtros['apiario'] = int(apiario)
+    if params.get('localidad'):
+        filtros['localidad'] = params['localidad']
+
+    for nombre in ('desde', 'hasta'):
+        valor = params.get(nombre)
+        if valor:
+            try:
+                anio, mes = (int(parte) for parte in valor.split('-')[:2])
+                filtros[nombre] = date(anio, mes, 1)
+            except ValueError:
+                raise ValueError(f"Mes inválido en '{nombre}': {valor} (se espera AAAA-MM)")
+    return filtros
+
+
+def consultar(filtros):
+    """
+    Serie de granos por mes o temporada, opcionalmente abierta por especie, apiario o localidad
+
+    Con 'por', cada fila trae además el porcentaje que representa dentro de su período.
+
+    Returns:
+        dict: agrupar, por y series (lista de filas ordenadas por período)
+    """
+    filas = SerieMensualPolen.objects.filter(granos__gt=0)
+    if 'especies' in filtros:
+        filas = filas.filter(especie_id__in=filtros['especies'])
+    if 'apiario' in filtros:
+        filas = filas.filter(apiario_id=filtros['apiario'])
+    if 'localidad' in filtros:
+        filas = filas.filter(apiario__localidad=filtros['localidad'])
+    if 'desde' in filtros:
+        filas = filas.filter(mes__gte=filtros['desde'])
+    if 'hasta' in filtros:
+        filas = filas.filter(mes__lte=filtros['hasta'])
+
+    por = filtros['por']
+    columnas = ['mes'] + ([DIMENSIONES[por]] if por else [])
+    totales = defaultdict(int)
+    for fila in filas.values(*columnas).annotate(granos=Sum('granos')).order_by():
+        if filtros['agrupar'] == 'temporada':
+            periodo = temporada(fila['mes'])
+        else:
+            periodo = (fila['mes'].year, fila['mes'].month, None)
+        totales[(periodo, fila[DIMENSIONES[por]] if por else None)] += fila['granos']
+
+    por_periodo = defaultdict(int)
+    for (periodo, _), granos in totales.items():
+        por_periodo[periodo] += granos
+
+    nombres = _nombres(por, {grupo for _, grupo in totales})
+    series = []
+    for (periodo, grupo), granos in sorted(totales.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        fila = {'periodo': _etiqueta(periodo, filtros['agrupar']), 'granos': granos}
+        if por:
+            fila[por] = grupo
+            if por != 'localidad':
+                fila['nombre'] = nombres.get(grupo)
+            fila['porcentaje'] = round(granos * 100 / por_periodo[periodo], 2)
+        series.append(fila)
+
+    return {'agrupar': filtros['agrupar'], 'por': por, 'series': series}
+
+
+def _etiqueta(periodo, agrupar):
+    anio, orden, nombre = periodo
+    if agrupar == 'temporada':
+        return f'{anio}-{nombre}'
+    return f'{anio}-{orden:02d}'
+
+
+def _nombres(por, ids):
+    if por == 'especie':
+        from .catalogo import catalogo
+        especies = catalogo.obtener()
+        return {especie_id: especies.nombre(especie_id) for especie_id in ids}
+    if por == 'apiario':
+        return dict(Apiario.objects.filter(id__in=[pk for pk in ids if pk]).values_list('id', 'nombre_apiario'))
+    return {}
+
+
+def muestras_por_mes(meses=MESES_TABLERO):
+    """
+    Tambores analizados y granos por mes de extracción, para el tablero
+
+    Returns:
+        list: [{'mes': 'AAAA-MM-01', 'total': tambores, 'total_granos': granos}] ordenada por mes
+    """
+    hoy = timezone.localdate()
+    indice = hoy.year * 12 + hoy.month - 1 - (meses - 1)
+    desde = date(indice // 12, indice % 12 + 1, 1)
+
+    tambores = dict(
+        MuestraTambor.objects.filter(
+            estado_analisis_palinologico=True, fecha_de_extraccion__gte=desde
+        ).annotate(mes=TruncMonth('fecha_de_extraccion')).values('mes').annotate(
+            total=Count('id')
+        ).order_by().values_list('mes', 'total')
+    )
+    granos = dict(
+        SerieMensualPolen.objects.filter(mes__gte=desde).values('mes').annotate(
+            total=Sum('granos')
+        ).order_by().values_list('mes', 'total')
+    )
+    return [
+        {'mes': mes.isoformat(), 'total': tambores.get(mes, 0), 'total_granos': granos.get(mes, 0)}
+        for mes in sorted(tambores.keys() | granos.keys())
+    ]
@@ -1,53 +1,95 @@
-from django.db.models import Sum, Count
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, Sum, Count, Value
+from django.db.models.functions import Coalesce, ExtractMonth
 from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from . import masivos, resumenes, series, versiones
+from .cache import estadisticas_pool
+from .catalogo import catalogo
 from .models.Pool_model import Pool
+from .models.Analista_model import Analista
+from .models.Apiario_model import Apiario
+from .models.MuestraTambor_model import MuestraTambor
+from .models.TamborApiario_model import TamborApiario
+from .models.ContienePool_model import ContienePool
 from .models.AnalisisPalinologico_model import AnalisisPalinologico
+from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from .models.AporteSeriePool_model import AporteSeriePool
 
+logger = logging.getLogger(__name__)
 
 class PoolStatsService:
     """
     Servicio para calcular estadísticas de pools
     """
     
+    @staticmethod
+    def claves_version(pool_id):
+        """Claves de versión de las que dependen las estadísticas de un pool (incluye el nombre del analista)"""
+        return [versiones.clave_pool(pool_id), versiones.ESPECIES, versiones.clave_tabla(Analista)]
+
     @staticmethod
     def get_pool_stats(pool_id):
         """
         Obtiene estadísticas completas de un pool específico
         
+        El resultado se guarda en la caché versionada y sólo se recalcula cuando
+        cambian los análisis del pool, el pool, el catálogo de especies o los analistas.
+        
         Args:
             pool_id (int): ID del pool
             
         Returns:
             dict: Datos estructurados para gráficos
         """
+        version = versiones.obtener(*PoolStatsService.claves_version(pool_id))
+        result = estadisticas_pool.get(pool_id, version)
+        if result is None:
+            especies = catalogo.obtener(version[versiones.ESPECIES])
+            result = PoolStatsService._calcular_pool_stats(pool_id, especies)
+            if result['status'] != 500:
+                estadisticas_pool.set(pool_id, version, result)
+        return result
+
+    @staticmethod
+    def _calcular_pool_stats(pool_id, especies):
+        """
+        Calcula las estadísticas de un pool con una consulta para el pool y otra para sus análisis
+
+        Los nombres de las especies salen del catálogo en memoria, sin JOIN.
+        """
         try:
             # Obtener el pool con su analista
             pool = Pool.objects.select_related('analista').get(id=pool_id)
             
-            # Obtener análisis palinológicos con especies relacionadas
-            analisis = AnalisisPalinologico.objects.filter(
-                pool=pool
-            ).select_related('especie').order_by('especie__nombre_cientifico')
+            # Obtener análisis palinológicos ordenados por nombre de especie
+            analisis = sorted(
+                AnalisisPalinologico.objects.filter(pool=pool),
+                key=lambda analisis_item: especies.nombre(analisis_item.especie_id) or ''
+            )
             
-            print(f"Pool {pool_id} encontrado: {pool}")
-            print(f"Análisis encontrados: {analisis.count()}")
-            
-            if not analisis.exists():
+            if not analisis:
                 return {
                     'error': 'No hay análisis palinológicos para este pool',
                     'status': 404
                 }
             
             # Calcular total de granos
-            total_granos = analisis.aggregate(total=Sum('cantidad_granos'))['total'] or 0
+            total_granos = sum(analisis_item.cantidad_granos for analisis_item in analisis)
             
             # Preparar datos para gráficos
-            pie_chart_data = PoolStatsService._prepare_pie_chart_data(analisis, total_granos)
+            pie_chart_data = PoolStatsService._prepare_pie_chart_data(analisis, total_granos, especies)
             bar_chart_data = PoolStatsService._prepare_bar_chart_data(pie_chart_data)
-            scatter_plot_data = PoolStatsService._prepare_scatter_plot_data(analisis, pool)
+            scatter_plot_data = PoolStatsService._prepare_scatter_plot_data(analisis, pool, especies)
             
             # Información del pool
-            pool_info = PoolStatsService._prepare_pool_info(pool, total_granos, len(pie_chart_data))
+            pool_info = PoolStatsService._prepare_pool_info(pool, total_granos, len(analisis))
             
             return {
                 'pool_info': pool_info,
@@ -63,25 +105,23 @@ class PoolStatsService:
                 'status': 404
             }
         except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"Error en PoolStatsService: {str(e)}")
-            print(f"Traceback: {error_details}")
+            logger.exception("Error en PoolStatsService para el pool %s", pool_id)
             return {
                 'error': f'Error al procesar la solicitud: {str(e)}',
                 'status': 500
             }
     
     @staticmethod
-    def _prepare_pie_chart_data(analisis, total_granos):
+    def _prepare_pie_chart_data(analisis, total_granos, especies):
         """Prepara datos para gráfico de torta"""
         pie_chart_data = []
         
         for analisis_item in analisis:
             porcentaje = (analisis_item.cantidad_granos / total_granos * 100) if total_granos > 0 else 0
+            especie = especies.especies[analisis_item.especie_id]
             pie_chart_data.append({
-                'especie': analisis_item.especie.nombre_cientifico,
-                'nombre_comun': analisis_item.especie.nombre_comun or '',
+                'especie': especie['nombre_cientifico'],
+                'nombre_comun': especie['nombre_comun'] or '',
                 'porcentaje': round(porcentaje, 2),
                 'cantidad': analisis_item.cantidad_granos
             })
@@ -117,34 +157,39 @@ class PoolStatsService:
         }
     
     @staticmethod
-    def _prepare_scatter_plot_data(analisis, pool):
-        """Prepara datos para scatter plot"""
-        # Agrupar por especie y sumar cantidades
+    def _prepare_scatter_plot_data(analisis, pool, especies):
+        """
+        Prepara datos para scatter plot
+
+        Cada punto es una especie en un mes de extracción de los tambores del pool,
+        con los granos repartidos como en las series mensuales (ver modelos/series.py).
+        Si ningún tambor del pool tiene fecha de extracción se usa la fecha de análisis.
+        """
+        # Agrupar por especie y mes de extracción y sumar cantidades
         especies_por_mes = {}
-        
-        for analisis_item in analisis:
-            especie = analisis_item.especie.nombre_cientifico
-            cantidad = analisis_item.cantidad_granos
-            
-            if especie not in especies_por_mes:
-                especies_por_mes[especie] = cantidad
-            else:
-                especies_por_mes[especie] += cantidad
-        
-        # Crear puntos para el scatter plot
-        scatter_data = []
-        for especie, cantidad_total in especies_por_mes.items():
+        for mes, especie_id, _, granos in series.aportes_de_pool(pool.id):
+            clave = (especies.nombre(especie_id), mes.month)
+            especies_por_mes[clave] = especies_por_mes.get(clave, 0) + granos
+        nombres_mes = {mes: date(2000, mes, 1).strftime('%B') for _, mes in especies_por_mes}
+
+        if not especies_por_mes:
             if pool.fecha_analisis:
                 mes = pool.fecha_analisis.month
-                nombre_mes = pool.fecha_analisis.strftime('%B')
+                nombres_mes[mes] = pool.fecha_analisis.strftime('%B')
             else:
                 mes = 1
-                nombre_mes = 'Enero'
-            
+                nombres_mes[mes] = 'Enero'
+            for analisis_item in analisis:
+                clave = (especies.nombre(analisis_item.especie_id), mes)
+                especies_por_mes[clave] = especies_por_mes.get(clave, 0) + analisis_item.cantidad_granos
+
+        # Crear puntos para el scatter plot
+        scatter_data = []
+        for (especie, mes), cantidad_total in sorted(especies_por_mes.items(), key=lambda item: (item[0][0] or '', item[0][1])):
             scatter_data.append({
                 'x': especie,
                 'y': mes,
-                'nombre_mes': nombre_mes,
+                'nombre_mes': nombres_mes[mes],
                 'cantidad': cantidad_total,
                 'radio': min(cantidad_total / 10, 20)  # Radio proporcional, máximo 20
             })
@@ -169,23 +214,507 @@ class PoolStatsService:
         }
 
 
-def get_pool_stats_response(pool_id):
+class EstadisticasGlobalesService:
+    """
+    Servicio para calcular estadísticas agregadas sobre varios pools
+    """
+
+    @staticmethod
+    def parse_filtros(params):
+        """
+        Interpreta los filtros comunes de consultas sobre pools
+
+        Args:
+            params (QueryDict): Parámetros fecha_desde, fecha_hasta, analista y apiario
+
+        Returns:
+            dict: Filtros validados
+
+        Raises:
+            ValueError: Si alguna fecha o identificador es inválido
+        """
+        filtros = {}
+        for nombre in ('fecha_desde', 'fecha_hasta'):
+            valor = params.get(nombre)
+            if valor:
+                try:
+                    fecha = parse_date(valor)
+                except ValueError:
+                    fecha = None
+                if fecha is None:
+                    raise ValueError(f"Fecha inválida en '{nombre}': {valor}")
+                filtros[nombre] = fecha
+        for nombre in ('analista', 'apiario'):
+            valor = params.get(nombre)
+            if valor:
+                if not str(valor).isdigit():
+                    raise ValueError(f"Identificador inválido en '{nombre}': {valor}")
+                filtros[nombre] = int(valor)
+        return filtros
+
+    @staticmethod
+    def filtrar_pools(filtros):
+        """Devuelve el queryset de pools que cumple los filtros"""
+        pools = Pool.objects.all()
+        if 'fecha_desde' in filtros:
+            pools = pools.filter(fecha_analisis__gte=filtros['fecha_desde'])
+        if 'fecha_hasta' in filtros:
+            pools = pools.filter(fecha_analisis__lte=filtros['fecha_hasta'])
+        if 'analista' in filtros:
+            pools = pools.filter(analista_id=filtros['analista'])
+        if 'apiario' in filtros:
+            pools = pools.filter(tambores__apiarios__id=filtros['apiario'])
+        return pools
+
+    @staticmethod
+    def get_scatter_global(filtros):
+        """
+        Calcula el scatter especie x mes de todos los pools filtrados
+
+        Es la suma de los scatter de cada pool (ver PoolStatsService): los granos por
+        mes de extracción salen de los aportes de cada pool a SerieMensualPolen
+        (AporteSeriePool, la serie abierta por pool, que permite aplicar los filtros
+        de pools y contar los pools de cada punto). Los pools sin ningún tambor con
+        fecha de extracción usan el mes de análisis, igual que en su scatter individual.
+
+        Args:
+            filtros (dict): Filtros devueltos por parse_filtros
+
+        Returns:
+            dict: Datos estructurados para el scatter plot global
+        """
+        aportes = AporteSeriePool.objects.all()
+        analisis = AnalisisPalinologico.objects.all()
+        if filtros:
+            # Subconsulta para no duplicar pools cuando el filtro cruza tambores/apiarios
+            pool_ids = EstadisticasGlobalesService.filtrar_pools(filtros).values('id')
+            aportes = aportes.filter(pool_id__in=pool_ids)
+            analisis = analisis.filter(pool__in=pool_ids)
+
+        cantidades = defaultdict(int)
+        pools = defaultdict(set)
+        for pool_id, filas in aportes.values_list('pool_id', 'aportes'):
+            for mes, especie_id, _, granos in filas:
+                clave = (especie_id, date.fromisoformat(mes).month)
+                cantidades[clave] += granos
+                pools[clave].add(pool_id)
+
+        sin_fecha = analisis.exclude(
+            pool_id__in=AporteSeriePool.objects.values('pool_id')
+        ).annotate(
+            mes=Coalesce(ExtractMonth('pool__fecha_analisis'), Value(1))
+        ).values(
+            'especie', 'mes'
+        ).annotate(
+            cantidad=Sum('cantidad_granos'),
+            cantidad_pools=Count('pool', distinct=True)
+        ).order_by()
+        cantidad_pools = defaultdict(int)
+        for fila in sin_fecha:
+            clave = (fila['especie'], fila['mes'])
+            cantidades[clave] += fila['cantidad']
+            cantidad_pools[clave] += fila['cantidad_pools']
+
+        # Los nombres de las especies salen del catálogo en memoria
+        especies = catalogo.obtener()
+        filas = sorted(
+            (
+                {
+                    'especie': especie_id,
+                    'mes': mes,
+                    'cantidad': cantidad,
+                    'pools': len(pools[(especie_id, mes)]) + cantidad_pools[(especie_id, mes)]
+                }
+                for (especie_id, mes), cantidad in cantidades.items() if cantidad
+            ),
+            key=lambda fila: (especies.nombre(fila['especie']) or '', fila['mes'])
+        )
+
+        scatter_data = [{
+            'x': especies.nombre(fila['especie']),
+            'y': fila['mes'],
+            'nombre_mes': date(2000, fila['mes'], 1).strftime('%B'),
+            'cantidad': fila['cantidad'],
+            'pools': fila['pools'],
+            'radio': min(fila['cantidad'] / 10, 20)
+        } for fila in filas]
+
+        return {
+            'scatter_plot': {
+                'data': scatter_data,
+                'x_axis': 'Especies',
+                'y_axis': 'Mes del Año',
+                'size_legend': 'Tamaño proporcional a cantidad de granos'
+            },
+            'filtros': {clave: str(valor) for clave, valor in filtros.items()},
+            'status': 200
+        }
+
+
+class ApiarioStatsService:
+    """
+    Servicio para calcular estadísticas de apiarios con una única consulta
+    """
+
+    # Máximo de apiarios por consulta en lote
+    MAX_LOTE = 500
+
+    @staticmethod
+    def _sql(cantidad_ids):
+        q = connection.ops.quote_name
+
+        def columna(modelo, campo):
+            # Nombres reales de las columnas (db_column), no los de los atributos
+            return q(modelo._meta.get_field(campo).column)
+
+        id_apiario = q(Apiario._meta.pk.column)
+        marcadores = ', '.join(['%s'] * cantidad_ids)
+        return f"""
+            WITH tambores AS (
+                SELECT ta.{columna(TamborApiario, 'apiario')} AS apiario_id,
+                       ta.{columna(TamborApiario, 'tambor')} AS tambor_id
+                FROM {q(TamborApiario._meta.db_table)} ta
+                WHERE ta.{columna(TamborApiario, 'apiario')} IN ({marcadores})
+            ),
+            pools AS (
+                SELECT DISTINCT t.apiario_id, cp.{columna(ContienePool, 'pool')} AS pool_id
+                FROM tambores t
+                JOIN {q(ContienePool._meta.db_table)} cp ON cp.{columna(ContienePool, 'tambor')} = t.tambor_id
+            ),
+            conteo_tambores AS (
+                SELECT apiario_id, COUNT(*) AS total FROM tambores GROUP BY apiario_id
+            ),
+            conteo_pools AS (
+                SELECT apiario_id, COUNT(*) AS total FROM pools GROUP BY apiario_id
+            ),
+            palinologicos AS (
+                SELECT p.apiario_id,
+                       COUNT(a.{q(AnalisisPalinologico._meta.pk.column)}) AS analisis,
+                       COUNT(DISTINCT a.{columna(AnalisisPalinologico, 'especie')}) AS especies
+                FROM pools p
+                JOIN {q(AnalisisPalinologico._meta.db_table)} a ON a.{columna(AnalisisPalinologico, 'pool')} = p.pool_id
+                GROUP BY p.apiario_id
+            ),
+            fisicoquimicos AS (
+                SELECT t.apiario_id,
+                       AVG(f.{columna(AnalisisFisicoQuimico, 'humedad')}) AS promedio_humedad,
+                       AVG(f.{columna(AnalisisFisicoQuimico, 'color')}) AS promedio_color
+                FROM tambores t
+                JOIN {q(AnalisisFisicoQuimico._meta.db_table)} f ON f.{columna(AnalisisFisicoQuimico, 'tambor')} = t.tambor_id
+                GROUP BY t.apiario_id
+            )
+            SELECT ap.{id_apiario},
+                   COALESCE(ct.total, 0),
+                   COALESCE(cp.total, 0),
+                   COALESCE(pal.analisis, 0),
+                   COALESCE(pal.especies, 0),
+                   fq.promedio_humedad,
+                   fq.promedio_color
+            FROM {q(Apiario._meta.db_table)} ap
+            LEFT JOIN conteo_tambores ct ON ct.apiario_id = ap.{id_apiario}
+            LEFT JOIN conteo_pools cp ON cp.apiario_id = ap.{id_apiario}
+            LEFT JOIN palinologicos pal ON pal.apiario_id = ap.{id_apiario}
+            LEFT JOIN fisicoquimicos fq ON fq.apiario_id = ap.{id_apiario}
+            WHERE ap.{id_apiario} IN ({marcadores})
+            ORDER BY ap.{id_apiario}
+        """
+
+    @staticmethod
+    def get_estadisticas(apiario_ids):
+        """
+        Obtiene las estadísticas de varios apiarios con una sola consulta (CTE)
+
+        Args:
+            apiario_ids (list): IDs de apiarios
+
+        Returns:
+            dict: id de apiario -> estadísticas (sólo apiarios existentes)
+        """
+        apiario_ids = list(dict.fromkeys(int(apiario_id) for apiario_id in apiario_ids))
+        if not apiario_ids:
+            return {}
+
+        with connection.cursor() as cursor:
+            cursor.execute(ApiarioStatsService._sql(len(apiario_ids)), apiario_ids + apiario_ids)
+            filas = cursor.fetchall()
+
+        campo_humedad = AnalisisFisicoQuimico._meta.get_field('humedad')
+        return {
+            apiario_id: {
+                'total_tambores': total_tambores,
+                'total_muestras': total_muestras,
+                'analisis_palinologicos': analisis,
+                'especies_encontradas': especies,
+                'promedio_humedad': (
+                    round(Decimal(str(humedad)), campo_humedad.decimal_places + 2)
+                    if humedad is not None else None
+                ),
+                'promedio_color': float(color) if color is not None else None
+            }
+            for apiario_id, total_tambores, total_muestras, analisis, especies, humedad, color in filas
+        }
+
+
+class ConteoPolenService:
+    """
+    Servicio para guardar sesiones completas del contador de polen
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def guardar_conteos(pool, conteos, reemplazar=False):
+        """
+        Guarda todos los conteos de un pool con un único upsert y recalcula porcentajes
+
+        La cantidad de consultas no depende de la cantidad de especies: los resúmenes,
+        las series y el mapa reciben los deltas de todo el pool en sentencias por lote.
+
+        Args:
+            pool (Pool): Pool analizado
+            conteos (list): Diccionarios con especie, cantidad_granos y marca_especial
+            reemplazar (bool): Eliminar los análisis de especies que no vienen en los conteos
+
+        Returns:
+            list: Análisis palinológicos del pool con el porcentaje actualizado
+        """
+        # Análisis previos del pool, para aplicar los deltas exactos sin una consulta por especie
+        especies = {conteo['especie'] for conteo in conteos}
+        previos = list(AnalisisPalinologico.objects.filter(pool=pool).values_list(
+            'id', 'especie_id', 'cantidad_granos', 'created_at'
+        ))
+        reemplazados = [fila for fila in previos if fila[1] in especies]
+        eliminados = [fila for fila in previos if fila[1] not in especies] if reemplazar else []
+
+        AnalisisPalinologico.objects.bulk_create(
+            [
+                AnalisisPalinologico(
+                    pool=pool,
+                    especie_id=conteo['especie'],
+                    cantidad_granos=conteo['cantidad_granos'],
+                    marca_especial=conteo.get('marca_especial')
+                )
+                for conteo in conteos
+            ],
+            update_conflicts=True,
+            unique_fields=['pool', 'especie'],
+            update_fields=['cantidad_granos', 'marca_especial', 'updated_at']
+        )
+        masivos.borrar_por_ids(AnalisisPalinologico, [fila[0] for fila in eliminados])
+
+        # bulk_create y el DELETE directo no disparan señales: los deltas se aplican en bloque
+        resumenes.aplicar_analisis_palinologicos(
+            [(especie_id, granos) for _, especie_id, granos, _ in reemplazados + eliminados],
+            [(conteo['especie'], conteo['cantidad_granos']) for conteo in conteos]
+        )
+        por_fecha = defaultdict(int)
+        por_fecha[timezone.localdate()] += len(conteos) - len(reemplazados)
+        for *_, creado in eliminados:
+            por_fecha[timezone.localdate(creado)] -= 1
+        resumenes.sumar_totales('analisis_palinologicos', por_fecha)
+
+        versiones.incrementar(versiones.clave_pool(pool.id), versiones.clave_tabla(AnalisisPalinologico))
+        series.actualizar_pools([pool.id])
+
+        # Recalcular el porcentaje de todo el pool con un solo UPDATE
+        masivos.recalcular_porcentajes([pool.id])
+
+        analisis = AnalisisPalinologico.objects.filter(pool=pool)
+        return list(analisis.order_by('especie_id'))
+
+
+def tambores_libres(ahora, analista_id=None):
+    """
+    Condición de tambor disponible: sin pool asignado y sin una reserva vigente de otro analista
+
+    Args:
+        ahora (datetime): Instante contra el que se evalúan los vencimientos
+        analista_id (int): Analista cuyas propias reservas cuentan como disponibles
+    """
+    libre = Q(reservado_hasta__isnull=True) | Q(reservado_hasta__lte=ahora)
+    if analista_id is not None:
+        libre |= Q(reservado_por_id=analista_id)
+    return Q(estado_analisis_palinologico=False) & libre
+
+
+class TamboresNoDisponiblesError(Exception):
+    """Algunos tambores pedidos para un pool no existen, ya están asignados o los reservó otro analista"""
+
+    def __init__(self, asignados, reservados, inexistentes):
+        self.asignados = asignados
+        self.reservados = reservados
+        self.inexistentes = inexistentes
+        super().__init__(
+            f"Tambores no disponibles: asignados {asignados}, reservados {reservados}, inexistentes {inexistentes}"
+        )
+
+
+class ReservaTamboresService:
+    """
+    Servicio para reservar tambores mientras un analista arma un pool
+
+    La reserva es un plazo (reservado_hasta): si el pool nunca se crea, el tambor
+    vuelve a estar disponible al vencer, sin tareas de limpieza.
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def reservar(analista, cantidad=None, tambores=None, minutos=None):
+        """
+        Reserva hasta `cantidad` tambores libres (o los indicados en `tambores`)
+
+        Los candidatos se bloquean con SELECT ... FOR UPDATE SKIP LOCKED: dos analistas
+        que reservan a la vez reciben tambores distintos en lugar de esperarse entre sí.
+        Volver a reservar los propios tambores renueva el plazo.
+
+        Returns:
+            tuple: (ids reservados, vencimiento de la reserva)
+        """
+        ahora = timezone.now()
+        hasta = ahora + timedelta(minutes=minutos or settings.RESERVA_TAMBORES_MINUTOS)
+
+        candidatos = MuestraTambor.objects.select_for_update(skip_locked=True).filter(
+            tambores_libres(ahora, analista.id)
+        )
+        if tambores:
+            candidatos = candidatos.filter(id__in=tambores)
+        ids = list(candidatos.order_by('id').values_list('id', flat=True)[:cantidad or len(tambores)])
+
+        if MuestraTambor.objects.filter(id__in=ids).update(
+            reservado_por=analista, reservado_hasta=hasta, updated_at=ahora
+        ):
+            versiones.incrementar_tablas(MuestraTambor)
+        return ids, hasta
+
+    @staticmethod
+    def liberar(analista, tambores=None):
+        """
+        Libera las reservas del analista (todas o las de los tambores indicados)
+
+        Returns:
+            int: Cantidad de reservas liberadas
+        """
+        reservas = MuestraTambor.objects.filter(reservado_por=analista, estado_analisis_palinologico=False)
+        if tambores:
+            reservas = reservas.filter(id__in=tambores)
+        liberadas = reservas.update(reservado_por=None, reservado_hasta=None, updated_at=timezone.now())
+        if liberadas:
+            versiones.incrementar_tablas(MuestraTambor)
+        return liberadas
+
+
+class PoolService:
+    """
+    Servicio para armar pools a partir de tambores disponibles
+    """
+
+    @staticmethod
+    def ensamblar(tambores, **datos_pool):
+        """
+        Crea un pool con sus tambores en una sola transacción
+
+        Los tambores se marcan con un UPDATE condicionado a que sigan disponibles:
+        si otro pedido tomó alguno entre tanto, la cantidad de filas actualizadas no
+        coincide y se revierte todo, sin leer y luego escribir. Los tambores que
+        reservó el mismo analista del pool cuentan como disponibles.
+
+        Args:
+            tambores (list): IDs de tambores, sin repetidos
+            **datos_pool: Campos del pool (analista, fecha_analisis, ...)
+
+        Returns:
+            Pool: Pool creado
+
+        Raises:
+            TamboresNoDisponiblesError: Si algún tambor no existe, ya está asignado o
+                tiene una reserva vigente de otro analista
+        """
+        analista_id = datos_pool['analista'].id
+        ahora = timezone.now()
+        try:
+            with transaction.atomic():
+                tomados = MuestraTambor.objects.filter(
+                    tambores_libres(ahora, analista_id),
+                    id__in=tambores
+                ).update(
+                    estado_analisis_palinologico=True,
+                    reservado_por=None,
+                    reservado_hasta=None,
+                    updated_at=ahora
+                )
+                if tomados != len(tambores):
+                    raise TamboresNoDisponiblesError([], [], [])
+
+                pool = Pool.objects.create(**datos_pool)
+                ContienePool.objects.bulk_create([
+                    ContienePool(pool=pool, tambor_id=tambor_id) for tambor_id in tambores
+                ])
+                versiones.incrementar_tablas(MuestraTambor, ContienePool)
+                return pool
+        except TamboresNoDisponiblesError:
+            # Ya fuera de la transacción revertida: informar cuáles fallaron
+            estados = {
+                fila['id']: fila for fila in MuestraTambor.objects.filter(id__in=tambores).values(
+                    'id', 'estado_analisis_palinologico', 'reservado_por', 'reservado_hasta'
+                )
+            }
+            raise TamboresNoDisponiblesError(
+                sorted(tambor_id for tambor_id, fila in estados.items() if fila['estado_analisis_palinologico']),
+                sorted(
+                    tambor_id for tambor_id, fila in estados.items()
+                    if not fila['estado_analisis_palinologico']
+                    and fila['reservado_hasta'] and fila['reservado_hasta'] > ahora
+                    and fila['reservado_por'] != analista_id
+                ),
+                sorted(set(tambores) - set(estados))
+            )
+
+
+def get_pool_stats_response(pool_id, request=None):
     """
     Función de conveniencia para obtener respuesta JSON de estadísticas del pool
     
     Args:
         pool_id (int): ID del pool
+        request (HttpRequest): Request original, para elegir JSON o MessagePack
         
     Returns:
-        JsonResponse: Respuesta HTTP con datos o error
+        HttpResponse: Respuesta HTTP con datos o error
     """
     result = PoolStatsService.get_pool_stats(pool_id)
     
     if result.get('status') == 200:
         # Remover el campo status antes de enviar la respuesta
         result.pop('status')
-        return JsonResponse(result)
+        return _respuesta(request, result)
     else:
         status_code = result.get('status', 500)
         error_message = result.get('error', 'Error desconocido')
-        return JsonResponse({'error': error_message}, status=status_code)
+        return _respuesta(request, {'error': error_message}, status=status_code)
+
+
+def get_global_stats_response(params, request=None):
+    """
+    Función de conveniencia para obtener respuesta JSON del scatter global de pools
+
+    Args:
+        params (QueryDict): Filtros de la consulta
+        request (HttpRequest): Request original, para elegir JSON o MessagePack
+
+    Returns:
+        HttpResponse: Respuesta HTTP con datos o error
+    """
+    try:
+        filtros = EstadisticasGlobalesService.parse_filtros(params)
+    except ValueError as e:
+        return _respuesta(request, {'error': str(e)}, status=400)
+
+    result = EstadisticasGlobalesService.get_scatter_global(filtros)
+    result.pop('status')
+    return _respuesta(request, result)
+
+
+def _respuesta(request, datos, status=200):
+    if request is None:
+        return JsonResponse(datos, status=status)
+    from .renderers import respuesta
+    return respuesta(request, datos, status=status)
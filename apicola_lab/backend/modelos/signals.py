@@ -0,0 +1,232 @@
+"""
+Señales que mantienen actualizadas las tablas resumen (ver modelos/resumenes.py),
+las series mensuales, el mapa de polen y los contadores de versión de las cachés
+(ver modelos/versiones.py)
+
+Cada save o delete sólo anota sus diferencias en el lote de cambios de la
+transacción (Cambios); el lote se aplica una vez, al confirmar, con una
+escritura por tabla para todas las filas guardadas (ver modelos/diferido.py).
+Fuera de una transacción el lote de cada save se aplica en el momento. Lo que
+depende del estado durante la transacción (los apiarios vinculados a un tambor
+para la humedad, los valores previos al save) se lee al recibir la señal.
+
+Las operaciones masivas (bulk_create, QuerySet.update) no disparan estas
+señales y deben aplicar sus propios deltas e incrementos de versión.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, pre_save, post_save, post_delete
+
+from . import diferido, mapas, resumenes, series, versiones
+from .models.Analista_model import Analista
+from .models.Apiario_model import Apiario
+from .models.MuestraTambor_model import MuestraTambor
+from .models.TamborApiario_model import TamborApiario
+from .models.Especie_model import Especie
+from .models.Pool_model import Pool
+from .models.ContienePool_model import ContienePool
+from .models.AnalisisPalinologico_model import AnalisisPalinologico
+from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+
+# Tablas servidas por la API además de las de TOTALES (versión por tabla, ver modelos/condicional.py)
+TABLAS_VERSIONADAS = list(resumenes.TOTALES.values()) + [Analista, Especie, TamborApiario, ContienePool]
+
+
+class Cambios:
+    """Diferencias acumuladas de una transacción, para aplicarlas todas juntas"""
+
+    def __init__(self):
+        # clave de TOTALES -> día de creación -> delta
+        self.totales = defaultdict(lambda: defaultdict(int))
+        # Pares (especie_id, cantidad_granos) que dejan de existir y que pasan a existir
+        self.especies_anteriores = []
+        self.especies_nuevas = []
+        # apiario_id -> [cantidad, cantidad_humedad, suma_humedad]
+        self.humedad = defaultdict(lambda: [0, 0, Decimal(0)])
+        # Pools cuyo reparto por mes y apiario hay que recalcular, directamente o por sus tambores
+        self.pools = set()
+        self.tambores = set()
+        # apiario_id -> (geohash al empezar la transacción, geohash actual)
+        self.movimientos = {}
+        self.versiones = set()
+
+    def sumar_humedad(self, por_apiario):
+        for apiario_id, valores in por_apiario.items():
+            for i, valor in enumerate(valores):
+                self.humedad[apiario_id][i] += valor
+
+    def mover_apiario(self, apiario_id, anterior, nuevo):
+        anterior = self.movimientos.get(apiario_id, (anterior, None))[0]
+        self.movimientos[apiario_id] = (anterior, nuevo)
+
+    @staticmethod
+    def aplicar(cambios):
+        with transaction.atomic(savepoint=False):
+            for clave, deltas in cambios.totales.items():
+                resumenes.sumar_totales(clave, dict(deltas))
+            if cambios.especies_anteriores or cambios.especies_nuevas:
+                resumenes.aplicar_analisis_palinologicos(cambios.especies_anteriores, cambios.especies_nuevas)
+            resumenes.aplicar_humedad_por_apiario(cambios.humedad)
+            # Antes que las series: se mueve lo que los apiarios ya tenían en sus celdas anteriores
+            mapas.mover_apiarios([
+                (apiario_id, anterior, nuevo) for apiario_id, (anterior, nuevo) in cambios.movimientos.items()
+            ])
+            pools = set(cambios.pools)
+            if cambios.tambores:
+                pools |= series.pools_de_tambores(cambios.tambores)
+            series.actualizar_pools(pools)
+            versiones.incrementar(*cambios.versiones)
+
+
+def _cambios():
+    return diferido.acumular('resumenes', Cambios, Cambios.aplicar)
+
+
+# --- Valores persistidos antes del save ---
+
+CAMPOS_PREVIOS = {
+    AnalisisPalinologico: ('pool_id', 'especie_id', 'cantidad_granos'),
+    AnalisisFisicoQuimico: ('tambor_id', 'humedad'),
+    TamborApiario: ('tambor_id', 'apiario_id'),
+    MuestraTambor: ('fecha_de_extraccion',),
+    Apiario: ('geohash',),
+}
+
+
+def guardar_estado_previo(sender, instance, **kwargs):
+    """Guarda en la instancia los valores persistidos antes del save"""
+    instance._resumen_previo = None
+    if instance.pk:
+        instance._resumen_previo = sender.objects.filter(pk=instance.pk).values(*CAMPOS_PREVIOS[sender]).first()
+
+
+# --- Diferencias por modelo ---
+
+def _analisis_palinologico(cambios, instance, previo, signo):
+    if previo:
+        cambios.especies_anteriores.append((previo['especie_id'], previo['cantidad_granos']))
+        cambios.pools.add(previo['pool_id'])
+    par = (instance.especie_id, instance.cantidad_granos)
+    (cambios.especies_nuevas if signo > 0 else cambios.especies_anteriores).append(par)
+    cambios.pools.add(instance.pool_id)
+    cambios.versiones.update(versiones.clave_pool(pool_id) for pool_id in cambios.pools)
+
+
+def _analisis_fisicoquimico(cambios, instance, previo, signo):
+    analisis = [(instance.tambor_id, instance.humedad, signo)]
+    if previo:
+        analisis.append((previo['tambor_id'], previo['humedad'], -1))
+    cambios.sumar_humedad(resumenes.humedad_de_analisis(analisis))
+
+
+def _tambor_apiario(cambios, instance, previo, signo):
+    pares = [(instance.tambor_id, instance.apiario_id, signo)]
+    if previo:
+        pares.append((previo['tambor_id'], previo['apiario_id'], -1))
+    cambios.sumar_humedad(resumenes.humedad_de_vinculos(pares))
+    cambios.tambores.update(tambor_id for tambor_id, _, _ in pares)
+
+
+def _contiene_pool(cambios, instance, previo, signo):
+    cambios.pools.add(instance.pool_id)
+
+
+def _muestra_tambor(cambios, instance, previo, signo):
+    if previo and previo['fecha_de_extraccion'] != instance.fecha_de_extraccion:
+        cambios.tambores.add(instance.pk)
+
+
+def _pool(cambios, instance, previo, signo):
+    if signo < 0:
+        cambios.pools.add(instance.pk)
+    cambios.versiones.add(versiones.clave_pool(instance.pk))
+
+
+def _especie(cambios, instance, previo, signo):
+    cambios.versiones.add(versiones.ESPECIES)
+
+
+def _apiario(cambios, instance, previo, signo):
+    if previo:
+        cambios.mover_apiario(instance.pk, previo['geohash'], instance.geohash)
+
+
+POR_MODELO = {
+    AnalisisPalinologico: _analisis_palinologico,
+    AnalisisFisicoQuimico: _analisis_fisicoquimico,
+    TamborApiario: _tambor_apiario,
+    ContienePool: _contiene_pool,
+    MuestraTambor: _muestra_tambor,
+    Pool: _pool,
+    Especie: _especie,
+    Apiario: _apiario,
+}
+
+
+def _anotar(sender, instance, previo, signo, alta_o_baja):
+    with _cambios() as cambios:
+        clave = resumenes.clave_de_modelo(sender)
+        if clave and alta_o_baja:
+            cambios.totales[clave][resumenes.fecha_de_creacion(instance)] += signo
+        if sender in TABLAS_VERSIONADAS:
+            cambios.versiones.add(versiones.clave_tabla(sender))
+        if sender in POR_MODELO:
+            POR_MODELO[sender](cambios, instance, previo, signo)
+
+
+def guardado(sender, instance, created, **kwargs):
+    _anotar(sender, instance, getattr(instance, '_resumen_previo', None), 1, created)
+
+
+def eliminado(sender, instance, **kwargs):
+    _anotar(sender, instance, None, -1, True)
+
+
+for _modelo in CAMPOS_PREVIOS:
+    pre_save.connect(guardar_estado_previo, sender=_modelo, dispatch_uid=f'previo_{_modelo._meta.db_table}')
+
+for _modelo in set(TABLAS_VERSIONADAS) | set(POR_MODELO):
+    _tabla = _modelo._meta.db_table
+    post_save.connect(guardado, sender=_modelo, dispatch_uid=f'cambios_alta_{_tabla}')
+    post_delete.connect(eliminado, sender=_modelo, dispatch_uid=f'cambios_baja_{_tabla}')
+
+
+# --- add/remove/clear de los ManyToMany (humedad por apiario y series) ---
+
+def cambio_intermedio(sender, instance, action, pk_set, **kwargs):
+    """
+    add sobre Pool.tambores o MuestraTambor.apiarios inserta en la tabla intermedia con
+    bulk_create, sin post_save. remove y clear sí disparan post_delete de cada fila
+    (borran con el manager de la tabla intermedia) y los atienden los receptores de arriba.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    with _cambios() as cambios:
+        cambios.versiones.add(versiones.clave_tabla(sender))
+        if action != 'post_add' or not pk_set:
+            return
+        propia, otra = _COLUMNAS_INTERMEDIAS[(sender, type(instance))]
+        pares = [{propia: instance.pk, otra: otro} for otro in pk_set]
+        if sender is ContienePool:
+            cambios.pools.update(par['pool_id'] for par in pares)
+        else:
+            cambios.sumar_humedad(resumenes.humedad_de_vinculos(
+                (par['tambor_id'], par['apiario_id'], 1) for par in pares
+            ))
+            cambios.tambores.update(par['tambor_id'] for par in pares)
+
+
+# (tabla intermedia, modelo del lado que llama) -> (columna de ese lado, columna del otro)
+_COLUMNAS_INTERMEDIAS = {
+    (ContienePool, Pool): ('pool_id', 'tambor_id'),
+    (ContienePool, MuestraTambor): ('tambor_id', 'pool_id'),
+    (TamborApiario, MuestraTambor): ('tambor_id', 'apiario_id'),
+    (TamborApiario, Apiario): ('apiario_id', 'tambor_id'),
+}
+
+for _intermedia in (TamborApiario, ContienePool):
+    m2m_changed.connect(
+        cambio_intermedio, sender=_intermedia, dispatch_uid=f'intermedia_m2m_{_intermedia._meta.db_table}'
+    )
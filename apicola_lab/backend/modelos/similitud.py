@@ -0,0 +1,210 @@
+"""
+Búsqueda de pools con espectro polínico parecido
+
+Cada pool es un vector disperso especie -> proporción de granos (sus análisis
+palinológicos normalizados para que sumen 1). IndiceSimilitud guarda en memoria del
+proceso la matriz pools x especies en formato CSC de scipy, etiquetada con la
+versión de la tabla de análisis palinológicos. Cuando esa versión cambia se
+comparan las versiones por pool (ver modelos/versiones.py) y sólo se vuelven a leer
+los análisis de los pools que cambiaron; la matriz se rearma en memoria.
+
+Para un pool se recorren únicamente las columnas de sus especies, así la consulta
+cuesta lo que suman esas columnas y no compara todos los pares. Métricas:
+- coseno: producto escalar de las proporciones sobre el producto de sus normas
+- bray_curtis: 1 - disimilitud de Bray-Curtis, que con proporciones es la suma de
+  los mínimos por especie
+"""
+import threading
+
+import numpy
+from scipy import sparse
+
+from . import versiones
+from .models.Pool_model import Pool
+from .models.VersionDatos_model import VersionDatos
+from .models.AnalisisPalinologico_model import AnalisisPalinologico
+
+METRICAS = ('coseno', 'bray_curtis')
+K_POR_DEFECTO = 10
+K_MAXIMO = 100
+
+# Con más pools cambiados conviene releer todos los análisis
+MAX_CAMBIADOS = 2000
+
+
+class Espectros:
+    """
+    Matriz de proporciones de todos los pools con análisis, en una versión dada
+
+    Attributes:
+        pool_ids (ndarray): Id de pool de cada fila, ordenados
+        matriz (csc_matrix): Proporción de granos por pool (fila) y especie (columna = id)
+    """
+
+    def __init__(self, version, versiones_pool, pools, especies, granos):
+        self.version = version
+        self.versiones_pool = versiones_pool
+        # Filas crudas (pool, especie, granos) para las actualizaciones incrementales
+        self.pools, self.especies, self.granos = pools, especies, granos
+
+        self.pool_ids, filas = numpy.unique(pools, return_inverse=True)
+        totales = numpy.bincount(filas, weights=granos, minlength=len(self.pool_ids))
+        proporciones = granos / totales[filas]
+        columnas = int(especies.max()) + 1 if len(especies) else 0
+        self.matriz = sparse.csc_matrix(
+            (proporciones, (filas, especies)), shape=(len(self.pool_ids), columnas)
+        )
+        self.filas = self.matriz.tocsr()
+        self.normas = numpy.sqrt(numpy.bincount(filas, weights=proporciones ** 2, minlength=len(self.pool_ids)))
+
+    def actualizar(self, version, versiones_pool, cambiados, filas_nuevas):
+        """Nueva instancia con las filas de los pools cambiados reemplazadas"""
+        pools, especies, granos = filas_nuevas
+        conservar = ~numpy.isin(self.pools, cambiados)
+        return Espectros(
+            version,
+            versiones_pool,
+            numpy.concatenate([self.pools[conservar], pools]),
+            numpy.concatenate([self.especies[conservar], especies]),
+            numpy.concatenate([self.granos[conservar], granos])
+        )
+
+    def similares(self, pool_id, metrica, k):
+        """
+        Returns:
+            list: Tuplas (pool_id, similitud, especies en común) de mayor a menor
+                similitud, sin el propio pool; None si el pool no tiene análisis
+        """
+        fila = numpy.searchsorted(self.pool_ids, pool_id)
+        if fila >= len(self.pool_ids) or self.pool_ids[fila] != pool_id:
+            return None
+
+        acumulado = numpy.zeros(len(self.pool_ids))
+        comunes = numpy.zeros(len(self.pool_ids), dtype=numpy.int64)
+        inicio, fin = self.filas.indptr[fila], self.filas.indptr[fila + 1]
+        for especie, proporcion in zip(self.filas.indices[inicio:fin], self.filas.data[inicio:fin]):
+            desde, hasta = self.matriz.indptr[especie], self.matriz.indptr[especie + 1]
+            otras, valores = self.matriz.indices[desde:hasta], self.matriz.data[desde:hasta]
+            if metrica == 'coseno':
+                acumulado[otras] += valores * proporcion
+            else:
+                acumulado[otras] += numpy.minimum(valores, proporcion)
+            comunes[otras] += 1
+        if metrica == 'coseno':
+            acumulado /= self.normas * self.normas[fila]
+        acumulado[fila] = 0
+
+        candidatos = numpy.flatnonzero(acumulado > 0)
+        if len(candidatos) > k:
+            candidatos = candidatos[numpy.argpartition(-acumulado[candidatos], k - 1)[:k]]
+        candidatos = sorted(candidatos, key=lambda otra: (-acumulado[otra], self.pool_ids[otra]))
+        return [
+            (int(self.pool_ids[otra]), min(float(acumulado[otra]), 1.0), int(comunes[otra]))
+            for otra in candidatos
+        ]
+
+
+def _leer_filas(pool_ids=None):
+    analisis = AnalisisPalinologico.objects.filter(cantidad_granos__gt=0)
+    if pool_ids is not None:
+        analisis = analisis.filter(pool_id__in=pool_ids)
+    filas = list(analisis.values_list('pool_id', 'especie_id', 'cantidad_granos'))
+    if not filas:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0)
+    pools, especies, granos = zip(*filas)
+    return (
+        numpy.array(pools, dtype=numpy.int64),
+        numpy.array(especies, dtype=numpy.int64),
+        numpy.array(granos, dtype=float)
+    )
+
+
+def _versiones_pool():
+    return dict(VersionDatos.objects.filter(
+        clave__startswith=versiones.clave_pool('')
+    ).values_list('clave', 'version'))
+
+
+class IndiceSimilitud:
+    """Espectros vigentes, actualizados cuando cambia la tabla de análisis palinológicos"""
+
+    def __init__(self):
+        self._actual = None
+        self._lock = threading.Lock()
+        self.reconstrucciones = 0
+        self.actualizaciones = 0
+
+    def obtener(self):
+        version = versiones.obtener(versiones.clave_tabla(AnalisisPalinologico))[
+            versiones.clave_tabla(AnalisisPalinologico)
+        ]
+        actual = self._actual
+        if actual is not None and actual.version == version:
+            return actual
+        with self._lock:
+            if self._actual is None or self._actual.version != version:
+                self._actual = self._construir(version, self._actual)
+            return self._actual
+
+    def _construir(self, version, anterior):
+        # Los datos se leen después que las versiones: nunca son más viejos que su etiqueta
+        versiones_pool = _versiones_pool()
+        cambiados = [] if anterior is None else [
+            int(clave.split(':', 1)[1]) for clave, numero in versiones_pool.items()
+            if anterior.versiones_pool.get(clave) != numero
+        ]
+        if anterior is None or len(cambiados) > MAX_CAMBIADOS:
+            self.reconstrucciones += 1
+            return Espectros(version, versiones_pool, *_leer_filas())
+
+        self.actualizaciones += 1
+        return anterior.actualizar(version, versiones_pool, cambiados, _leer_filas(cambiados))
+
+
+indice = IndiceSimilitud()
+
+
+def parse_parametros(params):
+    """
+    Interpreta ?metrica= y ?k= de la búsqueda de similares
+
+    Raises:
+        ValueError: Si algún parámetro es inválido
+    """
+    metrica = params.get('metrica') or METRICAS[0]
+    if metrica not in METRICAS:
+        raise ValueError(f"'metrica' debe ser una de: {', '.join(METRICAS)}")
+    k = params.get('k') or str(K_POR_DEFECTO)
+    if not k.isdigit() or not 1 <= int(k) <= K_MAXIMO:
+        raise ValueError(f"'k' debe ser un entero entre 1 y {K_MAXIMO}")
+    return metrica, int(k)
+
+
+def similares(pool_id, metrica=METRICAS[0], k=K_POR_DEFECTO):
+    """
+    Pools con el espectro polínico más parecido al del pool indicado
+
+    Returns:
+        list: Diccionarios con pool, num_registro, fecha_analisis, similitud (0 a 1)
+            y especies_en_comun; None si el pool no tiene análisis palinológicos
+    """
+    vecinos = indice.obtener().similares(pool_id, metrica, k)
+    if vecinos is None:
+        return None
+    datos = {
+        pool['id']: pool
+        for pool in Pool.objects.filter(id__in=[otro for otro, _, _ in vecinos]).values(
+            'id', 'num_registro', 'fecha_analisis'
+        )
+    }
+    return [
+        {
+            'pool': otro,
+            'num_registro': datos[otro]['num_registro'],
+            'fecha_analisis': datos[otro]['fecha_analisis'],
+            'similitud': round(similitud, 4),
+            'especies_en_comun': comunes,
+        }
+        for otro, similitud, comunes in vecinos
+        if otro in datos
+    ]
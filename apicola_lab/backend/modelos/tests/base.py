@@ -0,0 +1,111 @@
+"""
+Datos de prueba comunes a los tests de modelos
+
+DatosLaboratorioTestCase arma un laboratorio chico (apiarios, tambores, pools y
+análisis) y compara las tablas precalculadas con una reconstrucción completa.
+"""
+from datetime import date
+
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from modelos import resumenes
+from modelos.catalogo import catalogo
+from modelos.models.Analista_model import Analista
+from modelos.models.Apicultor_model import Apicultor
+from modelos.models.Apiario_model import Apiario
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.models.TamborApiario_model import TamborApiario
+from modelos.models.Especie_model import Especie
+from modelos.models.Pool_model import Pool
+from modelos.models.ContienePool_model import ContienePool
+from modelos.models.AnalisisPalinologico_model import AnalisisPalinologico
+from modelos.models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from modelos.models.ResumenTotal_model import ResumenTotal
+from modelos.models.ResumenEspecie_model import ResumenEspecie
+from modelos.models.ResumenHumedadApiario_model import ResumenHumedadApiario
+from modelos.models.ResumenDiario_model import ResumenDiario
+from modelos.models.SerieMensualPolen_model import SerieMensualPolen
+from modelos.models.AporteSeriePool_model import AporteSeriePool
+from modelos.models.CeldaPolen_model import CeldaPolen
+
+# Tablas precalculadas: modelo -> (campos que identifican la fila, campos acumulados)
+TABLAS_PRECALCULADAS = {
+    ResumenTotal: (('clave',), ('valor',)),
+    ResumenEspecie: (('especie_id',), ('total_analisis', 'total_granos')),
+    ResumenHumedadApiario: (('apiario_id',), ('cantidad_analisis', 'cantidad_humedad', 'suma_humedad')),
+    ResumenDiario: (('fecha', 'clave'), ('cantidad',)),
+    SerieMensualPolen: (('mes', 'especie_id', 'apiario_id'), ('granos',)),
+    AporteSeriePool: (('pool_id',), ('aportes',)),
+    CeldaPolen: (('celda', 'nivel', 'especie_id'), ('granos',)),
+}
+
+
+class DatosLaboratorioTestCase(TestCase):
+    """Dos apiarios, seis tambores (uno por mes), dos pools de tres tambores y cuatro especies"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.analista = Analista.objects.create(nombres='Ana', apellidos='Paz', username='ana', email='ana@lab.com')
+        apicultor = Apicultor.objects.create(nombre='Juan', apellido='Pérez')
+        cls.apiarios = [
+            Apiario.objects.create(
+                apicultor=apicultor, nombre_apiario='Norte', cant_colmenas=10, localidad='Colón',
+                latitud='-32.20000000', longitud='-58.14000000'
+            ),
+            Apiario.objects.create(
+                apicultor=apicultor, nombre_apiario='Sur', cant_colmenas=5, localidad='Paraná',
+                latitud='-31.73000000', longitud='-60.52000000'
+            ),
+        ]
+        cls.tambores = []
+        for i in range(6):
+            tambor = MuestraTambor.objects.create(num_registro=f'T{i}', fecha_de_extraccion=date(2025, 1 + i, 10))
+            TamborApiario.objects.create(tambor=tambor, apiario=cls.apiarios[i % 2])
+            cls.tambores.append(tambor)
+        cls.especies = [
+            Especie.objects.create(nombre_cientifico=nombre, nombre_comun=comun, familia=familia)
+            for nombre, comun, familia in (
+                ('Eucalyptus camaldulensis', 'Eucalipto', 'Myrtaceae'),
+                ('Trifolium repens', 'Trébol blanco', 'Fabaceae'),
+                ('Lotus corniculatus', 'Lotus', 'Fabaceae'),
+                ('Helianthus annuus', 'Girasol', 'Asteraceae'),
+            )
+        ]
+        cls.pools = []
+        for j in range(2):
+            pool = Pool.objects.create(analista=cls.analista, fecha_analisis=date(2025, 3 + j, 1))
+            for tambor in cls.tambores[j * 3:(j + 1) * 3]:
+                ContienePool.objects.create(pool=pool, tambor=tambor)
+            cls.pools.append(pool)
+        for k, especie in enumerate(cls.especies[:3]):
+            AnalisisPalinologico.objects.create(pool=cls.pools[0], especie=especie, cantidad_granos=10 * (k + 1))
+        AnalisisFisicoQuimico.objects.create(
+            analista=cls.analista, tambor=cls.tambores[0], humedad='17.50', color=40,
+            fecha_extraccion=date(2025, 1, 10)
+        )
+
+    def setUp(self):
+        # Las versiones vuelven atrás con cada test: se descartan las cachés del proceso
+        for cache in caches.all():
+            cache.clear()
+        catalogo._actual = None
+        self.client = APIClient()
+
+    def precalculadas(self):
+        """Contenido de las tablas precalculadas, sin las filas que quedaron en cero"""
+        contenido = {}
+        for modelo, (claves, acumulados) in TABLAS_PRECALCULADAS.items():
+            contenido[modelo._meta.db_table] = sorted((
+                (tuple(fila[campo] for campo in claves), tuple(fila[campo] for campo in acumulados))
+                for fila in modelo.objects.values(*claves, *acumulados)
+                if any(fila[campo] for campo in acumulados)
+            ), key=repr)
+        return contenido
+
+    def assertIgualAReconstruccion(self):
+        """Las tablas mantenidas con deltas coinciden con reconstruir_todo()"""
+        incremental = self.precalculadas()
+        resumenes.reconstruir_todo()
+        self.assertEqual(incremental, self.precalculadas())
@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from modelos.services import ApiarioStatsService
+from modelos.models.TamborApiario_model import TamborApiario
+from modelos.models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class ApiarioStatsServiceTests(DatosLaboratorioTestCase):
+
+    def test_estadisticas_en_una_consulta(self):
+        norte, sur = self.apiarios
+        with self.assertNumQueries(1):
+            stats = ApiarioStatsService.get_estadisticas([norte.id, sur.id, 999])
+        self.assertEqual(stats[norte.id], {
+            'total_tambores': 3,
+            'total_muestras': 2,
+            'analisis_palinologicos': 3,
+            'especies_encontradas': 3,
+            'promedio_humedad': Decimal('17.5000'),
+            'promedio_color': 40.0,
+        })
+        self.assertEqual(stats[sur.id]['total_tambores'], 3)
+        self.assertIsNone(stats[sur.id]['promedio_humedad'])
+        self.assertNotIn(999, stats)
+
+    def test_columnas_de_los_modelos(self):
+        # La consulta usa los db_column de los modelos, no nombres escritos a mano
+        sql = ApiarioStatsService._sql(1)
+        for modelo, campo in (
+            (TamborApiario, 'apiario'), (TamborApiario, 'tambor'),
+            (AnalisisFisicoQuimico, 'humedad'), (AnalisisFisicoQuimico, 'color'),
+        ):
+            self.assertIn(modelo._meta.get_field(campo).column, sql)
+
+    def test_vista_en_lote(self):
+        respuesta = self.client.get(f'/api/apiarios/estadisticas_lote/?ids={self.apiarios[1].id},{self.apiarios[0].id}')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual({fila['apiario'] for fila in respuesta.json()}, {apiario.id for apiario in self.apiarios})
+        self.assertEqual(self.client.get('/api/apiarios/estadisticas_lote/?ids=1,x').status_code, 400)
@@ -0,0 +1,43 @@
+from modelos.models.Apicultor_model import Apicultor
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class GetCondicionalTests(DatosLaboratorioTestCase):
+    """list y retrieve responden 304 mientras no cambie ninguna tabla que leen"""
+
+    def test_listado_sin_cambios(self):
+        respuesta = self.client.get('/api/apiarios/')
+        self.assertEqual(respuesta.status_code, 200)
+        # Sólo se consulta version_datos: ni el listado ni el serializer
+        with self.assertNumQueries(1):
+            no_modificado = self.client.get('/api/apiarios/', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(no_modificado.status_code, 304)
+        self.assertEqual(no_modificado['ETag'], respuesta['ETag'])
+
+    def test_if_modified_since(self):
+        respuesta = self.client.get(f'/api/apiarios/{self.apiarios[0].id}/')
+        no_modificado = self.client.get(
+            f'/api/apiarios/{self.apiarios[0].id}/', HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified']
+        )
+        self.assertEqual(no_modificado.status_code, 304)
+
+    def test_cambio_en_la_tabla_invalida(self):
+        url = f'/api/apiarios/{self.apiarios[0].id}/'
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, {'cant_colmenas': 15}, format='json')
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['cant_colmenas'], 15)
+
+    def test_include_depende_de_la_relacion(self):
+        # Sin ?include= el apicultor no forma parte de la respuesta ni de su versión
+        plano = '/api/apiarios/'
+        expandido = '/api/apiarios/?include=apicultor'
+        etags = {url: self.client.get(url)['ETag'] for url in (plano, expandido)}
+        apicultor = Apicultor.objects.get(nombre='Juan')
+        apicultor.apellido = 'Pérez Soto'
+        apicultor.save()
+        self.assertEqual(self.client.get(plano, HTTP_IF_NONE_MATCH=etags[plano]).status_code, 304)
+        respuesta = self.client.get(expandido, HTTP_IF_NONE_MATCH=etags[expandido])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['results'][0]['apicultor']['apellido'], 'Pérez Soto')
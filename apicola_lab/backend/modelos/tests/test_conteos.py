@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from modelos.services import ConteoPolenService
+from modelos.models.Especie_model import Especie
+from modelos.models.AnalisisPalinologico_model import AnalisisPalinologico
+from modelos.tests.base import DatosLaboratorioTestCase
+
+# Consultas de guardar_conteos en un pool sin análisis previos, con cualquier cantidad de especies,
+# incluido el incremento de versiones al confirmar la transacción
+CONSULTAS_CONTEO = 23
+
+
+class ConteoPolenServiceTests(DatosLaboratorioTestCase):
+
+    def conteos(self, especies, granos=10):
+        return [{'especie': especie.id, 'cantidad_granos': granos} for especie in especies]
+
+    def test_alta_y_modificacion(self):
+        analisis = ConteoPolenService.guardar_conteos(self.pools[1], self.conteos(self.especies[:2], 25))
+        self.assertEqual([fila.porcentaje for fila in analisis], [Decimal('50.00'), Decimal('50.00')])
+        self.assertIgualAReconstruccion()
+
+        conteos = self.conteos(self.especies[:1], 30) + self.conteos(self.especies[3:], 10)
+        analisis = ConteoPolenService.guardar_conteos(self.pools[1], conteos)
+        self.assertEqual(
+            {fila.especie_id: fila.porcentaje for fila in analisis},
+            {self.especies[0].id: Decimal('46.15'), self.especies[1].id: Decimal('38.46'),
+             self.especies[3].id: Decimal('15.38')}
+        )
+        self.assertIgualAReconstruccion()
+
+    def test_reemplazar_elimina_las_especies_que_no_vienen(self):
+        analisis = ConteoPolenService.guardar_conteos(
+            self.pools[0], self.conteos([self.especies[0], self.especies[3]], 5), reemplazar=True
+        )
+        self.assertEqual([fila.especie_id for fila in analisis], [self.especies[0].id, self.especies[3].id])
+        self.assertEqual(AnalisisPalinologico.objects.filter(pool=self.pools[0]).count(), 2)
+        self.assertIgualAReconstruccion()
+
+    def test_consultas_con_pocas_especies(self):
+        with self.assertNumQueries(CONSULTAS_CONTEO), self.captureOnCommitCallbacks(execute=True):
+            ConteoPolenService.guardar_conteos(self.pools[1], self.conteos(self.especies[:2]))
+
+    def test_consultas_con_muchas_especies(self):
+        # En SQLite cada sentencia admite 999 parámetros: con más especies el mapa usa más lotes
+        especies = Especie.objects.bulk_create([
+            Especie(nombre_cientifico=f'Especie {i}', familia='Prueba') for i in range(12)
+        ])
+        with self.assertNumQueries(CONSULTAS_CONTEO), self.captureOnCommitCallbacks(execute=True):
+            ConteoPolenService.guardar_conteos(self.pools[1], self.conteos(especies))
+
+    def test_vista_conteo_masivo(self):
+        respuesta = self.client.post('/api/analisis-palinologicos/conteo_masivo/', {
+            'pool': self.pools[1].id, 'conteos': self.conteos(self.especies[:2], 7)
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(len(respuesta.json()), 2)
@@ -0,0 +1,39 @@
+from modelos import reportes
+from modelos.services import PoolStatsService
+from modelos.models.AnalisisPalinologico_model import AnalisisPalinologico
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class EstadisticasPoolCacheTests(DatosLaboratorioTestCase):
+    """La caché de estadísticas por pool se invalida con todo lo que muestra"""
+
+    def test_acierto_con_una_sola_consulta(self):
+        PoolStatsService.get_pool_stats(self.pools[0].id)
+        with self.assertNumQueries(1):
+            datos = PoolStatsService.get_pool_stats(self.pools[0].id)
+        self.assertEqual(datos['pool_info']['total_granos'], 60)
+
+    def test_cambio_de_analista_invalida(self):
+        self.assertEqual(PoolStatsService.get_pool_stats(self.pools[0].id)['pool_info']['analista'], 'Ana Paz')
+        self.analista.apellidos = 'Ruiz'
+        self.analista.save()
+        self.assertEqual(PoolStatsService.get_pool_stats(self.pools[0].id)['pool_info']['analista'], 'Ana Ruiz')
+
+    def test_cambio_de_analisis_invalida(self):
+        PoolStatsService.get_pool_stats(self.pools[0].id)
+        AnalisisPalinologico.objects.create(pool=self.pools[0], especie=self.especies[3], cantidad_granos=40)
+        self.assertEqual(PoolStatsService.get_pool_stats(self.pools[0].id)['pool_info']['total_granos'], 100)
+
+    def test_reporte_usa_las_mismas_versiones(self):
+        versiones_reporte = reportes._versiones_por_pool([self.pools[0].id])[self.pools[0].id]
+        self.assertEqual(sorted(versiones_reporte), sorted(PoolStatsService.claves_version(self.pools[0].id)))
+
+    def test_etag_de_la_vista(self):
+        url = f'/api/pool/{self.pools[0].id}/stats/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.analista.nombres = 'Ana María'
+        self.analista.save()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['pool_info']['analista'], 'Ana María Paz')
@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from modelos import geo
+from modelos.importacion import Importador, ImportadorApiarios, importar_csv
+from modelos.models.Apiario_model import Apiario
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class ImportadorBaseTests(SimpleTestCase):
+
+    def test_fusionar_es_abstracto(self):
+        with self.assertRaises(TypeError):
+            Importador()
+
+        class SinFusion(Importador):
+            tipo = 'prueba'
+
+        with self.assertRaises(TypeError):
+            SinFusion()
+
+
+class ImportadorApiariosTests(DatosLaboratorioTestCase):
+
+    def importar(self, *filas):
+        lineas = ['apicultor_nombre,apicultor_apellido,nombre_apiario,cant_colmenas,localidad,latitud,longitud']
+        return importar_csv('apiarios', lineas + list(filas))
+
+    def test_actualiza_y_crea(self):
+        norte = self.apiarios[0]
+        resumen = self.importar('Juan,Pérez,Norte,12,Villa Elisa,,', 'Juan,Pérez,Este,8,Concordia,-31.39,-58.02')
+        self.assertEqual((resumen['creados'], resumen['actualizados'], resumen['filas_con_error']), (1, 1, 0))
+
+        norte.refresh_from_db()
+        self.assertEqual((norte.cant_colmenas, norte.localidad), (12, 'Villa Elisa'))
+        # Las coordenadas vacías no pisan las existentes
+        self.assertEqual(str(norte.latitud), '-32.20000000')
+        este = Apiario.objects.get(nombre_apiario='Este')
+        self.assertEqual(este.geohash, geo.codificar(este.latitud, este.longitud))
+        self.assertIgualAReconstruccion()
+
+    def test_apicultor_inexistente(self):
+        resumen = self.importar('Rosa,Gómez,Oeste,3,Paraná,,')
+        self.assertEqual(resumen['errores'], [{'fila': 2, 'errores': ['Apicultor inexistente']}])
+        self.assertFalse(Apiario.objects.filter(nombre_apiario='Oeste').exists())
+
+    def test_columnas_de_los_modelos(self):
+        # La fusión nombra las columnas de Apiario según sus campos, citadas por el backend
+        with CaptureQueriesContext(connection) as consultas:
+            self.importar('Juan,Pérez,Este,8,Concordia,-31.39,-58.02')
+        tabla = connection.ops.quote_name(Apiario._meta.db_table)
+        insercion = next(q['sql'] for q in consultas if q['sql'].startswith(f'INSERT INTO {tabla} '))
+        for campo in ImportadorApiarios.columnas.keys() - {'apicultor_nombre', 'apicultor_apellido'}:
+            self.assertIn(connection.ops.quote_name(Apiario._meta.get_field(campo).column), insercion)
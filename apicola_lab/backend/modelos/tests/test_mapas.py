@@ -0,0 +1,98 @@
+import math
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from modelos import mapas, masivos, series
+from modelos.models.Apiario_model import Apiario
+from modelos.models.Especie_model import Especie
+from modelos.models.Pool_model import Pool
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.models.AnalisisPalinologico_model import AnalisisPalinologico
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+def mosaico_de(latitud, longitud, z):
+    n = 2 ** z
+    x = int((longitud + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(latitud))) / math.pi) / 2 * n)
+    return z, x, y
+
+
+class CeldasIncrementalesTests(DatosLaboratorioTestCase):
+    """CeldaPolen coincide con una reconstrucción desde las series"""
+
+    def test_cambios_de_analisis_y_apiarios(self):
+        AnalisisPalinologico.objects.create(pool=self.pools[1], especie=self.especies[3], cantidad_granos=40)
+        self.assertIgualAReconstruccion()
+        apiario = self.apiarios[1]
+        apiario.latitud, apiario.longitud = '-34.60000000', '-58.40000000'
+        apiario.save()
+        self.assertIgualAReconstruccion()
+        self.tambores[1].apiarios.add(self.apiarios[0])
+        masivos.eliminar(AnalisisPalinologico.objects.filter(especie=self.especies[0]))
+        self.assertIgualAReconstruccion()
+        self.apiarios[0].delete()
+        self.assertIgualAReconstruccion()
+
+    def test_un_upsert_de_celdas_por_cambio(self):
+        # 15 especies x 5 niveles x 2 apiarios entran en un lote también en SQLite
+        especies = Especie.objects.bulk_create([
+            Especie(nombre_cientifico=f'Especie {i}', familia='Prueba') for i in range(15)
+        ])
+        AnalisisPalinologico.objects.bulk_create([
+            AnalisisPalinologico(pool=self.pools[1], especie=especie, cantidad_granos=i + 1)
+            for i, especie in enumerate(especies)
+        ])
+        with CaptureQueriesContext(connection) as muchas:
+            series.actualizar_pools([self.pools[1].id])
+        AnalisisPalinologico.objects.filter(pool=self.pools[0]).update(cantidad_granos=100)
+        with CaptureQueriesContext(connection) as pocas:
+            series.actualizar_pools([self.pools[0].id])
+        self.assertEqual(len(muchas), len(pocas))
+        for consultas in (muchas, pocas):
+            escrituras = [
+                consulta for consulta in consultas.captured_queries
+                if '"celda_polen"' in consulta['sql'] and not consulta['sql'].startswith('SELECT')
+            ]
+            self.assertEqual(len(escrituras), 1)
+        # Los análisis se crearon sin señales: se compara sólo con las celdas rearmadas desde la serie
+        incremental = self.precalculadas()['celda_polen']
+        mapas.reconstruir()
+        self.assertEqual(incremental, self.precalculadas()['celda_polen'])
+
+
+class MapaPolenViewTests(DatosLaboratorioTestCase):
+
+    def test_mosaico_y_revalidacion(self):
+        z, x, y = mosaico_de(-32.2, -58.14, 9)
+        respuesta = self.client.get(f'/api/mapa/{z}/{x}/{y}/')
+        self.assertEqual(respuesta.status_code, 200)
+        celdas = respuesta.json()['celdas']
+        self.assertEqual(len(celdas), 1)
+        # Norte tiene los tambores de enero y marzo del pool 0: 2/3 de sus 60 granos
+        self.assertEqual(celdas[0][3], 40)
+
+        etag = respuesta['ETag']
+        self.assertEqual(self.client.get(f'/api/mapa/{z}/{x}/{y}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Un cambio en otra región no invalida el mosaico
+        lejos = Apiario.objects.create(
+            apicultor=self.apiarios[0].apicultor, nombre_apiario='Lejos', cant_colmenas=1,
+            localidad='Roma', latitud='41.90000000', longitud='12.50000000'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            tambor = MuestraTambor.objects.create(num_registro='T9', fecha_de_extraccion=date(2025, 5, 1))
+            tambor.apiarios.add(lejos)
+            pool = Pool.objects.create(analista=self.analista)
+            pool.tambores.add(tambor)
+            AnalisisPalinologico.objects.create(pool=pool, especie=self.especies[0], cantidad_granos=5)
+        self.assertEqual(self.client.get(f'/api/mapa/{z}/{x}/{y}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalisisPalinologico.objects.create(pool=self.pools[0], especie=self.especies[3], cantidad_granos=3)
+        self.assertEqual(self.client.get(f'/api/mapa/{z}/{x}/{y}/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_mosaico_invalido(self):
+        self.assertEqual(self.client.get('/api/mapa/2/4/0/').status_code, 400)
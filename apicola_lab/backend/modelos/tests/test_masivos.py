@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from modelos import masivos
+from modelos.models.Pool_model import Pool
+from modelos.models.AnalisisPalinologico_model import AnalisisPalinologico
+from modelos.models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class OperacionesMasivasTests(DatosLaboratorioTestCase):
+    """Las bajas y modificaciones masivas mantienen resúmenes y porcentajes sin señales"""
+
+    def test_baja_recalcula_porcentajes_del_pool(self):
+        masivos.eliminar(AnalisisPalinologico.objects.filter(especie=self.especies[0]))
+        porcentajes = dict(
+            AnalisisPalinologico.objects.filter(pool=self.pools[0]).values_list('especie_id', 'porcentaje')
+        )
+        self.assertEqual(porcentajes, {self.especies[1].id: Decimal('40.00'), self.especies[2].id: Decimal('60.00')})
+        self.assertIgualAReconstruccion()
+
+    def test_resumenes_tras_bajas_y_modificaciones(self):
+        masivos.actualizar(
+            AnalisisPalinologico.objects.filter(especie=self.especies[1]), {'especie': self.especies[3]}
+        )
+        masivos.eliminar(AnalisisFisicoQuimico.objects.all())
+        self.assertIgualAReconstruccion()
+        # La baja de pools borra en cascada dentro de una transacción y dispara señales
+        with self.captureOnCommitCallbacks(execute=True):
+            masivos.eliminar(Pool.objects.filter(id=self.pools[0].id))
+        self.assertIgualAReconstruccion()
+
+    def test_consultas_no_dependen_de_las_filas(self):
+        AnalisisPalinologico.objects.create(pool=self.pools[0], especie=self.especies[3], cantidad_granos=5)
+        with CaptureQueriesContext(connection) as una:
+            masivos.eliminar(AnalisisPalinologico.objects.filter(especie=self.especies[0]))
+        with CaptureQueriesContext(connection) as dos:
+            masivos.eliminar(AnalisisPalinologico.objects.filter(especie__in=self.especies[1:3]))
+        self.assertEqual(len(una), len(dos))
+        self.assertIgualAReconstruccion()
+
+
+class MasivoViewTests(DatosLaboratorioTestCase):
+    url = '/api/analisis-palinologicos/masivo/'
+
+    def test_dry_run_no_escribe(self):
+        respuesta = self.client.delete(self.url, {'filtros': {'pool': self.pools[0].id}, 'dry_run': True}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['afectados'], 3)
+        self.assertEqual(AnalisisPalinologico.objects.count(), 3)
+
+    def test_baja_por_filtros_de_la_url(self):
+        respuesta = self.client.delete(f'{self.url}?especie={self.especies[2].id}')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['afectados'], 1)
+        self.assertIgualAReconstruccion()
+
+    def test_conflicto_de_unicidad_devuelve_409(self):
+        # El pool 0 ya tiene un análisis de la especie 1
+        respuesta = self.client.patch(
+            self.url,
+            {'filtros': {'especie': self.especies[0].id}, 'cambios': {'especie': self.especies[1].id}},
+            format='json'
+        )
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(AnalisisPalinologico.objects.filter(especie=self.especies[0]).count(), 1)
+
+    def test_filtro_no_permitido(self):
+        respuesta = self.client.delete(self.url, {'filtros': {'cantidad_granos__gt': 5}}, format='json')
+        self.assertEqual(respuesta.status_code, 400)
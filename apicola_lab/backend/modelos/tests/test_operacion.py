@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from modelos.metricas import registro
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class HealthCheckTests(TestCase):
+
+    def test_base_disponible(self):
+        respuesta = self.client.get('/health/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['status'], 'healthy')
+
+    def test_base_caida_devuelve_503(self):
+        with mock.patch('modelos.views.connection.cursor', side_effect=DatabaseError('sin conexión')):
+            respuesta = self.client.get('/health/')
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual(respuesta.json()['database']['status'], 'error')
+
+
+@override_settings(METRICAS_IPS_PERMITIDAS=['127.0.0.1', '10.1.0.0/16'], METRICAS_TOKEN='')
+class MetricsAccesoTests(SimpleTestCase):
+
+    def test_red_permitida(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+
+    def test_red_no_permitida(self):
+        # X-Forwarded-For no cuenta: lo puede enviar cualquier cliente
+        respuesta = self.client.get('/metrics', REMOTE_ADDR='203.0.113.9', HTTP_X_FORWARDED_FOR='127.0.0.1')
+        self.assertEqual(respuesta.status_code, 403)
+
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_token(self):
+        self.assertEqual(
+            self.client.get('/metrics', REMOTE_ADDR='203.0.113.9', HTTP_AUTHORIZATION='Bearer secreto').status_code,
+            200
+        )
+        self.assertEqual(
+            self.client.get('/metrics', REMOTE_ADDR='203.0.113.9', HTTP_AUTHORIZATION='Bearer otro').status_code,
+            403
+        )
+
+
+class MetricasStreamingTests(DatosLaboratorioTestCase):
+
+    def setUp(self):
+        super().setUp()
+        registro.reiniciar()
+        self.addCleanup(registro.reiniciar)
+
+    def test_se_registra_al_cerrar_con_las_consultas_del_cuerpo(self):
+        respuesta = self.client.get('/api/analisis-fisicoquimicos/exportar/?formato=ndjson')
+        clave = (respuesta.resolver_match.view_name, 'GET')
+        # Las consultas de la exportación corren mientras se envía el cuerpo
+        self.assertNotIn(clave, registro.consultas)
+        contenido = b''.join(respuesta.streaming_content)
+        self.assertEqual(registro.consultas[clave].total, 1)
+        self.assertGreater(registro.consultas[clave].suma, 0)
+        self.assertEqual(registro.bytes_respuesta[clave].suma, len(contenido))
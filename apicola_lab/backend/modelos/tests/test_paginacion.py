@@ -0,0 +1,57 @@
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class CursorPaginacionTests(DatosLaboratorioTestCase):
+    """Los listados se paginan por cursor aunque el cliente no lo pida"""
+
+    def recorrer(self, url):
+        ids, siguiente = [], url
+        while siguiente:
+            datos = self.client.get(siguiente).json()
+            ids.extend(fila['id'] for fila in datos['results'])
+            siguiente = datos['next']
+        return ids
+
+    def test_listado_paginado_por_defecto(self):
+        datos = self.client.get('/api/tambores/').json()
+        self.assertEqual(set(datos), {'next', 'previous', 'results'})
+        self.assertEqual([fila['id'] for fila in datos['results']], sorted(tambor.id for tambor in self.tambores))
+        self.assertIsNone(datos['next'])
+
+    def test_recorrido_completo_estable_ante_inserciones(self):
+        primera = self.client.get('/api/tambores/?page_size=4').json()
+        self.assertEqual(len(primera['results']), 4)
+        # Las filas nuevas quedan después del cursor: no corren la página siguiente, aparecen al final
+        nuevo = MuestraTambor.objects.create(num_registro='T9')
+        segunda = self.client.get(primera['next']).json()
+        self.assertEqual(
+            [fila['id'] for fila in primera['results'] + segunda['results']],
+            sorted(tambor.id for tambor in self.tambores) + [nuevo.id]
+        )
+        self.assertIsNone(segunda['next'])
+
+    def test_listado_plano_con_campos(self):
+        # ?fields= sin relaciones usa el camino de .values(), también paginado
+        ids = self.recorrer('/api/tambores/?fields=id,num_registro&page_size=2')
+        self.assertEqual(ids, sorted(tambor.id for tambor in self.tambores))
+
+    def test_tamano_de_pagina_maximo(self):
+        MuestraTambor.objects.bulk_create([MuestraTambor(num_registro=f'M{i}') for i in range(1005)])
+        datos = self.client.get('/api/tambores/?page_size=5000').json()
+        self.assertEqual(len(datos['results']), 1000)
+        self.assertIsNotNone(datos['next'])
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self.client.get('/api/tambores/?cursor=xyz').status_code, 404)
+
+    def test_catalogo_de_especies_completo(self):
+        # Sin parámetros se responde el catálogo precalculado, sin paginar
+        datos = self.client.get('/api/especies/').json()
+        self.assertEqual(len(datos), len(self.especies))
+
+    def test_catalogo_de_especies_sin_paginar_con_parametros(self):
+        # Con parámetros la lista sale del queryset, pero con la misma forma que la instantánea
+        datos = self.client.get('/api/especies/?fields=id,nombre_cientifico').json()
+        self.assertEqual(sorted(fila['id'] for fila in datos), sorted(especie.id for especie in self.especies))
+        self.assertEqual(set(datos[0]), {'id', 'nombre_cientifico'})
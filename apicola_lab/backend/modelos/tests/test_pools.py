@@ -0,0 +1,47 @@
+from modelos.models.ContienePool_model import ContienePool
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.models.Pool_model import Pool
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class EnsamblarPoolTests(DatosLaboratorioTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.libres = [MuestraTambor.objects.create(num_registro=f'L{i}') for i in range(3)]
+        self.asignado = MuestraTambor.objects.create(num_registro='A0', estado_analisis_palinologico=True)
+
+    def ensamblar(self, tambores, **datos):
+        # La vista ensambla en una transacción: los resúmenes se aplican al confirmarla
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/pools/ensamblar/', {
+                'analista': self.analista.id, 'tambores': tambores, **datos
+            }, format='json')
+
+    def test_crea_el_pool_con_sus_tambores(self):
+        ids = [tambor.id for tambor in self.libres]
+        respuesta = self.ensamblar(ids, num_registro='P-100')
+        self.assertEqual(respuesta.status_code, 201)
+        pool_id = respuesta.json()['id']
+        self.assertEqual(
+            sorted(ContienePool.objects.filter(pool_id=pool_id).values_list('tambor_id', flat=True)), ids
+        )
+        self.assertFalse(MuestraTambor.objects.filter(id__in=ids, estado_analisis_palinologico=False).exists())
+        self.assertIgualAReconstruccion()
+
+    def test_tambores_no_disponibles_devuelve_409_sin_cambios(self):
+        pools = Pool.objects.count()
+        respuesta = self.ensamblar([self.libres[0].id, self.asignado.id, 9999])
+        self.assertEqual(respuesta.status_code, 409)
+        datos = respuesta.json()
+        self.assertEqual(
+            (datos['asignados'], datos['reservados'], datos['inexistentes']), ([self.asignado.id], [], [9999])
+        )
+        # La transacción se revierte completa: el tambor libre sigue libre
+        self.assertEqual(Pool.objects.count(), pools)
+        self.libres[0].refresh_from_db()
+        self.assertFalse(self.libres[0].estado_analisis_palinologico)
+
+    def test_tambores_repetidos(self):
+        respuesta = self.ensamblar([self.libres[0].id, self.libres[0].id])
+        self.assertEqual(respuesta.status_code, 400)
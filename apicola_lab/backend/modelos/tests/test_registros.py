@@ -0,0 +1,56 @@
+from datetime import date
+
+from modelos.models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.models.Pool_model import Pool
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class NumeroDeRegistroTests(DatosLaboratorioTestCase):
+
+    def nuevo_pool(self, **datos):
+        return Pool.objects.create(analista=self.analista, **datos)
+
+    def test_numeracion_automatica(self):
+        primero, segundo = self.nuevo_pool(), self.nuevo_pool()
+        self.assertEqual(int(segundo.num_registro), int(primero.num_registro) + 1)
+        self.assertEqual(len(segundo.num_registro), 5)
+
+    def test_numero_explicito_por_la_api_avanza_la_secuencia(self):
+        respuesta = self.client.post('/api/pools/', {
+            'analista': self.analista.id, 'num_registro': '00050'
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        # Antes la secuencia quedaba atrás y el próximo alta chocaba con el 00050
+        self.assertEqual(self.nuevo_pool().num_registro, '00051')
+
+    def test_numero_explicito_al_ensamblar(self):
+        tambor = MuestraTambor.objects.create(num_registro='L0')
+        respuesta = self.client.post('/api/pools/ensamblar/', {
+            'analista': self.analista.id, 'tambores': [tambor.id], 'num_registro': '00070'
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(self.nuevo_pool().num_registro, '00071')
+
+    def test_numeros_que_no_mueven_la_secuencia(self):
+        self.nuevo_pool(num_registro='00040')
+        # Ni un número menor ni uno no numérico hacen retroceder la numeración
+        self.nuevo_pool(num_registro='00003')
+        self.nuevo_pool(num_registro='P-100')
+        self.assertEqual(self.nuevo_pool().num_registro, '00041')
+
+    def test_tambor_sin_numero_recibe_el_siguiente(self):
+        MuestraTambor.objects.create(num_registro='00020')
+        self.assertEqual(MuestraTambor.objects.create(fecha_de_extraccion=date(2025, 8, 1)).num_registro, '00021')
+        respuesta = self.client.post('/api/tambores/', {'fecha_de_extraccion': '2025-08-02'}, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.json()['num_registro'], '00022')
+
+    def test_analisis_fisicoquimico_numerado(self):
+        analisis = AnalisisFisicoQuimico.objects.create(
+            analista=self.analista, tambor=self.tambores[1], fecha_extraccion=date(2025, 2, 10)
+        )
+        siguiente = AnalisisFisicoQuimico.objects.create(
+            analista=self.analista, tambor=self.tambores[1], fecha_extraccion=date(2025, 2, 10)
+        )
+        self.assertEqual(int(siguiente.num_registro), int(analisis.num_registro) + 1)
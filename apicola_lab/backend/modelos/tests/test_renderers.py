@@ -0,0 +1,12 @@
+from django.test import SimpleTestCase
+
+from modelos.renderers import OrjsonRenderer
+
+
+class OrjsonRendererTests(SimpleTestCase):
+
+    def test_float_no_finito_como_null(self):
+        # JSONRenderer de DRF falla con estos valores; orjson los escribe como null
+        contenido = OrjsonRenderer().render({'a': float('nan'), 'b': float('inf'), 'c': float('-inf'), 'd': 1.5})
+        self.assertEqual(contenido, b'{"a":null,"b":null,"c":null,"d":1.5}')
+
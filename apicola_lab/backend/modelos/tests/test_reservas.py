@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from modelos.models.Analista_model import Analista
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class ReservaTamboresTests(DatosLaboratorioTestCase):
+
+    def setUp(self):
+        super().setUp()
+        MuestraTambor.objects.update(estado_analisis_palinologico=True)
+        self.libres = [MuestraTambor.objects.create(num_registro=f'L{i}') for i in range(4)]
+        self.otro = Analista.objects.create(nombres='Luis', apellidos='Sosa', username='luis', email='luis@lab.com')
+
+    def reservar(self, analista, **datos):
+        return self.client.post('/api/tambores/reservar/', {'analista': analista.id, **datos}, format='json')
+
+    def ensamblar(self, analista, tambores):
+        return self.client.post('/api/pools/ensamblar/', {
+            'analista': analista.id, 'tambores': tambores
+        }, format='json')
+
+    def test_dos_analistas_reciben_tambores_distintos(self):
+        propios = self.reservar(self.analista, cantidad=3).json()['reservados']
+        ajenos = self.reservar(self.otro, cantidad=3).json()['reservados']
+        self.assertEqual(len(propios), 3)
+        # Sólo queda un tambor libre para el segundo analista
+        self.assertEqual(ajenos, [self.libres[3].id])
+
+    def test_reserva_ajena_devuelve_409_al_ensamblar(self):
+        reservado = self.reservar(self.analista, tambores=[self.libres[0].id]).json()['reservados']
+        respuesta = self.ensamblar(self.otro, reservado + [self.libres[1].id])
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.json()['reservados'], reservado)
+        # El dueño de la reserva sí puede usar el tambor
+        self.assertEqual(self.ensamblar(self.analista, reservado).status_code, 201)
+
+    def test_reserva_vencida_queda_libre(self):
+        MuestraTambor.objects.filter(id=self.libres[0].id).update(
+            reservado_por=self.analista, reservado_hasta=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(self.ensamblar(self.otro, [self.libres[0].id]).status_code, 201)
+
+    def test_liberar_reserva(self):
+        self.reservar(self.analista, cantidad=2)
+        respuesta = self.client.post('/api/tambores/liberar_reserva/', {'analista': self.analista.id}, format='json')
+        self.assertEqual(respuesta.json()['liberados'], 2)
+        self.assertEqual(len(self.reservar(self.otro, cantidad=4).json()['reservados']), 4)
+
+    def test_cantidad_o_tambores(self):
+        respuesta = self.reservar(self.analista, cantidad=1, tambores=[self.libres[0].id])
+        self.assertEqual(respuesta.status_code, 400)
@@ -0,0 +1,110 @@
+from datetime import date
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from modelos import resumenes
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.models.TamborApiario_model import TamborApiario
+from modelos.models.AnalisisPalinologico_model import AnalisisPalinologico
+from modelos.models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from modelos.models.ResumenEspecie_model import ResumenEspecie
+from modelos.models.ResumenHumedadApiario_model import ResumenHumedadApiario
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class ResumenesIncrementalesTests(DatosLaboratorioTestCase):
+    """Los deltas de señales y operaciones masivas dejan lo mismo que una reconstrucción"""
+
+    def test_altas_modificaciones_y_bajas(self):
+        analisis = AnalisisPalinologico.objects.get(pool=self.pools[0], especie=self.especies[0])
+        analisis.cantidad_granos = 99
+        analisis.especie = self.especies[3]
+        analisis.save()
+        AnalisisPalinologico.objects.create(pool=self.pools[1], especie=self.especies[0], cantidad_granos=7)
+        fisicoquimico = AnalisisFisicoQuimico.objects.create(
+            analista=self.analista, tambor=self.tambores[1], humedad='18.00', fecha_extraccion=date(2025, 2, 1)
+        )
+        fisicoquimico.humedad = '19.00'
+        fisicoquimico.tambor = self.tambores[2]
+        fisicoquimico.save()
+        TamborApiario.objects.create(tambor=self.tambores[0], apiario=self.apiarios[1])
+        self.tambores[3].delete()
+        self.pools[0].delete()
+        self.assertIgualAReconstruccion()
+
+    def test_cambios_de_muchos_a_muchos(self):
+        AnalisisFisicoQuimico.objects.create(
+            analista=self.analista, tambor=self.tambores[1], humedad='16.00', fecha_extraccion=date(2025, 2, 1)
+        )
+        self.tambores[1].apiarios.add(*self.apiarios)
+        self.assertIgualAReconstruccion()
+        self.tambores[0].apiarios.remove(*self.apiarios)
+        self.assertIgualAReconstruccion()
+        self.apiarios[1].tambores.clear()
+        self.assertIgualAReconstruccion()
+        self.tambores[2].apiarios.set([self.apiarios[1]])
+        self.assertIgualAReconstruccion()
+
+    def test_quitar_un_apiario_no_vinculado_no_resta(self):
+        self.tambores[0].apiarios.remove(self.apiarios[1])
+        resumen = ResumenHumedadApiario.objects.get(apiario=self.apiarios[0])
+        self.assertEqual(resumen.cantidad_analisis, 1)
+        self.assertIgualAReconstruccion()
+
+    def test_un_upsert_por_tabla(self):
+        filas = {(especie.id,): {'total_analisis': 1, 'total_granos': 5} for especie in self.especies}
+        with CaptureQueriesContext(connection) as consultas:
+            resumenes.incrementar_filas(ResumenEspecie, ('especie_id',), filas)
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(
+            dict(ResumenEspecie.objects.values_list('especie_id', 'total_granos')),
+            {self.especies[0].id: 15, self.especies[1].id: 25, self.especies[2].id: 35, self.especies[3].id: 5}
+        )
+
+    def test_humedad_de_varios_vinculos_en_un_upsert(self):
+        tambor = MuestraTambor.objects.create(num_registro='T9')
+        AnalisisFisicoQuimico.objects.create(
+            analista=self.analista, tambor=tambor, humedad='20.00', fecha_extraccion=date(2025, 2, 1)
+        )
+        with self.assertNumQueries(2):
+            resumenes.aplicar_vinculos_tambor_apiario([(tambor.id, apiario.id) for apiario in self.apiarios], 1)
+        TamborApiario.objects.bulk_create([TamborApiario(tambor=tambor, apiario=apiario) for apiario in self.apiarios])
+        self.assertIgualAReconstruccion()
+
+    def test_un_lote_por_transaccion(self):
+        def guardar(especies):
+            with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+                for especie in especies:
+                    AnalisisPalinologico.objects.create(pool=self.pools[1], especie=especie, cantidad_granos=5)
+            self.assertEqual(len(callbacks), 1)
+            with CaptureQueriesContext(connection) as consultas:
+                callbacks[0]()
+            return len(consultas)
+
+        # Las escrituras al confirmar no dependen de cuántas filas se guardaron
+        self.assertEqual(guardar(self.especies[:1]), guardar(self.especies[1:]))
+        self.assertIgualAReconstruccion()
+
+    def test_tablero_lee_los_resumenes(self):
+        respuesta = self.client.get('/api/estadisticas/')
+        self.assertEqual(respuesta.status_code, 200)
+        generales = respuesta.json()['estadisticas_generales']
+        self.assertEqual(generales['total_tambores'], 6)
+        self.assertEqual(generales['total_analisis'], {'palinologicos': 3, 'fisicoquimicos': 1})
+
+    def test_baja_en_cascada_no_crea_filas_huerfanas(self):
+        self.apiarios[0].delete()
+        self.assertFalse(ResumenHumedadApiario.objects.filter(apiario_id=self.apiarios[0].id).exists())
+        self.assertIgualAReconstruccion()
+
+    def test_restas_sin_fila_no_crean(self):
+        with self.assertNumQueries(1):
+            resumenes.incrementar_filas(ResumenEspecie, ('especie_id',), {
+                (self.especies[0].id,): {'total_analisis': -1, 'total_granos': -10},
+                (self.especies[3].id,): {'total_analisis': -1, 'total_granos': -10},
+            })
+        self.assertEqual(
+            dict(ResumenEspecie.objects.values_list('especie_id', 'total_granos')),
+            {self.especies[0].id: 0, self.especies[1].id: 20, self.especies[2].id: 30}
+        )
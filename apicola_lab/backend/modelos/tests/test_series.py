@@ -0,0 +1,143 @@
+from collections import defaultdict
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from modelos import masivos, series
+from modelos.services import EstadisticasGlobalesService, PoolStatsService
+from modelos.models.Pool_model import Pool
+from modelos.models.MuestraTambor_model import MuestraTambor
+from modelos.models.ContienePool_model import ContienePool
+from modelos.models.Especie_model import Especie
+from modelos.models.AnalisisPalinologico_model import AnalisisPalinologico
+from modelos.models.SerieMensualPolen_model import SerieMensualPolen
+from modelos.tests.base import DatosLaboratorioTestCase
+
+
+class SeriesIncrementalesTests(DatosLaboratorioTestCase):
+    """SerieMensualPolen y los aportes por pool coinciden con una reconstrucción"""
+
+    def test_reparto_por_mes_de_extraccion(self):
+        # Pool 0: tambores de enero (Norte), febrero (Sur) y marzo (Norte), 60 granos en total
+        granos = dict(
+            SerieMensualPolen.objects.filter(especie=self.especies[2]).values_list('mes', 'granos')
+        )
+        self.assertEqual(granos, {date(2025, 1, 1): 10, date(2025, 2, 1): 10, date(2025, 3, 1): 10})
+        self.assertEqual(sum(SerieMensualPolen.objects.values_list('granos', flat=True)), 60)
+
+    def test_cambios_de_analisis_tambores_y_vinculos(self):
+        analisis = AnalisisPalinologico.objects.get(pool=self.pools[0], especie=self.especies[1])
+        analisis.cantidad_granos = 7
+        analisis.pool = self.pools[1]
+        analisis.save()
+        tambor = self.tambores[4]
+        tambor.fecha_de_extraccion = date(2024, 12, 1)
+        tambor.save()
+        self.tambores[0].apiarios.add(self.apiarios[1])
+        self.pools[0].tambores.remove(self.tambores[2])
+        self.pools[1].tambores.add(MuestraTambor.objects.create(num_registro='T9'))
+        self.assertIgualAReconstruccion()
+        self.pools[0].tambores.clear()
+        self.tambores[5].delete()
+        self.assertIgualAReconstruccion()
+        self.pools[1].delete()
+        self.assertIgualAReconstruccion()
+
+    def test_operaciones_masivas(self):
+        masivos.actualizar(
+            AnalisisPalinologico.objects.filter(especie=self.especies[0]), {'especie': self.especies[3]}
+        )
+        masivos.actualizar(MuestraTambor.objects.filter(num_registro='T1'), {'fecha_de_extraccion': date(2025, 8, 1)})
+        self.assertIgualAReconstruccion()
+        masivos.eliminar(AnalisisPalinologico.objects.filter(especie=self.especies[2]))
+        self.assertIgualAReconstruccion()
+
+    def test_una_escritura_de_la_serie_por_pool(self):
+        especies = Especie.objects.bulk_create([
+            Especie(nombre_cientifico=f'Especie {i}', familia='Prueba') for i in range(40)
+        ])
+        AnalisisPalinologico.objects.bulk_create([
+            AnalisisPalinologico(pool=self.pools[1], especie=especie, cantidad_granos=i + 1)
+            for i, especie in enumerate(especies)
+        ])
+        with CaptureQueriesContext(connection) as muchas:
+            series.actualizar_pools([self.pools[1].id])
+        AnalisisPalinologico.objects.filter(pool=self.pools[0]).update(cantidad_granos=1)
+        with CaptureQueriesContext(connection) as pocas:
+            series.actualizar_pools([self.pools[0].id])
+        for consultas in (muchas, pocas):
+            escrituras = [
+                consulta for consulta in consultas.captured_queries
+                if '"serie_mensual_polen"' in consulta['sql'] and not consulta['sql'].startswith('SELECT')
+            ]
+            self.assertEqual(len(escrituras), 1)
+
+
+class ScatterGlobalTests(DatosLaboratorioTestCase):
+    """El scatter agregado es la suma de los scatter de cada pool"""
+
+    def _suma_por_pool(self, pools):
+        total = defaultdict(int)
+        for pool in pools:
+            for punto in PoolStatsService.get_pool_stats(pool.id)['scatter_plot']['data']:
+                total[(punto['x'], punto['y'])] += punto['cantidad']
+        return dict(total)
+
+    def _global(self, filtros):
+        datos = EstadisticasGlobalesService.get_scatter_global(filtros)['scatter_plot']['data']
+        return {(punto['x'], punto['y']): punto['cantidad'] for punto in datos}
+
+    def test_coincide_con_los_pools(self):
+        AnalisisPalinologico.objects.create(pool=self.pools[1], especie=self.especies[0], cantidad_granos=9)
+        sin_fecha = Pool.objects.create(analista=self.analista, fecha_analisis=date(2025, 7, 1))
+        AnalisisPalinologico.objects.create(pool=sin_fecha, especie=self.especies[3], cantidad_granos=4)
+        self.assertEqual(self._global({}), self._suma_por_pool(Pool.objects.all()))
+
+    def test_mismos_filtros(self):
+        AnalisisPalinologico.objects.create(pool=self.pools[1], especie=self.especies[0], cantidad_granos=9)
+        ContienePool.objects.create(pool=self.pools[1], tambor=MuestraTambor.objects.create(
+            num_registro='T9', fecha_de_extraccion=date(2025, 9, 1)
+        ))
+        filtros = {'fecha_desde': date(2025, 4, 1)}
+        self.assertEqual(
+            self._global(filtros), self._suma_por_pool(EstadisticasGlobalesService.filtrar_pools(filtros))
+        )
+        filtros = {'apiario': self.apiarios[1].id}
+        self.assertEqual(
+            self._global(filtros), self._suma_por_pool(EstadisticasGlobalesService.filtrar_pools(filtros).distinct())
+        )
+        datos = EstadisticasGlobalesService.get_scatter_global({})['scatter_plot']['data']
+        self.assertEqual(
+            {(punto['x'], punto['y']): punto['pools'] for punto in datos if punto['x'] == self.especies[0].nombre_cientifico},
+            {(self.especies[0].nombre_cientifico, mes): 1 for mes in (1, 2, 3, 4, 5, 6, 9)}
+        )
+
+    def test_scatter_global_cambia_con_la_fecha_de_un_tambor(self):
+        respuesta = self.client.get('/api/pool/stats/')
+        etag = respuesta['ETag']
+        self.assertEqual(self.client.get('/api/pool/stats/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        tambor = self.tambores[0]
+        tambor.fecha_de_extraccion = date(2025, 11, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            tambor.save()
+        respuesta = self.client.get('/api/pool/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(11, {punto['y'] for punto in respuesta.json()['scatter_plot']['data']})
+
+
+class SeriePolenViewTests(DatosLaboratorioTestCase):
+
+    def test_por_temporada(self):
+        respuesta = self.client.get('/api/estadisticas/series/', {'agrupar': 'temporada', 'por': 'especie'})
+        self.assertEqual(respuesta.status_code, 200)
+        periodos = {fila['periodo'] for fila in respuesta.json()['series']}
+        self.assertEqual(periodos, {'2025-verano', '2025-otono'})
+
+    def test_parametros_invalidos(self):
+        respuesta = self.client.get('/api/estadisticas/series/', {'agrupar': 'anio'})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_muestras_por_mes_del_tablero(self):
+        self.assertEqual(sum(fila['total_granos'] for fila in series.muestras_por_mes(meses=1200)), 60)
+
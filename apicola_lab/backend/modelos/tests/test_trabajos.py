@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from modelos import trabajos
+from modelos.models.Apiario_model import Apiario
+from modelos.models.Trabajo_model import Trabajo
+from modelos.tests.base import DatosLaboratorioTestCase
+
+CSV_APIARIOS = (
+    'apicultor_nombre,apicultor_apellido,nombre_apiario,cant_colmenas,localidad,latitud,longitud\n'
+    'Juan,Pérez,Este,8,Concordia,-31.39,-58.02\n'
+    'Juan,Pérez,Oeste,4,Paraná,-31.74,-60.53\n'
+).encode('utf-8')
+
+
+class ImportacionEnSegundoPlanoTests(DatosLaboratorioTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+    def subir(self, contenido):
+        return self.client.post('/api/apiarios/importar/', {
+            'archivo': SimpleUploadedFile('apiarios.csv', contenido, content_type='text/csv'),
+            'asincrono': 'true',
+        }, format='multipart')
+
+    def test_el_trabajo_guarda_la_ruta_y_no_el_contenido(self):
+        respuesta = self.subir(CSV_APIARIOS)
+        self.assertEqual(respuesta.status_code, 202)
+        parametros = respuesta.json()['parametros']
+        self.assertEqual(set(parametros), {'tipo', 'archivo'})
+        self.assertTrue(default_storage.exists(parametros['archivo']))
+        listado = self.client.get('/api/trabajos/').json()['results']
+        self.assertNotIn('Concordia', str(listado))
+
+        trabajos.ejecutar(trabajos.tomar_trabajo('test'))
+        trabajo = Trabajo.objects.get(id=respuesta.json()['id'])
+        self.assertEqual(trabajo.estado, Trabajo.COMPLETADO)
+        self.assertEqual(trabajo.resultado['filas'], 2)
+        self.assertTrue(Apiario.objects.filter(nombre_apiario='Este', localidad='Concordia').exists())
+        self.assertFalse(default_storage.exists(parametros['archivo']))
+        self.assertIgualAReconstruccion()
+
+    def test_encabezado_invalido_no_encola(self):
+        respuesta = self.subir(b'nombre,apellido\nJuan,Perez\n')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(Trabajo.objects.exists())
+
+    def test_cancelar_un_trabajo_terminado_devuelve_409(self):
+        trabajo_id = self.subir(CSV_APIARIOS).json()['id']
+        trabajos.ejecutar(trabajos.tomar_trabajo('test'))
+        self.assertEqual(self.client.post(f'/api/trabajos/{trabajo_id}/cancelar/').status_code, 409)
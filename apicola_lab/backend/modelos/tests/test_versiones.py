@@ -0,0 +1,45 @@
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from modelos import versiones
+
+
+class IncrementoDeVersionesTests(TestCase):
+
+    def test_fuera_de_una_transaccion_es_inmediato(self):
+        versiones.incrementar('a', 'b')
+        self.assertEqual(versiones.obtener('a', 'b'), {'a': 1, 'b': 1})
+
+    def test_una_sola_actualizacion_al_confirmar(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                versiones.incrementar('pool:1', 'especies')
+                versiones.incrementar('pool:1', 'tabla:pool')
+                # Mientras dura la transacción las filas compartidas no se tocan
+                self.assertEqual(versiones.obtener('pool:1')['pool:1'], 0)
+        self.assertEqual(len(callbacks), 1)
+        with CaptureQueriesContext(connection) as consultas:
+            callbacks[0]()
+        self.assertEqual(versiones.obtener('pool:1', 'especies', 'tabla:pool'),
+                         {'pool:1': 1, 'especies': 1, 'tabla:pool': 1})
+        # Las filas se bloquean en orden de clave
+        bloqueo = next(q['sql'] for q in consultas if 'ORDER BY' in q['sql'])
+        self.assertIn('"clave" ASC', bloqueo)
+
+    def test_sin_incremento_si_se_revierte(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError), transaction.atomic():
+                versiones.incrementar('especies')
+                raise ValueError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(versiones.obtener('especies'), {'especies': 0})
+
+    def test_savepoint_revertido_descarta_sus_versiones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                versiones.incrementar('especies')
+                with self.assertRaises(ValueError), transaction.atomic():
+                    versiones.incrementar('pool:1')
+                    raise ValueError
+        self.assertEqual(versiones.obtener('especies', 'pool:1'), {'especies': 1, 'pool:1': 0})
@@ -0,0 +1,260 @@
+"""
+Cola de trabajos en segundo plano sobre la base de datos
+
+Las operaciones largas se encolan como filas de la tabla trabajo y las ejecuta
+`manage.py procesar_trabajos`, fuera del ciclo request/response. Los trabajadores
+toman trabajos con SELECT ... FOR UPDATE SKIP LOCKED, así varios pueden correr en
+paralelo sin tomar dos veces el mismo trabajo y sin otro broker que PostgreSQL.
+
+Cada trabajo tiene un plazo (vence_en) que se renueva al informar progreso; si el
+trabajador muere, otro lo retoma cuando el plazo vence. Los errores se reintentan
+con espera exponencial hasta max_intentos.
+
+Para agregar un tipo de trabajo:
+
+    @registrar('mi_tipo')
+    def mi_handler(parametros, progreso):
+        ...
+        progreso.actualizar(50, 'Mitad')
+        return {'resultado': ...}  # Se guarda como JSON en Trabajo.resultado
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models.Trabajo_model import Trabajo
+
+logger = logging.getLogger(__name__)
+
+# Tiempo sin informar progreso tras el cual otro trabajador puede retomar el trabajo
+DURACION_PLAZO = timedelta(minutes=5)
+
+# Espera antes del reintento n: ESPERA_REINTENTO * 2 ** (n - 1)
+ESPERA_REINTENTO = timedelta(seconds=30)
+
+HANDLERS = {}
+
+
+def registrar(tipo):
+    """Decorador que registra un handler para un tipo de trabajo"""
+    def decorador(funcion):
+        HANDLERS[tipo] = funcion
+        return funcion
+    return decorador
+
+
+def nombre_trabajador():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def encolar(tipo, parametros=None, max_intentos=3):
+    """
+    Crea un trabajo pendiente
+
+    Raises:
+        ValueError: Si el tipo no tiene un handler registrado
+    """
+    if tipo not in HANDLERS:
+        raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+    return Trabajo.objects.create(tipo=tipo, parametros=parametros or {}, max_intentos=max_intentos)
+
+
+class CanceladoError(Exception):
+    """El trabajo fue cancelado mientras se ejecutaba"""
+
+
+class Progreso:
+    """Permite al handler informar avance; cada actualización renueva el plazo del trabajo"""
+
+    def __init__(self, trabajo):
+        self.trabajo = trabajo
+
+    def actualizar(self, porcentaje, mensaje=''):
+        """
+        Raises:
+            CanceladoError: Si el trabajo se canceló o lo tomó otro trabajador
+        """
+        actualizados = Trabajo.objects.filter(
+            pk=self.trabajo.pk,
+            estado=Trabajo.EN_PROCESO,
+            tomado_por=self.trabajo.tomado_por
+        ).update(
+            progreso=max(0, min(100, int(porcentaje))),
+            mensaje=mensaje[:255],
+            vence_en=timezone.now() + DURACION_PLAZO,
+            updated_at=timezone.now()
+        )
+        if not actualizados:
+            raise CanceladoError(f"El trabajo {self.trabajo.pk} ya no está asignado a este trabajador")
+
+
+def tomar_trabajo(trabajador):
+    """
+    Toma el próximo trabajo disponible, o un trabajo en proceso cuyo plazo venció
+
+    Returns:
+        Trabajo | None
+    """
+    while True:
+        ahora = timezone.now()
+        with transaction.atomic():
+            trabajo = Trabajo.objects.select_for_update(skip_locked=True).filter(
+                Q(estado=Trabajo.PENDIENTE, disponible_desde__lte=ahora) |
+                Q(estado=Trabajo.EN_PROCESO, vence_en__lt=ahora)
+            ).order_by('disponible_desde', 'id').first()
+            if trabajo is None:
+                return None
+
+            if trabajo.estado == Trabajo.EN_PROCESO and trabajo.intentos >= trabajo.max_intentos:
+                logger.warning("El trabajo %s venció en su último intento (%s)", trabajo.pk, trabajo.tomado_por)
+                trabajo.estado = Trabajo.FALLIDO
+                trabajo.error = f'El trabajador {trabajo.tomado_por} dejó de responder'
+                trabajo.finalizado_en = ahora
+                trabajo.save(update_fields=['estado', 'error', 'finalizado_en', 'updated_at'])
+                continue
+
+            trabajo.estado = Trabajo.EN_PROCESO
+            trabajo.intentos = F('intentos') + 1
+            trabajo.tomado_por = trabajador
+            trabajo.vence_en = ahora + DURACION_PLAZO
+            trabajo.iniciado_en = ahora
+            trabajo.save(update_fields=[
+                'estado', 'intentos', 'tomado_por', 'vence_en', 'iniciado_en', 'updated_at'
+            ])
+            trabajo.refresh_from_db(fields=['intentos'])
+            return trabajo
+
+
+def _finalizar(trabajo, **campos):
+    """Guarda el resultado sólo si el trabajo sigue asignado a este trabajador"""
+    return Trabajo.objects.filter(
+        pk=trabajo.pk,
+        estado=Trabajo.EN_PROCESO,
+        tomado_por=trabajo.tomado_por
+    ).update(vence_en=None, updated_at=timezone.now(), **campos)
+
+
+def ejecutar(trabajo):
+    """Ejecuta un trabajo ya tomado y registra el resultado, el reintento o la falla"""
+    handler = HANDLERS.get(trabajo.tipo)
+    if handler is None:
+        _finalizar(
+            trabajo,
+            estado=Trabajo.FALLIDO,
+            error=f"Tipo de trabajo desconocido: {trabajo.tipo}",
+            finalizado_en=timezone.now()
+        )
+        return
+
+    try:
+        resultado = handler(trabajo.parametros, Progreso(trabajo))
+    except CanceladoError:
+        logger.info("Trabajo %s cancelado durante la ejecución", trabajo.pk)
+        return
+    except Exception:
+        logger.exception("Error en el trabajo %s (%s), intento %s", trabajo.pk, trabajo.tipo, trabajo.intentos)
+        error = traceback.format_exc()
+        if trabajo.intentos < trabajo.max_intentos:
+            _finalizar(
+                trabajo,
+                estado=Trabajo.PENDIENTE,
+                error=error,
+                disponible_desde=timezone.now() + ESPERA_REINTENTO * 2 ** (trabajo.intentos - 1)
+            )
+        else:
+            _finalizar(trabajo, estado=Trabajo.FALLIDO, error=error, finalizado_en=timezone.now())
+        return
+
+    _finalizar(
+        trabajo,
+        estado=Trabajo.COMPLETADO,
+        progreso=100,
+        resultado=resultado,
+        error='',
+        finalizado_en=timezone.now()
+    )
+
+
+def cancelar(trabajo_id):
+    """
+    Cancela un trabajo pendiente o en proceso
+
+    Un trabajo en proceso termina de cancelarse la próxima vez que informa progreso.
+
+    Returns:
+        bool: False si el trabajo ya había terminado
+    """
+    return bool(Trabajo.objects.filter(
+        pk=trabajo_id,
+        estado__in=[Trabajo.PENDIENTE, Trabajo.EN_PROCESO]
+    ).update(
+        estado=Trabajo.CANCELADO,
+        vence_en=None,
+        finalizado_en=timezone.now(),
+        updated_at=timezone.now()
+    ))
+
+
+# --- Handlers ---
+
+@registrar('reconstruir_resumenes')
+def reconstruir_resumenes(parametros, progreso):
+    """Recalcula las tablas resumen del tablero (ver modelos/resumenes.py)"""
+    from . import resumenes
+
+    progreso.actualizar(0, 'Reconstruyendo resúmenes')
+    resumenes.reconstruir_todo()
+    return {'mensaje': 'Resúmenes reconstruidos correctamente'}
+
+
+@registrar('reportes_pdf')
+def generar_reportes_pdf(parametros, progreso):
+    """
+    Genera los reportes PDF de los pools indicados y los deja en la caché de reportes
+
+    Parámetros: {'pool_ids': [1, 2, 3]}. Una vez completado, GET
+    /api/pools/reportes_pdf/?ids=... devuelve el ZIP sin volver a renderizar.
+    """
+    from .reportes import generar_reportes
+
+    pool_ids = [int(pool_id) for pool_id in parametros.get('pool_ids', [])]
+    generados, errores = [], {}
+    for i, (pool_id, pdf, error) in enumerate(generar_reportes(pool_ids), start=1):
+        if pdf is None:
+            errores[str(pool_id)] = error['error']
+        else:
+            generados.append(pool_id)
+        progreso.actualizar(i * 100 / len(pool_ids), f'{i} de {len(pool_ids)} reportes')
+    return {'generados': generados, 'errores': errores}
+
+
+@registrar('importar_csv')
+def importar_csv(parametros, progreso):
+    """
+    Importa un CSV de apicultores, apiarios o tambores (ver modelos/importacion.py)
+
+    Parámetros: {'tipo': 'apiarios', 'archivo': '<ruta en el storage>'} (ver
+    importacion.guardar_subida). El archivo se borra cuando la importación termina
+    bien; si falla queda para los reintentos.
+    """
+    from django.core.files.storage import default_storage
+
+    from .importacion import importar_csv as importar, lineas_de_archivo
+
+    ruta = parametros['archivo']
+    with default_storage.open(ruta, 'rb') as archivo:
+        total = max(sum(bloque.count(b'\n') for bloque in archivo.chunks()), 1)
+        archivo.seek(0)
+        resumen = importar(
+            parametros['tipo'],
+            lineas_de_archivo(archivo),
+            progreso=lambda filas: progreso.actualizar(filas * 100 / total, f'{filas} filas procesadas')
+        )
+    default_storage.delete(ruta)
+    return resumen
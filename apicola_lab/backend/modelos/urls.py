@@ -4,8 +4,8 @@ from .views import (
     ApicultorViewSet, AnalistaViewSet, ApiarioViewSet,
     TamborViewSet, EspecieViewSet, MuestraViewSet,
     AnalisisPalinologicoViewSet, AnalisisFisicoQuimicoViewSet,
-    EstadisticasView, ContienePoolViewSet, TamborApiarioViewSet,
-    PoolViewSet, pool_stats
+    EstadisticasView, SeriePolenView, MapaPolenView, ContienePoolViewSet, TamborApiarioViewSet,
+    PoolViewSet, TrabajoViewSet, pool_stats, pools_stats
 )
 
 router = DefaultRouter()
@@ -20,9 +20,13 @@ router.register(r'analisis-fisicoquimicos', AnalisisFisicoQuimicoViewSet)
 router.register(r'pools', PoolViewSet)
 router.register(r'contiene-pool', ContienePoolViewSet)
 router.register(r'tambor-apiario', TamborApiarioViewSet)
+router.register(r'trabajos', TrabajoViewSet, basename='trabajo')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('estadisticas/', EstadisticasView.as_view(), name='estadisticas'),
+    path('estadisticas/series/', SeriePolenView.as_view(), name='estadisticas_series'),
+    path('mapa/<int:z>/<int:x>/<int:y>/', MapaPolenView.as_view(), name='mapa_polen'),
+    path('pool/stats/', pools_stats, name='pools_stats'),
     path('pool/<int:pool_id>/stats/', pool_stats, name='pool_stats'),
 ] 
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Contadores de versión compartidos entre procesos (tabla version_datos)
+
+Cada clave identifica un conjunto de datos (por ejemplo 'pool:12', 'especies' o
+'tabla:muestra_tambor' para una tabla completa).
+Las escrituras piden el incremento justo después de modificar los datos (señales,
+servicios, operaciones masivas). Dentro de una transacción las claves se juntan
+y se incrementan una sola vez, en orden, cuando la transacción confirma (ver
+modelos/diferido.py): así las filas compartidas de version_datos no quedan
+bloqueadas mientras dura cada escritura ni se vuelven un punto de espera entre
+transacciones concurrentes. Los lectores obtienen la versión antes de leer los
+datos, así una entrada de caché nunca tiene datos más viejos que su versión: en
+la ventana entre la confirmación y el incremento a lo sumo se guardan datos
+nuevos con la versión anterior, y el incremento los descarta.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import diferido
+from .models.VersionDatos_model import VersionDatos
+
+ESPECIES = 'especies'
+
+# Tablas resumen del tablero (se incrementa al reconstruirlas)
+RESUMENES = 'resumenes'
+
+
+def clave_pool(pool_id):
+    return f'pool:{pool_id}'
+
+
+def clave_tabla(modelo):
+    return f'tabla:{modelo._meta.db_table}'
+
+
+def obtener(*claves):
+    """
+    Devuelve las versiones actuales de las claves con una sola consulta
+
+    Returns:
+        dict: clave -> versión (0 si la clave todavía no existe)
+    """
+    versiones = dict.fromkeys(claves, 0)
+    versiones.update(VersionDatos.objects.filter(clave__in=claves).values_list('clave', 'version'))
+    return versiones
+
+
+def obtener_con_fecha(*claves):
+    """
+    Como obtener, pero con la fecha del último incremento de cada clave
+
+    Returns:
+        dict: clave -> (versión, updated_at o None si la clave todavía no existe)
+    """
+    versiones = dict.fromkeys(claves, (0, None))
+    versiones.update(
+        (clave, (version, fecha))
+        for clave, version, fecha in VersionDatos.objects.filter(clave__in=claves).values_list(
+            'clave', 'version', 'updated_at'
+        )
+    )
+    return versiones
+
+
+def _aplicar(claves):
+    ahora = timezone.now()
+    claves = sorted(claves)
+    VersionDatos.objects.bulk_create([VersionDatos(clave=clave) for clave in claves], ignore_conflicts=True)
+    with transaction.atomic():
+        # Las filas se bloquean en orden de clave: dos incrementos simultáneos no se cruzan
+        ids = list(
+            VersionDatos.objects.select_for_update().filter(clave__in=claves).order_by('clave')
+            .values_list('id', flat=True)
+        )
+        VersionDatos.objects.filter(id__in=ids).update(version=F('version') + 1, updated_at=ahora)
+
+
+def incrementar(*claves):
+    """
+    Incrementa la versión de las claves, creándolas si hace falta
+
+    Fuera de una transacción el incremento es inmediato; dentro, se acumula y se
+    aplica una vez al confirmar (ver modelos/diferido.py). Si la transacción se
+    revierte no hay incremento.
+    """
+    claves = set(claves)
+    if not claves:
+        return
+    with diferido.acumular('versiones', set, _aplicar) as pendientes:
+        pendientes.update(claves)
+
+
+def incrementar_pools(pool_ids):
+    incrementar(*(clave_pool(pool_id) for pool_id in pool_ids))
+
+
+def incrementar_tablas(*modelos):
+    incrementar(*(clave_tabla(modelo) for modelo in modelos))
@@ -1,8 +1,9 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.http import HttpResponse, StreamingHttpResponse
 from django.db.models import Count, Avg, Sum, Q
 from django.db.models.functions import TruncMonth, TruncYear
 from django.utils import timezone
@@ -19,8 +20,10 @@ from .models.Pool_model import Pool
 from .models.ContienePool_model import ContienePool
 from .models.AnalisisPalinologico_model import AnalisisPalinologico
 from .models.AnalisisFisicoQuimico_model import AnalisisFisicoQuimico
+from .models.Trabajo_model import Trabajo
 
 
+from .mixins import GetCondicionalMixin, ImportarCSVMixin, IncluirRelacionesMixin, OperacionesMasivasMixin
 from .serializers import (
     ApicultorSerializer, AnalistaSerializer, ApiarioSerializer,
     TamborSerializer, TamborApiarioSerializer, EspecieSerializer,
@@ -29,13 +32,15 @@ from .serializers import (
     MuestraDetailSerializer, AnalisisPalinologicoDetailSerializer,
     AnalisisFisicoQuimicoDetailSerializer, EstadisticasSerializer,
     ContienePoolSerializer,
-    TamborWithApiariosSerializer
+    TamborWithApiariosSerializer, ConteoMasivoSerializer, EnsamblarPoolSerializer,
+    ReservaTamboresSerializer, LiberarReservaSerializer, TrabajoSerializer
 )
 
-class ApicultorViewSet(viewsets.ModelViewSet):
+class ApicultorViewSet(ImportarCSVMixin, GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = Apicultor.objects.all()
     serializer_class = ApicultorSerializer
     permission_classes = [permissions.AllowAny]
+    tipo_importacion = 'apicultores'
 
     @action(detail=True, methods=['get'])
     def apiarios(self, request, pk=None):
@@ -44,7 +49,7 @@ class ApicultorViewSet(viewsets.ModelViewSet):
         serializer = ApiarioSerializer(apiarios, many=True)
         return Response(serializer.data)
 
-class AnalistaViewSet(viewsets.ModelViewSet):
+class AnalistaViewSet(GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = Analista.objects.all()
     serializer_class = AnalistaSerializer
     permission_classes = [permissions.AllowAny]
@@ -56,9 +61,12 @@ class AnalistaViewSet(viewsets.ModelViewSet):
         serializer = PoolSerializer(muestras, many=True)
         return Response(serializer.data)
 
-class ApiarioViewSet(viewsets.ModelViewSet):
+class ApiarioViewSet(ImportarCSVMixin, OperacionesMasivasMixin, GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = Apiario.objects.all()
     permission_classes = [permissions.AllowAny]
+    tipo_importacion = 'apiarios'
+    filtros_masivos = {'id': ('exact', 'in'), 'apicultor': ('exact', 'in'), 'localidad': ('exact', 'in')}
+    campos_masivos = ('apicultor', 'localidad', 'cant_colmenas')
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -74,46 +82,106 @@ class ApiarioViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def estadisticas(self, request, pk=None):
+        from .services import ApiarioStatsService
         apiario = self.get_object()
         
-        # Estadísticas del apiario
-        stats = {
-            'total_tambores': apiario.tambores.count(),
-            'total_muestras': Pool.objects.filter(tambores__apiarios=apiario).distinct().count(),
-            'analisis_palinologicos': AnalisisPalinologico.objects.filter(
-                pool__tambores__apiarios=apiario
-            ).distinct().count(),
-
-            'especies_encontradas': Especie.objects.filter(
-                analisis_palinologicos__pool__tambores__apiarios=apiario
-            ).distinct().count()
-        }
+        # Conteos y promedios físico-químicos del apiario en una sola consulta
+        stats = ApiarioStatsService.get_estadisticas([apiario.id])[apiario.id]
 
-        # Análisis físico-químicos del apiario
-        analisis_fq = AnalisisFisicoQuimico.objects.filter(
-            tambor__apiarios=apiario
-        ).aggregate(
-            promedio_humedad=Avg('humedad'),
-            promedio_color=Avg('color')
-        )
+        return Response(stats)
+
+    @action(detail=False, methods=['get'])
+    def estadisticas_lote(self, request):
+        """Estadísticas de varios apiarios a la vez (?ids=1,2,3) para vistas de listado"""
+        from .services import ApiarioStatsService
+        ids = [valor for valor in request.query_params.get('ids', '').split(',') if valor.strip()]
+        if not ids or not all(valor.strip().isdigit() for valor in ids):
+            return Response(
+                {'error': "El parámetro 'ids' debe ser una lista de IDs separados por comas"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > ApiarioStatsService.MAX_LOTE:
+            return Response(
+                {'error': f'Se permiten como máximo {ApiarioStatsService.MAX_LOTE} apiarios por consulta'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        stats.update(analisis_fq)
+        stats = ApiarioStatsService.get_estadisticas(ids)
+        return Response([{'apiario': apiario_id, **datos} for apiario_id, datos in stats.items()])
 
-        return Response(stats)
+    @action(detail=False, methods=['get'])
+    def en_area(self, request):
+        """Apiarios dentro de un rectángulo del mapa (?bbox=oeste,sur,este,norte, ?limite=)"""
+        from . import geo
+        try:
+            area = geo.parse_bbox(request.query_params)
+            limite = geo.parse_limite(request.query_params, geo.LIMITE_MAXIMO)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def generar(request):
+            apiarios = self.get_queryset().filter(geo.filtro_de_area(*area)).order_by('id')[:limite]
+            return Response(self.get_serializer(apiarios, many=True).data)
+        return self._condicional(generar, request)
 
-class TamborViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def cercanos(self, request):
+        """
+        Apiarios más cercanos a un punto (?lat=, ?lon=, ?limite=), opcionalmente dentro de ?radio_km=
+
+        Cada apiario trae su 'distancia_km'; vienen del más cercano al más lejano.
+        """
+        from . import geo
+        try:
+            latitud, longitud, radio_km = geo.parse_punto(request.query_params)
+            limite = geo.parse_limite(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def generar(request):
+            encontrados = geo.cercanos(self.get_queryset(), latitud, longitud, radio_km, limite)
+            apiarios = self.get_queryset().in_bulk([apiario_id for apiario_id, _ in encontrados])
+            datos = self.get_serializer([apiarios[apiario_id] for apiario_id, _ in encontrados], many=True).data
+            for fila, (_, distancia) in zip(datos, encontrados):
+                fila['distancia_km'] = round(distancia, 3)
+            return Response(datos)
+        return self._condicional(generar, request)
+
+class TamborViewSet(ImportarCSVMixin, OperacionesMasivasMixin, GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = MuestraTambor.objects.all()
     serializer_class = TamborWithApiariosSerializer
     permission_classes = [permissions.AllowAny]
+    tipo_importacion = 'tambores'
+    filtros_masivos = {
+        'id': ('exact', 'in'),
+        'estado_analisis_palinologico': ('exact',),
+        'fecha_de_extraccion': ('exact', 'gte', 'lte', 'isnull'),
+    }
+    campos_masivos = ('estado_analisis_palinologico', 'fecha_de_extraccion')
 
     def get_queryset(self):
         queryset = MuestraTambor.objects.all()
         # Filtrar por tambores disponibles si se especifica el parámetro
         disponibles = self.request.query_params.get('disponibles', None)
         if disponibles == 'true':
-            queryset = queryset.filter(estado_analisis_palinologico=False)
+            # Las reservas vigentes de otros analistas no cuentan como disponibles;
+            # con ?analista= se incluyen las propias
+            from .services import tambores_libres
+            analista = self.request.query_params.get('analista')
+            queryset = queryset.filter(tambores_libres(
+                timezone.now(), int(analista) if analista and analista.isdigit() else None
+            ))
         return queryset
 
+    def extras_condicionales(self):
+        # Con ?disponibles=true el listado cambia cuando vence una reserva, sin ninguna escritura
+        if self.request.query_params.get('disponibles') != 'true':
+            return ()
+        from django.db.models import Min
+        return (MuestraTambor.objects.filter(
+            reservado_hasta__gt=timezone.now()
+        ).aggregate(vencimiento=Min('reservado_hasta'))['vencimiento'],)
+
     @action(detail=True, methods=['get'])
     def muestras(self, request, pk=None):
         tambor = self.get_object()
@@ -134,13 +202,85 @@ class TamborViewSet(viewsets.ModelViewSet):
     def liberar_multiple(self, request):
         """Liberar múltiples tambores a la vez"""
         tambor_ids = request.data.get('tambor_ids', [])
-        MuestraTambor.objects.filter(id__in=tambor_ids).update(estado_analisis_palinologico=False)
-        return Response({'message': f'{len(tambor_ids)} tambores liberados exitosamente'})
+        liberados = MuestraTambor.objects.filter(id__in=tambor_ids).update(
+            estado_analisis_palinologico=False, updated_at=timezone.now()
+        )
+        if liberados:
+            from . import versiones
+            versiones.incrementar_tablas(MuestraTambor)
+        return Response({
+            'message': f'{liberados} tambores liberados exitosamente',
+            'liberados': liberados
+        })
+
+    @action(detail=False, methods=['post'])
+    def reservar(self, request):
+        """
+        Reservar tambores libres mientras se arma un pool
+
+        Cuerpo: {"analista": 1, "cantidad": 10} o {"analista": 1, "tambores": [3, 4]},
+        con "minutos" opcional. Responde los tambores que se pudieron reservar, que
+        pueden ser menos que los pedidos si otros analistas ya los tomaron.
+        """
+        from .services import ReservaTamboresService
+        serializer = ReservaTamboresSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reservados, hasta = ReservaTamboresService.reservar(**serializer.validated_data)
+        return Response({'reservados': reservados, 'reservado_hasta': hasta})
+
+    @action(detail=False, methods=['post'])
+    def liberar_reserva(self, request):
+        """Liberar las reservas de un analista (todas o las de los tambores indicados)"""
+        from .services import ReservaTamboresService
+        serializer = LiberarReservaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        liberados = ReservaTamboresService.liberar(**serializer.validated_data)
+        return Response({'liberados': liberados})
 
-class EspecieViewSet(viewsets.ModelViewSet):
+class EspecieViewSet(GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = Especie.objects.all()
     serializer_class = EspecieSerializer
     permission_classes = [permissions.AllowAny]
+    # El catálogo es chico y se responde siempre como una lista plana, con o sin parámetros
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        """Sin parámetros, el catálogo completo se responde con el JSON precalculado en memoria"""
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        from .catalogo import catalogo
+        from .condicional import Validador
+        instantanea = catalogo.obtener()
+        validador = Validador.fijo(instantanea.etag, instantanea.fecha and instantanea.fecha.timestamp())
+        no_modificado = validador.no_modificado(request)
+        if no_modificado is not None:
+            return no_modificado
+        return validador.marcar(HttpResponse(instantanea.json, content_type='application/json'))
+
+    @action(detail=False, methods=['get'])
+    def buscar(self, request):
+        """
+        Buscar especies por nombre científico, común o familia (?q=, ?limite=)
+
+        No distingue mayúsculas ni acentos y tolera errores de tipeo; los
+        resultados vienen ordenados por relevancia con su 'similitud'.
+        """
+        from . import versiones
+        from .busqueda import LIMITE_MAXIMO, LIMITE_POR_DEFECTO, buscar_especies
+        from .condicional import responder
+        limite = request.query_params.get('limite', str(LIMITE_POR_DEFECTO))
+        if not limite.isdigit() or not 1 <= int(limite) <= LIMITE_MAXIMO:
+            return Response(
+                {'error': f"'limite' debe ser un entero entre 1 y {LIMITE_MAXIMO}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def generar():
+            try:
+                return Response(buscar_especies(request.query_params.get('q', ''), int(limite)))
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return responder(request, [versiones.ESPECIES], generar)
 
     @action(detail=True, methods=['get'])
     def analisis_palinologicos(self, request, pk=None):
@@ -149,7 +289,7 @@ class EspecieViewSet(viewsets.ModelViewSet):
         serializer = AnalisisPalinologicoSerializer(analisis, many=True)
         return Response(serializer.data)
 
-class MuestraViewSet(viewsets.ModelViewSet):
+class MuestraViewSet(GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = Pool.objects.all()
     permission_classes = [permissions.AllowAny]
 
@@ -175,9 +315,16 @@ class MuestraViewSet(viewsets.ModelViewSet):
 
         return Response(stats)
 
-class AnalisisPalinologicoViewSet(viewsets.ModelViewSet):
+class AnalisisPalinologicoViewSet(OperacionesMasivasMixin, GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = AnalisisPalinologico.objects.all()
     permission_classes = [permissions.AllowAny]
+    filtros_masivos = {
+        'id': ('exact', 'in'),
+        'pool': ('exact', 'in'),
+        'especie': ('exact', 'in'),
+        'marca_especial': ('exact', 'isnull'),
+    }
+    campos_masivos = ('especie', 'marca_especial')
     
     def get_serializer_class(self):
         if self.action in ['retrieve', 'list']:
@@ -198,6 +345,36 @@ class AnalisisPalinologicoViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'])
+    def conteo_masivo(self, request):
+        """Guardar en una sola operación todos los conteos de especies de un pool"""
+        from .services import ConteoPolenService
+        serializer = ConteoMasivoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        analisis = ConteoPolenService.guardar_conteos(**serializer.validated_data)
+        return Response(
+            AnalisisPalinologicoSerializer(analisis, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exportar todos los análisis en CSV o NDJSON (?formato=csv|ndjson)
+
+        Filtros opcionales: fecha_desde, fecha_hasta (fecha de análisis del pool),
+        analista, apiario y especie (ids separados por coma).
+        """
+        from .exportacion import exportar_palinologicos, parse_especie, parse_formato
+        from .services import EstadisticasGlobalesService
+        try:
+            formato = parse_formato(request.query_params)
+            filtros = EstadisticasGlobalesService.parse_filtros(request.query_params)
+            especies = parse_especie(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return exportar_palinologicos(formato, filtros, especies)
+
     @action(detail=False, methods=['get'])
     def resumen_especies(self, request):
         # Resumen de especies más comunes
@@ -212,9 +389,17 @@ class AnalisisPalinologicoViewSet(viewsets.ModelViewSet):
             'total_granos': especie.total_granos
         } for especie in especies])
 
-class AnalisisFisicoQuimicoViewSet(viewsets.ModelViewSet):
+class AnalisisFisicoQuimicoViewSet(OperacionesMasivasMixin, GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = AnalisisFisicoQuimico.objects.all()
     permission_classes = [permissions.AllowAny]
+    filtros_masivos = {
+        'id': ('exact', 'in'),
+        'analista': ('exact', 'in'),
+        'tambor': ('exact', 'in'),
+        'fecha_analisis': ('exact', 'gte', 'lte', 'isnull'),
+        'fecha_extraccion': ('exact', 'gte', 'lte'),
+    }
+    campos_masivos = ('analista', 'fecha_analisis', 'fecha_extraccion', 'observaciones')
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -227,65 +412,100 @@ class AnalisisFisicoQuimicoViewSet(viewsets.ModelViewSet):
         serializer = TamborSerializer(analisis.tambor)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exportar todos los análisis en CSV o NDJSON (?formato=csv|ndjson)
+
+        Filtros opcionales: fecha_desde, fecha_hasta (fecha de análisis), analista y apiario.
+        """
+        from .exportacion import exportar_fisicoquimicos, parse_formato
+        from .services import EstadisticasGlobalesService
+        try:
+            formato = parse_formato(request.query_params)
+            filtros = EstadisticasGlobalesService.parse_filtros(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return exportar_fisicoquimicos(formato, filtros)
+
 class EstadisticasView(APIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = EstadisticasSerializer
 
     def get(self, request):
-        # Obtener estadísticas generales
-        stats = {
-            'total_apicultores': Apicultor.objects.count(),
-            'total_apiarios': Apiario.objects.count(),
-            'total_tambores': MuestraTambor.objects.count(),
-            'total_muestras': Pool.objects.count(),
-            'total_analisis': {
-                'palinologicos': AnalisisPalinologico.objects.count(),
-                'fisicoquimicos': AnalisisFisicoQuimico.objects.count()
-            }
-        }
+        from . import versiones
+        from .condicional import responder
+        from .models import SerieMensualPolen
+        from .signals import TABLAS_VERSIONADAS
+        # La ventana de 30 días se corre cada día aunque no haya escrituras
+        return responder(
+            request,
+            [versiones.RESUMENES, versiones.clave_tabla(SerieMensualPolen)]
+            + [versiones.clave_tabla(modelo) for modelo in TABLAS_VERSIONADAS],
+            self._estadisticas,
+            timezone.localdate()
+        )
 
-        # Estadísticas de muestras por mes
-        # Eliminar estadísticas por fecha_extraccion del Pool, ya que ahora es atributo del tambor
-        muestras_por_mes = []
-
-        # Estadísticas de análisis por especie
-        analisis_por_especie = AnalisisPalinologico.objects.values(
-            'especie__nombre_cientifico'
-        ).annotate(
-            total=Count('id'),
-            promedio_granos=Avg('cantidad_granos')
-        ).order_by('-total')[:10]
-
-        # Estadísticas de humedad por apiario
-        humedad_por_apiario = AnalisisFisicoQuimico.objects.values(
-            'tambor__apiarios__nombre_apiario'
-        ).annotate(
-            promedio_humedad=Avg('humedad')
-        ).order_by('-promedio_humedad')
-
-        # Estadísticas de los últimos 30 días
-        fecha_limite = timezone.now() - timedelta(days=30)
-        stats['ultimos_30_dias'] = {
-            'muestras_nuevas': Pool.objects.filter(
-                created_at__gte=fecha_limite
-            ).count(),
-            'analisis_nuevos': {
-                'palinologicos': AnalisisPalinologico.objects.filter(
-                    created_at__gte=fecha_limite
-                ).count(),
-                'fisicoquimicos': AnalisisFisicoQuimico.objects.filter(
-                    created_at__gte=fecha_limite
-                ).count()
-            }
-        }
+    def _estadisticas(self):
+        # Totales, especies, humedad y ventana de 30 días salen de las tablas resumen
+        from .resumenes import estadisticas_tablero
+        from .series import muestras_por_mes
+        estadisticas = estadisticas_tablero()
+
+        # Tambores analizados y granos por mes de extracción del tambor (ver modelos/series.py)
+        por_mes = muestras_por_mes()
 
         return Response({
-            'estadisticas_generales': stats,
-            'muestras_por_mes': list(muestras_por_mes),
-            'analisis_por_especie': list(analisis_por_especie),
-            'humedad_por_apiario': list(humedad_por_apiario)
-        }) 
-        
+            'estadisticas_generales': estadisticas['estadisticas_generales'],
+            'muestras_por_mes': por_mes,
+            'analisis_por_especie': estadisticas['analisis_por_especie'],
+            'humedad_por_apiario': estadisticas['humedad_por_apiario']
+        })
+
+
+class SeriePolenView(APIView):
+    """
+    Series de granos de polen por mes o temporada de extracción
+
+    Query params: agrupar (mes|temporada), por (especie|apiario|localidad),
+    especie (ids separados por coma), apiario, localidad, desde y hasta (AAAA-MM)
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        from . import series, versiones
+        from .condicional import responder
+        from .models import Apiario, Especie, SerieMensualPolen
+        try:
+            filtros = series.parse_filtros(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return responder(
+            request,
+            [versiones.clave_tabla(SerieMensualPolen), versiones.clave_tabla(Apiario), versiones.ESPECIES],
+            lambda: Response(series.consultar(filtros))
+        )
+
+
+class MapaPolenView(APIView):
+    """
+    Mosaico z/x/y del mapa con la composición polínica de cada celda (ver modelos/mapas.py)
+
+    Los ids de especie se resuelven con el catálogo de /api/especies/.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, z, x, y):
+        from . import mapas
+        from .condicional import responder
+        try:
+            mapas.validar_mosaico(z, x, y)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        claves = mapas.claves_de_mosaico(z, x, y)
+        return responder(request, claves, lambda: Response(mapas.mosaico(z, x, y, claves)))
+
+
 class ContadorView(APIView):
     """Vista para el contador de muestras"""
     permission_classes = [permissions.IsAuthenticated]
@@ -303,7 +523,7 @@ class ContadorView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ContienePoolViewSet(viewsets.ModelViewSet):
+class ContienePoolViewSet(GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = ContienePool.objects.all()
     serializer_class = ContienePoolSerializer
     permission_classes = [permissions.AllowAny]
@@ -314,7 +534,7 @@ class ContienePoolViewSet(viewsets.ModelViewSet):
         serializer = PoolSerializer(contiene_pool.pool)
         return Response(serializer.data)
 
-class TamborApiarioViewSet(viewsets.ModelViewSet):
+class TamborApiarioViewSet(GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = TamborApiario.objects.all()
     serializer_class = TamborApiarioSerializer
     permission_classes = [permissions.AllowAny]
@@ -324,39 +544,212 @@ class TamborApiarioViewSet(viewsets.ModelViewSet):
         tambor_apiario = self.get_object()
         serializer = ApiarioSerializer(tambor_apiario.apiario)
 
-class PoolViewSet(viewsets.ModelViewSet):
+class PoolViewSet(OperacionesMasivasMixin, GetCondicionalMixin, IncluirRelacionesMixin, viewsets.ModelViewSet):
     queryset = Pool.objects.all()
     serializer_class = PoolSerializer
     permission_classes = [permissions.AllowAny]
+    filtros_masivos = {
+        'id': ('exact', 'in'),
+        'analista': ('exact', 'in'),
+        'fecha_analisis': ('exact', 'gte', 'lte', 'isnull'),
+    }
+    campos_masivos = ('analista', 'fecha_analisis', 'observaciones')
 
     def get_queryset(self):
         queryset = Pool.objects.select_related('analista').all()
         return queryset
 
+    @action(detail=False, methods=['post'])
+    def ensamblar(self, request):
+        """Crear un pool y asignarle sus tambores en una sola operación"""
+        from .services import PoolService, TamboresNoDisponiblesError
+        serializer = EnsamblarPoolSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            pool = PoolService.ensamblar(**serializer.validated_data)
+        except TamboresNoDisponiblesError as e:
+            return Response({
+                'error': 'Algunos tambores no están disponibles',
+                'asignados': e.asignados,
+                'reservados': e.reservados,
+                'inexistentes': e.inexistentes
+            }, status=status.HTTP_409_CONFLICT)
+        return Response(PoolSerializer(pool).data, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['get'])
     def estadisticas(self, request, pk=None):
         """Obtener estadísticas de un pool específico"""
         from .services import get_pool_stats_response
-        return get_pool_stats_response(pk)
+        return get_pool_stats_response(pk, request)
+
+    @action(detail=True, methods=['get'])
+    def similares(self, request, pk=None):
+        """
+        Pools con el espectro polínico más parecido (?metrica=coseno|bray_curtis, ?k=)
+
+        La similitud va de 0 a 1; se omiten los pools sin especies en común.
+        """
+        from . import similitud, versiones
+        from .condicional import responder
+        try:
+            metrica, k = similitud.parse_parametros(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def generar():
+            pool = self.get_object()
+            vecinos = similitud.similares(pool.id, metrica, k)
+            if vecinos is None:
+                return Response(
+                    {'error': 'No hay análisis palinológicos para este pool'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response({'pool': pool.id, 'metrica': metrica, 'similares': vecinos})
+        return responder(
+            request,
+            [versiones.clave_tabla(AnalisisPalinologico), versiones.clave_tabla(Pool)],
+            generar
+        )
+
+    @action(detail=True, methods=['get'])
+    def reporte_pdf(self, request, pk=None):
+        """Reporte melisopalinológico del pool en PDF"""
+        from .reportes import nombre_archivo, obtener_reporte
+        if not str(pk).isdigit():
+            return Response({'error': 'Pool no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+        pdf, error = obtener_reporte(int(pk))
+        if pdf is None:
+            return Response({'error': error['error']}, status=error['status'])
+
+        response = HttpResponse(pdf, content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="{nombre_archivo(pk)}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def reportes_pdf(self, request):
+        """Reportes PDF de varios pools (?ids=1,2,3) en un ZIP generado en paralelo"""
+        from .reportes import MAX_LOTE, zip_reportes
+        ids = [valor.strip() for valor in request.query_params.get('ids', '').split(',') if valor.strip()]
+        if not ids or not all(valor.isdigit() for valor in ids):
+            return Response(
+                {'error': "El parámetro 'ids' debe ser una lista de IDs separados por comas"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > MAX_LOTE:
+            return Response(
+                {'error': f'Se permiten como máximo {MAX_LOTE} pools por reporte'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(zip_reportes([int(valor) for valor in ids]), content_type='application/zip')
+        fecha = timezone.localdate().strftime('%Y%m%d')
+        response['Content-Disposition'] = f'attachment; filename="reportes_palinologicos_{fecha}.zip"'
+        return response
+
+class TrabajoViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
+                     mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Encolar trabajos en segundo plano y consultar su estado y resultado"""
+    serializer_class = TrabajoSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        queryset = Trabajo.objects.all()
+        for campo in ('estado', 'tipo'):
+            valor = self.request.query_params.get(campo)
+            if valor:
+                queryset = queryset.filter(**{campo: valor})
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    @action(detail=True, methods=['post'])
+    def cancelar(self, request, pk=None):
+        """Cancelar un trabajo pendiente o en proceso"""
+        from .trabajos import cancelar
+        trabajo = self.get_object()
+        if not cancelar(trabajo.id):
+            return Response(
+                {'error': f'El trabajo ya terminó con estado {trabajo.estado}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        trabajo.refresh_from_db()
+        return Response(self.get_serializer(trabajo).data)
 
 def pool_stats(request, pool_id):
     """
     Obtiene estadísticas de un pool específico para visualizaciones
     Retorna datos para: gráfico de torta, barras y scatter plot
     """
-    from .services import get_pool_stats_response
-    return get_pool_stats_response(pool_id)
+    from .condicional import responder
+    from .services import PoolStatsService, get_pool_stats_response
+    return responder(
+        request,
+        PoolStatsService.claves_version(pool_id),
+        lambda: get_pool_stats_response(pool_id, request)
+    )
+
+def pools_stats(request):
+    """
+    Obtiene el scatter especie x mes agregado de todos los pools
+    Filtros opcionales: fecha_desde, fecha_hasta, analista, apiario
+    """
+    from . import versiones
+    from .condicional import responder
+    from .models import SerieMensualPolen
+    from .services import get_global_stats_response
+    # Los aportes por mes de extracción cambian también con las fechas de los tambores
+    return responder(
+        request,
+        [versiones.clave_tabla(modelo) for modelo in (
+            Pool, AnalisisPalinologico, Especie, ContienePool, TamborApiario, SerieMensualPolen
+        )],
+        lambda: get_global_stats_response(request.GET, request)
+    )
 
 
 # Health check endpoint para AWS ALB
+import time
+
+from django.db import connection, DatabaseError
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
 @csrf_exempt
 def health_check(request):
     """Endpoint de health check para AWS Application Load Balancer"""
+    inicio = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        base_de_datos = {
+            "status": "ok",
+            "vendor": connection.vendor,
+            "latencia_ms": round((time.perf_counter() - inicio) * 1000, 2)
+        }
+    except DatabaseError as e:
+        base_de_datos = {"status": "error", "vendor": connection.vendor, "error": str(e)}
+
+    # Sin base de datos el balanceador debe sacar la instancia de servicio
+    sana = base_de_datos["status"] == "ok"
     return JsonResponse({
-        "status": "healthy", 
+        "status": "healthy" if sana else "unhealthy",
         "service": "apicola_lab",
-        "timestamp": timezone.now().isoformat()
-    })
\ No newline at end of file
+        "timestamp": timezone.now().isoformat(),
+        "database": base_de_datos
+    }, status=200 if sana else 503)
+
+
+def metrics(request):
+    """Métricas de requests del proceso en formato de texto de Prometheus"""
+    from .metricas import acceso_permitido, registro
+
+    if not acceso_permitido(request):
+        return HttpResponse('Acceso no permitido', status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(
+        registro.exportar(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
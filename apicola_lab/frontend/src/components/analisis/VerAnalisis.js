@@ -22,7 +22,7 @@ import {
 } from '@chakra-ui/react';
 import { ArrowBackIcon, RepeatIcon } from '@chakra-ui/icons';
 import { useColorModeValue } from '@chakra-ui/react';
-import axios from 'axios';
+import { obtenerTodos } from '../../paginacion';
 
 const API_URL = process.env.REACT_APP_API_URL;
 
@@ -55,10 +55,9 @@ const VerAnalisis = () => {
     setLoading(true);
     setError('');
     try {
-      // Agregar timestamp para evitar caché sin usar headers problemáticos
-      const timestamp = new Date().getTime();
-      const response = await axios.get(`${API_URL}/api/analisis-palinologicos/?_t=${timestamp}`);
-      setAnalisis(response.data);
+      // El backend responde con ETag y Cache-Control: no-cache, así que el navegador
+      // revalida cada vez y sólo vuelve a descargar si los datos cambiaron
+      setAnalisis(await obtenerTodos(`${API_URL}/api/analisis-palinologicos/`));
     } catch (err) {
       setError('Error al cargar los análisis: ' + (err.response?.data ? JSON.stringify(err.response.data) : err.message));
     } finally {
@@ -15,7 +15,6 @@ const GraficasConsultas = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [globalScatter, setGlobalScatter] = useState(null);
-  const [pools, setPools] = useState([]);
   
   const API_URL = process.env.REACT_APP_API_URL;
 
@@ -50,34 +49,17 @@ const GraficasConsultas = () => {
       setLoading(true);
       setError(null);
 
-      const poolsRes = await fetch(`${API_URL}/api/pools/`);
-      if (!poolsRes.ok) throw new Error(`Error ${poolsRes.status}: ${poolsRes.statusText}`);
-      const poolsJson = await poolsRes.json();
-      setPools(poolsJson);
-
-      const stats = await Promise.all(
-        poolsJson.map(async (p) => {
-          try {
-            const res = await fetch(`${API_URL}/api/pool/${p.id}/stats/`);
-            if (!res.ok) return null;
-            return res.json();
-          } catch (_e) {
-            return null;
-          }
-        })
-      );
+      // El backend agrega el scatter de todos los pools en una sola consulta
+      const res = await fetch(`${API_URL}/api/pool/stats/`);
+      if (!res.ok) throw new Error(`Error ${res.status}: ${res.statusText}`);
+      const stats = await res.json();
 
       const agregados = new Map();
-      stats.forEach((st) => {
-        if (!st || !st.scatter_plot || !st.scatter_plot.data) return;
-        st.scatter_plot.data.forEach((pt) => {
-          const especie = pt.x;
-          const mesIndex = pt.y;
-          const key = `${especie}|${mesIndex}`;
-          const prev = agregados.get(key) || { especie, mesIndex, nombreMes: pt.nombre_mes, cantidad: 0 };
-          prev.cantidad += pt.cantidad || 0;
-          agregados.set(key, prev);
-        });
+      (stats.scatter_plot?.data || []).forEach((pt) => {
+        const especie = pt.x;
+        const mesIndex = pt.y;
+        const key = `${especie}|${mesIndex}`;
+        agregados.set(key, { especie, mesIndex, nombreMes: pt.nombre_mes, cantidad: pt.cantidad || 0 });
       });
 
       if (agregados.size === 0) {
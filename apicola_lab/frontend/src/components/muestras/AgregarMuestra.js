@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { Box, Button, Flex, Text, VStack, Input, Textarea, FormControl, FormLabel, Select as ChakraSelect, useToast, Badge, HStack, IconButton, SimpleGrid } from '@chakra-ui/react';
 import { CheckCircleIcon, CloseIcon } from '@chakra-ui/icons';
 import axios from 'axios';
+import { obtenerTodos } from '../../paginacion';
 
 const API_URL = process.env.REACT_APP_API_URL;
 
@@ -24,13 +25,13 @@ const AgregarMuestra = () => {
 
   useEffect(() => {
     // Obtener la lista de analistas
-    axios.get(`${API_URL}/api/analistas/`)
-      .then(res => setAnalistas(res.data))
+    obtenerTodos(`${API_URL}/api/analistas/`)
+      .then(datos => setAnalistas(datos))
       .catch(err => setError('Error al cargar analistas: ' + (err.response?.data ? JSON.stringify(err.response.data) : err.message)));
     
     // Obtener solo tambores disponibles (estado_analisis_palinologico = false)
-    axios.get(`${API_URL}/api/tambores/?disponibles=true`)
-      .then(res => setTambores(res.data))
+    obtenerTodos(`${API_URL}/api/tambores/?disponibles=true`)
+      .then(datos => setTambores(datos))
       .catch(err => setError('Error al cargar tambores: ' + (err.response?.data ? JSON.stringify(err.response.data) : err.message)));
   }, []);
 
@@ -120,8 +121,8 @@ const AgregarMuestra = () => {
       setSelectedTambores([]);
       
       // Recargar tambores disponibles
-      axios.get(`${API_URL}/api/tambores/?disponibles=true`)
-        .then(res => setTambores(res.data))
+      obtenerTodos(`${API_URL}/api/tambores/?disponibles=true`)
+        .then(datos => setTambores(datos))
         .catch(err => console.error('Error al recargar tambores:', err));
 
     } catch (err) {
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Box, Button, Flex, Text, VStack, Input, Textarea, FormControl, FormLabel, Select as ChakraSelect } from '@chakra-ui/react';
 import axios from 'axios';
+import { obtenerTodos } from '../../paginacion';
 
 const API_URL = process.env.REACT_APP_API_URL;
 
@@ -23,11 +24,11 @@ const AgregarMuestra1 = () => {
   const navigate = useNavigate();
 
   useEffect(() => {
-    axios.get(`${API_URL}/api/analistas/`)
-      .then(res => setAnalistas(res.data))
+    obtenerTodos(`${API_URL}/api/analistas/`)
+      .then(datos => setAnalistas(datos))
       .catch(err => setError('Error al cargar analistas: ' + (err.response?.data ? JSON.stringify(err.response.data) : err.message)));
-    axios.get(`${API_URL}/api/tambores/`)
-      .then(res => setTambores(res.data))
+    obtenerTodos(`${API_URL}/api/tambores/`)
+      .then(datos => setTambores(datos))
       .catch(err => setError('Error al cargar tambores: ' + (err.response?.data ? JSON.stringify(err.response.data) : err.message)));
   }, []);
 
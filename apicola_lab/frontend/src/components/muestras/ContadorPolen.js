@@ -87,6 +87,7 @@ const ContadorPolen = () => {
     }
     
     try {
+      const conteosAGuardar = [];
       for (let especie of especiesSeleccionadas) {
         const cantidad = conteos[especie.id] || 0;
         const marcaEspecial = marcasEspeciales[especie.id] || '';
@@ -99,21 +100,24 @@ const ContadorPolen = () => {
         }
         
         // Preparar los datos para guardar
-        const datosAGuardar = {
-          pool: parseInt(id), // Convertir a entero
+        const conteo = {
           especie: parseInt(especie.id), // Convertir a entero
           cantidad_granos: parseInt(cantidad) // Convertir a entero
         };
         
         // Si hay marca especial, agregarla
         if (marcaEspecial) {
-          datosAGuardar.marca_especial = marcaEspecial;
+          conteo.marca_especial = marcaEspecial;
         }
         
-        console.log('Enviando datos:', datosAGuardar); // Debug
-        
-        await axios.post(`${API_URL}/api/analisis-palinologicos/`, datosAGuardar);
+        conteosAGuardar.push(conteo);
       }
+
+      // Guardar toda la sesión de conteo en una sola petición
+      await axios.post(`${API_URL}/api/analisis-palinologicos/conteo_masivo/`, {
+        pool: parseInt(id), // Convertir a entero
+        conteos: conteosAGuardar
+      });
       setSuccess(true);
       setTimeout(() => navigate('/muestras'), 1200);
     } catch (err) {
@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { Box, Button, Flex, Text, VStack, HStack, Heading, SimpleGrid, IconButton, Alert, AlertIcon, Center, Select } from '@chakra-ui/react';
 import { AddIcon, MinusIcon, ArrowBackIcon, EditIcon, CheckIcon } from '@chakra-ui/icons';
 import axios from 'axios';
+import { obtenerTodos } from '../../paginacion';
 
 const API_URL = process.env.REACT_APP_API_URL;
 
@@ -34,14 +35,14 @@ const EditarMuestra = () => {
         setFechaAnalisis(res.data.fecha_analisis || '');
       })
       .catch(() => setFechaAnalisis(''));
-    axios.get(`${API_URL}/api/analisis-palinologicos/?pool=${id}`)
-      .then(res => {
-        setAnalisis(res.data);
+    obtenerTodos(`${API_URL}/api/analisis-palinologicos/?pool=${id}`)
+      .then(datos => {
+        setAnalisis(datos);
         // Extraer solo los IDs de las especies, no los objetos completos
-        setEspeciesSeleccionadas(res.data.map(a => a.especie.id || a.especie));
+        setEspeciesSeleccionadas(datos.map(a => a.especie.id || a.especie));
         const conteosMap = {};
         const marcasMap = {};
-        res.data.forEach(a => {
+        datos.forEach(a => {
           const especieId = a.especie.id || a.especie;
           conteosMap[especieId] = a.cantidad_granos;
           marcasMap[especieId] = a.marca_especial || '';
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Box, Button, Flex, Text, VStack, HStack } from '@chakra-ui/react';
 import axios from 'axios';
+import { obtenerTodos } from '../../paginacion';
 
 const API_URL = process.env.REACT_APP_API_URL;
 
@@ -12,14 +13,14 @@ const ListaMuestras = () => {
   const navigate = useNavigate();
 
   useEffect(() => {
-    axios.get(`${API_URL}/api/muestras/`)
-      .then(res => {
-        setMuestras(res.data);
-        // Por cada muestra, consultar si tiene análisis palinológico
-        res.data.forEach(muestra => {
-          axios.get(`${API_URL}/api/analisis-palinologicos/?pool=${muestra.id}`)
+    obtenerTodos(`${API_URL}/api/muestras/`)
+      .then(datos => {
+        setMuestras(datos);
+        // Por cada muestra, consultar si tiene análisis palinológico (basta con la primera fila)
+        datos.forEach(muestra => {
+          axios.get(`${API_URL}/api/analisis-palinologicos/?pool=${muestra.id}&page_size=1`)
             .then(resp => {
-              setAnalisisPorPool(prev => ({ ...prev, [muestra.id]: resp.data.length > 0 }));
+              setAnalisisPorPool(prev => ({ ...prev, [muestra.id]: resp.data.results.length > 0 }));
             })
             .catch(() => {
               setAnalisisPorPool(prev => ({ ...prev, [muestra.id]: false }));
@@ -27,8 +28,8 @@ const ListaMuestras = () => {
         });
       })
       .catch(err => console.error('Error al cargar muestras:', err));
-    axios.get(`${API_URL}/api/analistas/`)
-      .then(res => setAnalistas(res.data))
+    obtenerTodos(`${API_URL}/api/analistas/`)
+      .then(datos => setAnalistas(datos))
       .catch(err => console.error('Error al cargar analistas:', err));
   }, []);
 
@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Box, Button, Flex, Text, VStack, HStack, Spinner } from '@chakra-ui/react';
 import { useNavigate } from 'react-router-dom';
-import axios from 'axios';
+import { obtenerTodos } from '../../paginacion';
 
 const API_URL = process.env.REACT_APP_API_URL;
 
@@ -14,8 +14,8 @@ const ListaMuestrasFisicoquimicas = () => {
   useEffect(() => {
     setLoading(true);
     setError('');
-    axios.get(`${API_URL}/api/analisis-fisicoquimicos/`)
-      .then(res => setMuestras(res.data))
+    obtenerTodos(`${API_URL}/api/analisis-fisicoquimicos/`)
+      .then(datos => setMuestras(datos))
       .catch(err => setError('Error al cargar las muestras: ' + (err.response?.data ? JSON.stringify(err.response.data) : err.message)))
       .finally(() => setLoading(false));
   }, []);
@@ -45,7 +45,7 @@ import {
   ChevronRightIcon
 } from '@chakra-ui/icons';
 import { useColorModeValue } from '@chakra-ui/react';
-import axios from 'axios';
+import { obtenerTodos } from '../../paginacion';
 
 const API_URL = process.env.REACT_APP_API_URL;
 
@@ -92,12 +92,11 @@ const ReportePorcentajes = () => {
     setError('');
     try {
       // Obtener análisis palinológicos con información de pool y especie
-      const timestamp = new Date().getTime();
-      const response = await axios.get(`${API_URL}/api/analisis-palinologicos/?_t=${timestamp}`);
-      setAnalisis(response.data);
+      const datos = await obtenerTodos(`${API_URL}/api/analisis-palinologicos/`);
+      setAnalisis(datos);
       
       // Extraer pools únicos de los análisis
-      const poolsUnicos = extraerPoolsUnicos(response.data);
+      const poolsUnicos = extraerPoolsUnicos(datos);
       setPools(poolsUnicos);
     } catch (err) {
       setError('Error al cargar los datos: ' + (err.response?.data ? JSON.stringify(err.response.data) : err.message));
@@ -139,9 +138,7 @@ const ReportePorcentajes = () => {
 
   const cargarAnalisisPool = async (poolId) => {
     try {
-      const timestamp = new Date().getTime();
-      const response = await axios.get(`${API_URL}/api/analisis-palinologicos/?pool=${poolId}&_t=${timestamp}`);
-      setPoolAnalisis(response.data);
+      setPoolAnalisis(await obtenerTodos(`${API_URL}/api/analisis-palinologicos/?pool=${poolId}`));
     } catch (err) {
       toast({
         title: 'Error',
@@ -0,0 +1,20 @@
+import axios from 'axios';
+
+// Los listados de la API vienen paginados por cursor: { next, previous, results }
+const TAMANO_PAGINA = 1000;
+
+// Recorre las páginas de un listado siguiendo 'next' y devuelve todas las filas
+export async function obtenerTodos(url, config = {}) {
+  const separador = url.includes('?') ? '&' : '?';
+  let siguiente = `${url}${separador}page_size=${TAMANO_PAGINA}`;
+  const filas = [];
+  while (siguiente) {
+    const { data } = await axios.get(siguiente, config);
+    if (Array.isArray(data)) {
+      return data;
+    }
+    filas.push(...data.results);
+    siguiente = data.next;
+  }
+  return filas;
+}